@@ -1,49 +1,152 @@
 from __future__ import annotations
-import json
-from datetime import datetime, timedelta
+from dataclasses import asdict, dataclass
+import copy
+import cProfile
 import random
-from typing import Optional
+import time
+from typing import Any, Callable, Generator, Mapping, Optional
+from commands import CommandRouter
 from game_entities import Location, Item
+from output import ConsoleSink, OutputBuffer
+from metrics import METRICS
+from journal import ChangeScore, ChangeTurns, Journal, LogEvent, Move, PlaceItem, Pocket, RemoveItem, Unpocket
 from proj1_event_logger import Event, EventList
+from puzzles import WON, Player, Puzzle, PuzzleState
+from recording import Recording
+from world import LocationOverlay, load_world, read_game_data
+
+ACTION_PROMPT = "\nEnter action: "
+
+# The player wins by submitting at SUBMIT_LOCATION with all of REQUIRED_ITEMS, and may keep playing after running
+# out of turns once their score reaches KEEP_PLAYING_SCORE.
+SUBMIT_LOCATION = 4
+REQUIRED_ITEMS = ("charger", "lucky mug", "usb drive")
+KEEP_PLAYING_SCORE = 70
+
+# How a game can end (see AdventureGame.ending)
+SUBMITTED, QUIT, OUT_OF_TURNS, OUT_OF_TIME = "submitted", "quit", "out of turns", "out of time"
+
+# The name results are kept under for players who haven't given one
+DEFAULT_PLAYER = "anonymous"
+
+# The holder of the items in the player's inventory, as returned by AdventureGame.where (location ids are positive)
+PLAYER = 0
+
+# A routine is a command handler that needs more input from the player (e.g. a puzzle).
+# It yields the prompt for its next input, and is sent the player's answer.
+Routine = Generator[str, str, None]
+
+
+@dataclass
+class TurnResult:
+    """The result of applying one command to an AdventureGame.
+
+    Instance Attributes:
+        - lines: the lines of text output by the game, in order
+        - score_delta: how much the score changed because of this command
+        - turns_left: the number of turns left after this command
+        - game_over: whether the game has ended
+        - prompt: the prompt for the next input the game is waiting for
+    """
+    lines: list[str]
+    score_delta: int
+    turns_left: int
+    game_over: bool
+    prompt: str
+
+    @property
+    def text(self) -> str:
+        """Return all output lines joined into a single string."""
+        return "\n".join(self.lines)
 
 
 class AdventureGame:
     """A text adventure game class storing all location, item and map data.
 
     Instance Attributes:
-        - _locations: Mapping from ID to location object
-        - _items: a list of items held by the player
+        - _locations: Mapping from ID to location object, shared with other games until changed by this one
+        - _items: a mapping from item name to every item in the game
         - current_location_id: ID of current location
         - ongoing_sim:  bool 1 is True if game is being played, False if it has ended,
                         and bool 2 determines if the game is simmed.
-        - inventory: a list of all Items held by the player
+        - inventory: a mapping from item name to every Item held by the player (see held_items for their order)
+        - pocket_order: the position of each held item in the order the player picked items up
+        - item_locations: the location of every item this game has put down or taken away from a location, or None
+          if it isn't at any location (see where)
         - score: The current amount of points held by the player
         - turnsleft: The number of turns you can take before the game ends
+        - event_log: the EventList of every turn taken in this game
+        - time_limit: the number of seconds the player has to finish the game
+        - rng: the random number generator used for everything random in this game
+        - recording: the seed and every input of this game, from which it can be replayed
+        - journal: every change made by each command, used to undo and redo commands
+        - width: the width of the player's display in characters, or None to show 25 words per line
+        - profiler: a profiler enabled while this game applies each input, or None to not profile this game
+        - puzzle_state: the name of the item whose puzzle the player is playing and the puzzle's state, or None if
+          the player isn't playing a puzzle
+        - puzzle_attempts: the number of times the player has started the puzzle of each item
+        - player: the name of the player, which their results are kept under
+        - ending: how the game ended (SUBMITTED, QUIT, OUT_OF_TURNS or OUT_OF_TIME), or None if it hasn't
 
     Representation Invariants:
         - current_location_id > 0
         - turnsleft >= 0
+        - (self.ending is None) == self.ongoing_sim[0]
     """
 
     # Private Instance Attributes (do NOT remove these two attributes):
     #   - _locations: a mapping from location id to Location object.
     #                       This represents all the locations in the game.
-    #   - _items: a list of Item objects, representing all items in the game.
-
-    _locations: dict[int, Location]
-    _items: dict[str, Item]
+    #                       Locations must be changed through edit_location, never through get_location.
+    #   - _items: a mapping from item name to Item object, representing all items in the game.
+    #   - _puzzles: the puzzle of every item that has one, shared with other games
+    #   - _clock: function returning the current time in seconds, used for the timer
+    #   - _start_time: the time at which the game was started, None if it hasn't started yet
+    #   - _elapsed_before_start: seconds already played before this game was started, if it was resumed from a save
+    #   - _pocketed: the number of times the player has picked up an item, used to number pocket_order
+    #   - _output: the lines output so far during the current turn
+    #   - _pending: the routine waiting for the player's next input, or None
+    #   - _prompt: the prompt for the next input
+
+    _locations: LocationOverlay
+    _items: Mapping[str, Item]
+    _puzzles: Mapping[str, Puzzle]
     current_location_id: int  # Suggested attribute, can be removed
     ongoing_sim: list[bool]  # Suggested attribute, can be removed
-    inventory: list[Item]
+    inventory: dict[str, Item]
+    pocket_order: dict[str, int]
+    item_locations: dict[str, Optional[int]]
     score: int
     turnsleft: int
-
-    def __init__(self, game_data_file: str, initial_location_id: int) -> None:
+    event_log: EventList
+    time_limit: float
+    rng: random.Random
+    recording: Recording
+    journal: Journal
+    width: Optional[int]
+    profiler: Optional[cProfile.Profile]
+    puzzle_state: Optional[tuple[str, PuzzleState]]
+    puzzle_attempts: dict[str, int]
+    player: str
+    ending: Optional[str]
+    _clock: Callable[[], float]
+    _start_time: Optional[float]
+    _elapsed_before_start: float
+    _pocketed: int
+    _output: OutputBuffer
+    _pending: Optional[Routine]
+    _prompt: str
+
+    def __init__(self, game_data_file: str, initial_location_id: int, turns: int = 25, time_limit: float = 600,
+                 clock: Callable[[], float] = time.monotonic, seed: Optional[int] = None) -> None:
         """
         Initialize a new text adventure game, based on the data in the given file, setting starting location of game
         at the given initial location ID.
         (note: you are allowed to modify the format of the file as you see fit)
 
+        Everything random in the game is determined by the given seed, so two games with the same seed and the same
+        inputs play out identically. If no seed is given, a random one is chosen (and kept in self.recording).
+
         Preconditions:
         - game_data_file is the filename of a valid game data JSON file
         """
@@ -51,38 +154,49 @@ class AdventureGame:
         # 1. Make sure the Location class is used to represent each location.
         # 2. Make sure the Item class is used to represent each item.
 
-        self._locations, self._items = self.load_game_data(game_data_file)
-
-        for k in self._locations:
-            self._locations[k].items = {j: self.get_item(j) for j in self._locations[k].items}
+        # The world is loaded once per process and shared; this game only stores the locations it changes.
+        world = load_world(game_data_file)
+        self._locations = LocationOverlay(world)
+        self._items = world.items
+        self._puzzles = world.puzzles
 
         self.current_location_id = initial_location_id
         self.ongoing_sim = [True, False]
-        self.inventory = []
+        self.inventory = {}
+        self.pocket_order = {}
+        self._pocketed = 0
+        self.item_locations = {}
         self.score = 0
+        self.turnsleft = turns
+        self.event_log = EventList(lambda loc_id: self.get_location(loc_id).long_description)
+        self.time_limit = time_limit
+        if seed is None:
+            seed = random.randrange(2 ** 63)
+        self.rng = random.Random(seed)
+        self.recording = Recording(game_data_file, initial_location_id, turns, time_limit, seed)
+        self.journal = Journal()
+        self.width = None
+        self.profiler = None
+        self.puzzle_state = None
+        self.puzzle_attempts = {}
+        self.player = DEFAULT_PLAYER
+        self.ending = None
+
+        self._clock = clock
+        self._start_time = None
+        self._elapsed_before_start = 0.0
+        self._output = OutputBuffer()
+        self._pending = None
+        self._prompt = ACTION_PROMPT
 
     @staticmethod
     def load_game_data(filen: str) -> tuple[dict[int, Location], dict[str, Item]]:
         """Load locations and items from a JSON file with the given filename and
         return a tuple consisting of (1) a dictionary of locations mapping each game location's ID to a Location object,
-        and (2) a list of all Item objects."""
-
-        with open(filen, 'r') as fl:
-            data = json.load(fl)  # This loads all the data from the JSON file
-
-        locations = {}
-        for loc_data in data['locations']:  # Go through each element associated with the 'locations' key in the file
-            location_obj = Location(loc_data['id'], loc_data['brief_description'], loc_data['long_description'],
-                                    [loc_data['available_commands'], loc_data['items'], False])
-            locations[loc_data['id']] = location_obj
-
-        items = {}
-        for itemdata in data["items"]:
-            item = Item(itemdata["name"], itemdata["description"], itemdata["start_position"],
-                        itemdata["target_position"], itemdata["target_points"])
-            items[itemdata["name"]] = item
+        and (2) a dictionary mapping each item's name to its Item object.
 
-        return locations, items
+        The returned objects are new, and not shared with any game."""
+        return read_game_data(filen)
 
     def get_location(self, loc_id: Optional[int] = None) -> Location:
         """Return Location object associated with the provided location ID.
@@ -93,316 +207,576 @@ class AdventureGame:
         else:
             return self._locations[loc_id]
 
+    def edit_location(self, loc_id: Optional[int] = None) -> Location:
+        """Return this game's own, mutable copy of the location with the provided ID (or the current location)."""
+        return self._locations.writable(self.current_location_id if loc_id is None else loc_id)
+
     def get_item(self, itemid: str) -> Item:
         """Return Item object associated with ID."""
         return self._items[itemid]
 
+    def held_items(self) -> list[str]:
+        """Return the names of the items held by the player, in the order they were picked up."""
+        return sorted(self.inventory, key=self.pocket_order.__getitem__)
+
+    def where(self, name: str) -> Optional[int]:
+        """Return the id of the location the item with the given name is at, PLAYER if the player holds it, or None
+        if it is nowhere (e.g. it was given away).
+
+        Preconditions:
+            - name in self._items
+        """
+        if name in self.inventory:
+            return PLAYER
+        if name in self.item_locations:
+            return self.item_locations[name]
+        # This game hasn't moved the item, so it is still where the world puts it, if anywhere
+        start = self._items[name].start_position
+        return start if start in self._locations and name in self.get_location(start).items else None
+
     def sim(self) -> None:
         "Sets game.ongoing_sim[1] to True to signal that this game is being simmed."
         self.ongoing_sim[1] = True
 
+    def outcome(self) -> dict[str, Any]:
+        """Return the state of this game that a replay of it must reproduce."""
+        return {'score': self.score, 'location': self.current_location_id, 'turns_left': self.turnsleft,
+                'inventory': self.held_items(), 'game_over': not self.ongoing_sim[0]}
 
-if __name__ == "__main__":
-
-    game_log = EventList()
+    def save_recording(self, path: str) -> None:
+        """Save the recording of this game so far, along with its current outcome, to the given file."""
+        self.recording.outcome = self.outcome()
+        self.recording.save(path)
 
-    game = AdventureGame('game_data.json', 1)  # load data, setting initial location ID to 1
-    menu = ["look", "inventory", "score", "undo", "log", "quit", "drop",
-            "submit"]
-    choice = None
+    def time_left(self) -> float:
+        """Return the number of seconds left before the player runs out of time."""
+        if self._start_time is None:
+            return self.time_limit - self._elapsed_before_start
+        return self.time_limit - (self._clock() - self._start_time)
 
-    game.turnsleft = 25  # Adjust maximum turns here
-    lastcommand = None
-    choice2 = None
+    def get_state(self) -> dict[str, Any]:
+        """Return everything needed to resume this game with from_state, as plain Python values.
 
-    # Timer not required, can be commented out
-    duration = timedelta(seconds=600)
-    stime = datetime.now()
+        The timer is paused while the game is saved. A puzzle in progress is saved with its state, so a resumed game
+        continues it; any other command waiting for more input (e.g. which item to drop) is not saved, so a resumed
+        game is back at the action prompt. The undo history is not saved either.
+        """
+        recording = asdict(self.recording)
+        inputs = recording.pop('inputs')
+        return {
+            'location': self.current_location_id,
+            'inventory': self.held_items(),
+            'score': self.score,
+            'turns_left': self.turnsleft,
+            'elapsed': self.time_limit - self.time_left(),
+            'ongoing_sim': list(self.ongoing_sim),
+            'locations': {loc_id: (self.get_location(loc_id).visited, list(self.get_location(loc_id).items))
+                          for loc_id in self._locations.changed_ids()},
+            'event_ids': self.event_log.get_id_log(),
+            'event_commands': self.event_log.get_command_log(),
+            'rng': self.rng.getstate(),
+            'puzzle': copy.deepcopy(self.puzzle_state),
+            'puzzle_attempts': dict(self.puzzle_attempts),
+            'player': self.player,
+            'ending': self.ending,
+            'recording': recording,
+            'inputs': inputs,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict[str, Any], clock: Callable[[], float] = time.monotonic) -> AdventureGame:
+        """Return a game in the given state (as returned by get_state). Call start to resume playing it."""
+        recording = Recording(inputs=list(state['inputs']), **state['recording'])
+        game = cls(recording.game_data_file, state['location'], state['turns_left'], recording.time_limit, clock,
+                   recording.seed)
+        game.recording = recording
+        game.inventory = {name: game.get_item(name) for name in state['inventory']}
+        game.pocket_order = {name: i for i, name in enumerate(state['inventory'])}
+        game._pocketed = len(state['inventory'])
+        game.score = state['score']
+        game.ongoing_sim = list(state['ongoing_sim'])
+        for loc_id, (visited, items) in state['locations'].items():
+            location = game.edit_location(loc_id)
+            location.visited = visited
+            location.items = {name: game.get_item(name) for name in items}
+            game.item_locations.update(dict.fromkeys(items, loc_id))
+        for name, item in game._items.items():
+            if item.start_position in state['locations'] and name not in game.item_locations:
+                game.item_locations[name] = None
+        game.event_log = EventList.from_log(state['event_ids'], state['event_commands'],
+                                            lambda loc_id: game.get_location(loc_id).long_description)
+        game.rng.setstate(state['rng'])
+        game._elapsed_before_start = state['elapsed']
+        game.puzzle_attempts = dict(state.get('puzzle_attempts', {}))
+        game.player = state.get('player', game.player)
+        game.ending = state.get('ending')
+        if state.get('puzzle') is not None:
+            name, puzzle_state = state['puzzle']
+            game.journal.begin(name)
+            game._pending = game._play(name, copy.deepcopy(puzzle_state))
+        return game
+
+    # ------------------------------------------------------------------------------------------
+    # Turn engine
+    # ------------------------------------------------------------------------------------------
+
+    def start(self) -> TurnResult:
+        """Start the game timer and return the description of the starting location.
+
+        Calling start on a game that has already started does nothing except return an empty result.
+        """
+        self._start()
+        return self._result(self.score)
+
+    def _start(self) -> None:
+        """Start the game timer and describe the starting location, unless the game has already started."""
+        if self._start_time is None:
+            self._start_time = self._clock() - self._elapsed_before_start
+            if self.event_log.is_empty():
+                location = self.get_location()
+                self.event_log.add_event(Event(location.id_num, location.long_description))
+            if self._pending is None:
+                self._begin_turn()
+            else:
+                # A resumed game in the middle of a puzzle
+                self._advance(None)
 
-    while game.ongoing_sim[0]:
-        print(game.ongoing_sim[1])
-        elapsed = datetime.now() - stime
-        remtime = duration - elapsed
-        location = game.get_location()
+    def step(self, command: str) -> TurnResult:
+        """Apply the given player input to this game and return what happened.
 
-        game_log.add_event(Event(location.id_num, location.long_description, None, None, None), choice)
+        The input is either a command for the current location, or the answer to the last prompt if the
+        game asked the player for more input (e.g. a move in a puzzle). The game is started if it hasn't been yet.
+        """
+        if self.profiler is not None:
+            self.profiler.enable()
+        try:
+            with METRICS.timer("turn"):
+                self._start()
+                self.recording.inputs.append((self._clock() - self._start_time, command))
+                score_before = self.score
+
+                if not self.ongoing_sim[0]:
+                    self._say("The game is over.")
+                elif self._pending is not None:
+                    self._advance(command.lower().strip())
+                else:
+                    self._command(command.lower().strip())
+                return self._result(score_before)
+        finally:
+            if self.profiler is not None:
+                self.profiler.disable()
 
-        if not game.get_location().visited:
-            game.get_location().visited = True
-            temp = game.get_location().long_description.split(" ")
-            res = [" ".join(temp[y:y + 25]) for y in range(0, len(temp), 25)]
-            for x in res:
-                print(x)
-            print()
+    def expire(self) -> TurnResult:
+        """End the game if the player has run out of time, and return what happened.
 
-        else:
-            temp = game.get_location().brief_description.split(" ")
-            res = [" ".join(temp[z:z + 25]) for z in range(0, len(temp), 25)]
-            for w in res:
-                print(w)
-            print()
-
-        # Display possible actions at this location
-        print("What to do? Choose from: look, inventory, score, undo, log, quit, drop, submit")
-        print("At this location, you can also:")
-        for action in location.available_commands:
-            print("-", action)
-
-        # Validate choice
-        choice = input("\nEnter action: ").lower().strip()
-        while choice not in location.available_commands and choice not in menu and choice not in location.items:
-            print("That was an invalid option; try again.")
-            choice = input("\nEnter action: ").lower().strip()
-
-        # print("====================")
-        print("You decided to:", choice)
-        if choice in menu:
-            helditems = [itm.name for itm in game.inventory]
-            if choice == "log":
-                game_log.display_events()
-            if choice == "submit":
-                if (
-                        location.id_num == 4
-                        and (
-                        all(
-                            game.get_item(it1) in game.inventory
-                            for it1 in ["charger", "lucky mug", "usb drive"]
-                        )
-                        or all(
-                        it2 in game.get_location().items.keys()
-                        for it2 in ["charger", "lucky mug", "usb drive"]
-                        )
-                        )
-                ):
-
-                    game.ongoing_sim[0] = False
-                    print()
-                    print("You've successfully submitted the assignment on time. Congratulations!!")
-                    print(f"Final score: {game.score}")
-                else:
-                    print("You need to be in your dorm room with your charger, lucky mug, and usb drive to submit!")
-            if choice == "drop":
-                if len(game.inventory) > 0:
-                    choice2 = input("\nEnter item: ").lower().strip()
-                    while choice2 not in helditems:
-                        print(f"The {choice2} is not in your inventory, try again.")
-                        choice2 = input("\nEnter item: ").lower().strip()
-                    if game.get_item(choice2).target_position == game.get_location().id_num:
-                        game.inventory.pop(game.inventory.index(game.get_item(choice2)))
-                        print(f"You dropped a {choice2} in your dorm room!",
-                              f"You got {game.get_item(choice2).target_points} points!")
-                        game.score += game.get_item(choice2).target_points
-                        game.get_location().items[choice2] = game.get_item(choice2)
-
-                    else:
-                        print("Don't drop this off here! You should bring it back to your dorm room.")
-                else:
-                    print("Your inventory is empty.")
+        The game otherwise only notices that the time is up after the player's next input; this lets a scheduler
+        end it on time instead. Expiring a game that has time left (or has already ended) does nothing.
+        """
+        score_before = self.score
+        if self._start_time is not None and self.ongoing_sim[0] and self.time_left() <= 0:
+            self.recording.expired_at = self._clock() - self._start_time
+            if self._pending is not None:
+                self._pending.close()
+                self._pending = None
+                self.puzzle_state = None
+            self._prompt = ACTION_PROMPT
+            self._end_game(OUT_OF_TIME)
+            self._say("Your time ran out!")
+        return self._result(score_before)
+
+    def _result(self, score_before: int) -> TurnResult:
+        """Return the TurnResult for the output collected so far."""
+        return TurnResult(self._output.take(), self.score - score_before, self.turnsleft, not self.ongoing_sim[0],
+                          self._prompt)
+
+    def _say(self, *parts: object) -> None:
+        """Output a line of text to the player, joining the given parts with spaces like print()."""
+        self._output.say(*parts)
+
+    def _describe(self, long: bool) -> None:
+        """Output the long or brief description of the current location, wrapped for the player's display."""
+        descriptions = self._locations.world.descriptions
+        self._output.extend(descriptions.description(self.get_location(), long, self.width))
+
+    def _begin_turn(self) -> None:
+        """Describe the current location to the player."""
+        location = self.get_location()
+        METRICS.inc("location_visits", location=location.id_num)
+        with METRICS.timer("render"):
+            if not location.visited:
+                self.edit_location().visited = True
+                self._describe(True)
+            else:
+                self._describe(False)
+            self._say()
 
-            if choice == "inventory":
-                print()
-                print("You currently have: ")
-                if len(game.inventory) == 0:
-                    print("Your inventory is empty.")
-                else:
-                    res = []
-                    for i in game.inventory:
-                        print(f"{i.name}: {i.description}")
-            if choice == "score":
-                print(f"Current score: {game.score}")
-            if choice == "quit":
-                game.ongoing_sim[0] = False
-            if choice == "undo":
-                if lastcommand is None:
-                    print("You can't undo on turn 1!")
-                elif lastcommand in game.get_location(game_log.last.prev.id_num).available_commands:
-                    game_log.remove_last_event()
-                    game.current_location_id = game_log.last.id_num
-                    game.turnsleft += 1
-                elif lastcommand in helditems:
-                    game.inventory.pop(game.inventory.index(game.get_item(lastcommand)))
-                    location.additem(game.get_item(lastcommand))
-                    game.score -= game.get_item(lastcommand).target_points
-                    if lastcommand == "lucky mug":
-                        game.inventory.append(game.get_item("tcard"))
-                elif lastcommand == "undo":
-                    print("You can't undo an undo command!")
-                elif lastcommand == "drop":
-                    if choice2 is not None:
-                        game.get_location().takeitem()
-                        game.inventory.append(game.get_item(choice2))
-                        game.score -= game.get_item(choice2).target_points
-                    else:
-                        print("You didn't drop anything during your last action.")
+            # Display possible actions at this location
+            self._output.say(ROUTER.menu_line)
+            self._output.extend(self._locations.world.descriptions.exits(location))
 
-                else:
-                    print("Invalid. Last action did not change gamestate.")
-
-            if choice == "look":
-                temp = game.get_location().long_description.split(" ")
-                res = [" ".join(temp[t:t + 25]) for t in range(0, len(temp), 25)]
-                for r in res:
-                    print(r)
-        elif choice in location.items:
-            if not game.ongoing_sim[1]:
-                if choice.lower().strip() == "lucky mug".lower().strip() and game.get_location().id_num == 7:
-                    print("The porter says, 'do you have your TCard?'")
-                    if game.get_item("tcard") in game.inventory:
-                        game.inventory.pop(game.inventory.index(game.get_item("tcard")))
-                        game.inventory.append(game.get_item("lucky mug"))
-                        game.score += game.get_item("lucky mug").target_points
-                        print("You show the porter your TCard, and in return you get the lucky mug!")
-                elif choice.lower().strip() == "charger" and game.get_location().id_num == 3:
-                    print("You go to where you were studying earlier, and you see your charger plugged into the wall!")
-                    print("You ask the person sitting there to get the charger for you, ")
-                    print("but they insist that you beat them in a best of 5 rock paper scissors match!")
-                    options = ["rock", "paper", "scissors"]
-                    scores = [0, 0]
-                    while scores[0] < 3 and scores[1] < 3:
-                        inpt = ""
-                        cpu = options[random.randint(0, 2)]
-                        while inpt not in options:
-                            inpt = input("\nEnter your move: ").lower().strip()
-                        if inpt == cpu:
-                            print("Tie! try again.")
-                        elif (inpt == "rock" and cpu == "scissors") or (inpt == "scissors" and cpu == "paper"):
-                            scores[0] += 1
-                            print(f"Opponent's move: {cpu}")
-                            print(f"Current score: {scores[0]}-{scores[1]}")
-                        elif inpt == "paper" and cpu == "rock":
-                            scores[0] += 1
-                            print(f"Opponent's move: {cpu}")
-                            print(f"Current score: {scores[0]}-{scores[1]}")
-                        else:
-                            scores[1] += 1
-                            print(f"Opponent's move: {cpu} ")
-                            print(f"Current score: {scores[0]}-{scores[1]}")
-                    if scores[0] > scores[1]:
-                        print("You won! You received your charger!")
-                        game.inventory.append(game.get_item("charger"))
-                        game.score += game.get_item("charger").target_points
-                        location.takeitem("charger")
-                        game.turnsleft -= 1
-                    else:
-                        game.turnsleft -= 1
-                        print("You lost! try again.")
-                elif choice.lower().strip() == "USB drive".lower().strip() and game.get_location().id_num == 6:
-                    print("You take the elevator up to the 6th floor lecture room. Could this be where the USB is?")
-                    print("The class taking place just ended, so you go to where you were sitting earlier today.")
-                    print("There is someone there, and next to them on the ground you see your USB!")
-                    print("You ask them to grab it for you, but they said that it was theirs!")
-                    print("You get into an argument, but the other person won't budge.")
-                    print()
-                    print(
-                        "Finally, they challenge you to a game: 'Beat these two word games and i'll give you the key!'")
-                    print()
-                    print("Game 1: Wordle! You have 6 guesses.")
-                    print("-O-: correct, -/-: in the word but incorrect position, -X-: not in word.")
-                    filename = "words.txt"
-                    words = []
-                    with open(filename) as f:
-                        for line in f:
-                            words.append(line[0:5])
-                    index = random.randint(0, len(words) - 1)
-                    choice3 = ""
-                    goal = words[index]
-                    correct = False
-                    turns = 6
-                    while choice3 != goal and not correct and turns > 0:
-                        check = []
-                        choice3 = input("\nEnter a 5 letter word: ").lower().strip()
-                        print(f"Goal: {goal}")
-                        if not isinstance(choice3, str) or len(choice3) != 5 or choice3 not in words:
-                            print("Please enter a valid 5 letter word: ")
-                        else:
-                            print("====================")
-                            if list(choice3) == list(goal):
-                                correct = True
-                                print("You got it!")
-                            else:
-                                ind = 0
-                                for char in list(choice3):
-                                    if char in list(goal) and list(choice3)[ind] == list(goal)[ind]:
-                                        check.append("-O-")
-                                    elif char in list(goal):
-                                        check.append("-/-")
-                                    else:
-                                        check.append("-X-")
-                                    ind += 1
-                            print(f"Your entry: {choice3}")
-                            print(f"result: {check}")
-                            turns -= 1
-                            print(f"Turns left: {turns}")
-                            if correct:
-                                print()
-                                print("Game 2: Beat this word unscrambling game to receive the USB drive!")
-                                print(
-                                    "You will have 5 scrambled words, and you need to guess what the original word is.")
-                                print("Hint: The words are related to your life as a CS student at UofT! ")
-                                words = ["Computer", "Science", "Toronto", "University", "Canada", "Ontario", "Project"]
-                                correct = True
-                                random.shuffle(words)
-                                for i in words[0:5]:
-                                    if correct:
-                                        temp = list(i)
-                                        random.shuffle(temp)
-                                        print("".join(temp))
-                                        inp = input("\nUnscrambled word: ")
-                                        if inp.lower() == i.lower():
-                                            print("Correct!")
-                                        else:
-                                            print("Incorrect. You'll have to try again!")
-                                            correct = False
-                                            game.turnsleft -= 1
-                                if correct:
-                                    game.turnsleft -= 1
-                                    print()
-                                    print("Congratulations! You got 5/5!")
-                                    print("You picked up a USB drive!")
-                                    print()
-                                    location.takeitem(choice)
-
-                                    game.inventory.append(game.get_item(choice))
-                                    game.score += game.get_item(choice).target_points
-                            else:
-                                if turns == 0:
-                                    print("You ran out of tries! try again.")
-                                    game.turnsleft -= 1
-                else:
-                    print(f"\nYou picked up a {choice}!")
-                    location.takeitem(choice)
-                    print(game.get_item(choice).description)
-                    game.inventory.append(game.get_item(choice))
-                    game.score += game.get_item(choice).target_points
+    def _end_turn(self) -> None:
+        """Check the timer and the turn count after a command, and start the next turn if the game continues.
 
+        If the command changed the game, the location it led to is logged as a new event, and the command can be
+        undone.
+        """
+        transaction = self.journal.current
+        if transaction is not None and transaction.operations:
+            location = self.get_location()
+            with METRICS.timer("event_log"):
+                self.journal.record(self, LogEvent(Event(location.id_num, location.long_description),
+                                                   transaction.command))
+        self.journal.commit()
+
+        self._say("====================")
+        if self.ongoing_sim[0]:
+            remtime = self.time_left()
+            if remtime <= 0:
+                self._end_game(OUT_OF_TIME)
+                self._say("Your time ran out!")
+            else:
+                mins, secs = divmod(int(remtime), 60)
+                self._say()
+                self._say()
+                self._say(f"Time left: {mins}mins, {secs}secs")
+            if self.turnsleft <= 0 and self.score < KEEP_PLAYING_SCORE:
+                self._say("You ran out of turns! Game Over.")
+                self._end_game(OUT_OF_TURNS)
             else:
-                print(f"\nYou picked up a {choice}!")
-                location.takeitem(choice)
-                print(game.get_item(choice).description)
-                game.inventory.append(game.get_item(choice))
-                game.score += game.get_item(choice).target_points
+                self._say(f"You have {self.turnsleft} turns left.")
+                self._say()
+
+        if self.ongoing_sim[0]:
+            self._begin_turn()
+
+    def _end_game(self, ending: str) -> None:
+        """End the game, which ended in the given way (unless it has already ended)."""
+        self.ongoing_sim[0] = False
+        if self.ending is None:
+            self.ending = ending
+
+    def _begin(self, routine: Routine) -> None:
+        """Run the given routine until it asks for input or finishes."""
+        self._pending = routine
+        self._advance(None)
+
+    def _advance(self, answer: Optional[str]) -> None:
+        """Send the player's answer to the pending routine, ending the turn if the routine finishes."""
+        try:
+            with METRICS.timer("routine"):
+                self._prompt = self._pending.send(answer)
+        except StopIteration:
+            self._pending = None
+            self._prompt = ACTION_PROMPT
+            self._end_turn()
+
+    def _command(self, text: str) -> None:
+        """Apply the command the player typed at the current location."""
+        location = self.get_location()
+        with METRICS.timer("dispatch"):
+            world = self._locations.world
+            route = ROUTER.resolve(location, world.exit_indexes[location.id_num], text,
+                                   world.exit_trees[location.id_num], world.item_tree)
+        if route is None:
+            METRICS.inc("invalid_inputs")
+            self._say("That was an invalid option; try again.")
+            return
+        if route.handler is None:
+            METRICS.inc("ambiguous_inputs")
+            self._say(f"Did you mean: {', '.join(route.candidates)}?")
+            return
+
+        if route.corrected:
+            METRICS.inc("corrected_inputs")
+        METRICS.inc("commands", command=route.command)
+        choice = f"{route.command} {route.argument}" if route.argument else route.command
+        if choice not in ("undo", "redo"):
+            self.journal.begin(choice)
+        self._say("You decided to:", choice)
+        routine = route.handler(self, choice)
+        if routine is not None:
+            self._begin(routine)
+        else:
+            self._end_turn()
+
+    def _move(self, choice: str) -> None:
+        """Move the player along the given available command of the current location."""
+        self.journal.record(self, Move(self.current_location_id, self.get_location().available_commands[choice]))
+        self._use_turn()
+
+    def _interact(self, choice: str) -> Optional[Routine]:
+        """Pick up the item with the given name at the current location, playing its puzzle if it has one and this
+        is its start position."""
+        item = self.get_item(choice)
+        if not self.ongoing_sim[1] and item.puzzle is not None and item.start_position == self.current_location_id:
+            return self._play(choice)
+        self._pick_up(choice)
+        return None
+
+    # ------------------------------------------------------------------------------------------
+    # Menu commands
+    # ------------------------------------------------------------------------------------------
+
+    def _show_log(self) -> None:
+        """Output every event in the event log."""
+        for event in self.event_log:
+            self._say(f"Location: {event.id_num}, Command: {event.next_command}")
+
+    def _show_inventory(self) -> None:
+        """Output the items held by the player."""
+        self._say()
+        self._say("You currently have: ")
+        if len(self.inventory) == 0:
+            self._say("Your inventory is empty.")
+        else:
+            for name in self.held_items():
+                self._say(f"{name}: {self.inventory[name].description}")
+
+    def _quit(self) -> None:
+        """End the game."""
+        self._end_game(QUIT)
+
+    def _look(self) -> None:
+        """Output the long description of the current location."""
+        self._describe(True)
+
+    def _show_score(self) -> None:
+        """Output the player's score."""
+        self._say(f"Current score: {self.score}")
+
+    def _submit(self) -> None:
+        """End the game if the player has everything needed to submit their paper."""
+        location = self.get_location()
+        if location.id_num == SUBMIT_LOCATION and (all(it in self.inventory for it in REQUIRED_ITEMS)
+                                                   or all(it in location.items for it in REQUIRED_ITEMS)):
+            self._end_game(SUBMITTED)
+            self._say()
+            self._say("You've successfully submitted the assignment on time. Congratulations!!")
+            self._say(f"Final score: {self.score}")
+        else:
+            self._say("You need to be in your dorm room with your charger, lucky mug, and usb drive to submit!")
+
+    def _drop(self) -> Routine:
+        """Ask the player for an item in their inventory and drop it off if this is its target location."""
+        if len(self.inventory) == 0:
+            self._say("Your inventory is empty.")
+            return
+        choice2 = yield "\nEnter item: "
+        while choice2 not in self.inventory:
+            self._say(f"The {choice2} is not in your inventory, try again.")
+            choice2 = yield "\nEnter item: "
+        item = self.get_item(choice2)
+        if item.target_position == self.current_location_id:
+            self._unpocket(choice2)
+            self._say(f"You dropped a {choice2} in your dorm room!", f"You got {item.target_points} points!")
+            self._add_score(item.target_points)
+            self.journal.record(self, PlaceItem(self.current_location_id, item))
+        else:
+            self._say("Don't drop this off here! You should bring it back to your dorm room.")
+
+    def _route(self, choice: str) -> Optional[Routine]:
+        """Tell the player the shortest route to the item or place named after "route" in choice, asking for one if
+        choice doesn't name any. This doesn't use a turn."""
+        target = choice.partition(" ")[2].strip()
+        if target:
+            self._show_route(target)
+            return None
+        return self._ask_route()
+
+    def _ask_route(self) -> Routine:
+        """Ask the player for an item or place, and tell them the shortest route to it."""
+        target = yield "\nRoute to (an item or place): "
+        self._show_route(target)
+
+    def _show_route(self, target: str) -> None:
+        """Output the shortest route from the current location to the given item or place.
+
+        The route to an item in the player's inventory leads to where it should be dropped off.
+        """
+        graph = self._locations.world.graph
+        item = self._items.get(target)
+        if item is not None and target in self.inventory:
+            destination = item.target_position
+            where = f"You have the {target}. To drop it off at {self._place_name(destination)}"
+        elif item is not None:
+            destination = self.where(target)
+            if destination is None:
+                self._say(f"Nobody knows where the {target} is.")
+                return
+            where = f"The {target} is at {self._place_name(destination)}"
+        elif target in graph.places:
+            destination = graph.places[target]
+            where = self._place_name(destination)
+        else:
+            self._say(f"There is no item or place called '{target}'.")
+            return
+
+        commands = graph.route(self.current_location_id, destination)
+        if commands is None:
+            self._say(f"{where}, but you can't get there from here.")
+        elif not commands:
+            self._say(f"{where}, right where you are.")
+        else:
+            moves = "1 move" if len(commands) == 1 else f"{len(commands)} moves"
+            self._say(f"{where}, {moves} away: {', '.join(commands)}.")
+
+    def _where(self, choice: str) -> Optional[Routine]:
+        """Tell the player where the item named after "where" in choice is, asking for one if choice doesn't name
+        any. This doesn't use a turn."""
+        target = choice.partition(" ")[2].strip()
+        if target:
+            self._show_where(target)
+            return None
+        return self._ask_where()
+
+    def _ask_where(self) -> Routine:
+        """Ask the player for an item, and tell them where it is."""
+        target = yield "\nWhere is (an item): "
+        self._show_where(target)
+
+    def _show_where(self, target: str) -> None:
+        """Output where the item with the given name is."""
+        if target not in self._items:
+            self._say(f"There is no item called '{target}'.")
+            return
+        holder = self.where(target)
+        if holder == PLAYER:
+            self._say(f"You have the {target}.")
+        elif holder is None:
+            self._say(f"Nobody knows where the {target} is.")
+        else:
+            self._say(f"The {target} is at {self._place_name(holder)}.")
+
+    def _place_name(self, loc_id: int) -> str:
+        """Return the name of the location with the given id, for telling it to the player."""
+        return self.get_location(loc_id).name or f"location {loc_id}"
 
-            # ENTER YOUR CODE BELOW to handle other menu commands (remember to use helper functions as appropriate)
+    def _undo(self) -> None:
+        """Undo the most recent command that changed the game, if there is one."""
+        if self.journal.can_undo():
+            self._say(f"You undid: {self.journal.undo(self)}")
         else:
-            # Handle non-menu actions
-            result = location.available_commands[choice]
-            game.current_location_id = result
-            game.turnsleft -= 1
-
-        print("====================")
-        if game.ongoing_sim[0]:
-            if remtime.total_seconds() <= 0:
-                game.ongoing_sim[0] = False
-                print("Your time ran out!")
-            else:
-                mins, secs = divmod(int(remtime.total_seconds()), 60)
-                print()
-                print()
-                print(f"Time left: {mins}mins, {secs}secs")
-            if game.turnsleft <= 0 and game.score < 70:
-                print("You ran out of turns! Game Over.")
-                game.ongoing_sim[0] = False
-            else:
-                print(f"You have {game.turnsleft} turns left.")
-                print()
-            lastcommand = choice
+            self._say("There is nothing to undo.")
+
+    def _redo(self) -> None:
+        """Redo the most recently undone command, if it can still be redone."""
+        if self.journal.can_redo():
+            self._say(f"You redid: {self.journal.redo(self)}")
+        else:
+            self._say("There is nothing to redo.")
+
+    # ------------------------------------------------------------------------------------------
+    # Items and puzzles
+    # ------------------------------------------------------------------------------------------
+
+    def _use_turn(self, turns: int = 1) -> None:
+        """Use up the given number of the player's turns."""
+        self.journal.record(self, ChangeTurns(-turns))
+
+    def _add_score(self, points: int) -> None:
+        """Add the given number of points to the player's score."""
+        self.journal.record(self, ChangeScore(points))
+
+    def _pocket(self, name: str) -> None:
+        """Add the item with the given name to the player's inventory."""
+        self.journal.record(self, Pocket(self.get_item(name), self._pocketed))
+        self._pocketed += 1
+
+    def _unpocket(self, name: str) -> None:
+        """Remove the item with the given name from the player's inventory."""
+        self.journal.record(self, Unpocket(self.get_item(name), self.pocket_order[name]))
+
+    def _take(self, name: str) -> None:
+        """Move the item with the given name from the current location to the player's inventory,
+        and give the player its points."""
+        item = self.get_item(name)
+        self.journal.record(self, RemoveItem(self.current_location_id, item))
+        self._pocket(name)
+        self._add_score(item.target_points)
+
+    def _pick_up(self, choice: str) -> None:
+        """Move the given item from the current location to the player's inventory."""
+        self._say(f"\nYou picked up a {choice}!")
+        self._say(self.get_item(choice).description)
+        self._take(choice)
+
+    def _play(self, name: str, state: Optional[PuzzleState] = None) -> Routine:
+        """Play the puzzle of the item with the given name, continuing from the given state if the puzzle is already
+        in progress, and give the player the item if they win it."""
+        puzzle = self._puzzles[name]
+        player = Player(self._say, self.rng, self.inventory)
+        if state is None:
+            self.puzzle_attempts[name] = self.puzzle_attempts.get(name, 0) + 1
+            state = puzzle.begin(player)
+        else:
+            self._say(f"You are back at the puzzle for the {name}.")
+            puzzle.resume(state, player)
+        self.puzzle_state = (name, state)
+        while puzzle.outcome(state) is None:
+            answer = yield puzzle.prompt(state)
+            puzzle.step(state, answer, player)
+        self.puzzle_state = None
+
+        if puzzle.turns:
+            self._use_turn(puzzle.turns)
+        if puzzle.outcome(state) == WON:
+            if puzzle.gives is not None:
+                self._unpocket(puzzle.gives)
+            self._take(name)
+
+
+ROUTER = CommandRouter()
+ROUTER.register("look", lambda game, _: game._look(), ("l",))
+ROUTER.register("inventory", lambda game, _: game._show_inventory(), ("i",))
+ROUTER.register("score", lambda game, _: game._show_score())
+ROUTER.register("undo", lambda game, _: game._undo())
+ROUTER.register("redo", lambda game, _: game._redo())
+ROUTER.register("log", lambda game, _: game._show_log())
+ROUTER.register("quit", lambda game, _: game._quit(), confirm_typos=True)
+ROUTER.register("drop", lambda game, _: game._drop(), confirm_typos=True)
+ROUTER.register("submit", lambda game, _: game._submit(), confirm_typos=True)
+ROUTER.register("route", AdventureGame._route, takes_argument=True)
+ROUTER.register("where", AdventureGame._where, takes_argument=True)
+ROUTER.register_move(AdventureGame._move)
+ROUTER.register_item(AdventureGame._interact)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Play the text adventure game.")
+    parser.add_argument('--seed', type=int, help="seed for the game's random events")
+    parser.add_argument('--record', metavar='FILE', help="save a recording of the game to FILE, to replay it later")
+    parser.add_argument('--metrics', metavar='FILE', help="save metrics of the game to FILE (.json or Prometheus text)")
+    parser.add_argument('--profile', metavar='FILE', help="save cProfile statistics of the game to FILE")
+    parser.add_argument('--width', type=int, help="wrap descriptions to this many characters (default: 25 words)")
+    parser.add_argument('--player', default=DEFAULT_PLAYER, help="the name to keep your results under")
+    parser.add_argument('--results', metavar='FILE', help="add the result of the game to the results database FILE")
+    args = parser.parse_args()
+
+    if args.metrics:
+        METRICS.enable()
+    game = AdventureGame('game_data.json', 1, seed=args.seed)  # load data, setting initial location ID to 1
+    if args.profile:
+        game.profiler = cProfile.Profile()
+    game.player = args.player
+    game.width = args.width
+    console = ConsoleSink()
+    result = game.start()
+    try:
+        while True:
+            console.write_result(result)
+            if result.game_over:
+                break
+            result = game.step(input())
+    finally:
+        if args.record:
+            game.save_recording(args.record)
+        if args.metrics:
+            METRICS.write(args.metrics)
+        if args.profile:
+            game.profiler.dump_stats(args.profile)
+        if args.results and game.ending is not None:
+            from results_store import ResultsStore, game_result
+            results = ResultsStore(args.results)
+            results.add([game_result(game)])
+            results.close()
@@ -0,0 +1,121 @@
+"""CSC111 Project 1: Text Adventure Game - Anagram Index
+
+This module contains AnagramIndex, which groups the words of a dictionary by their signature: their letters in
+sorted order. Two words are anagrams of each other exactly when they have the same signature, so finding every word
+that can be made from some letters, or checking that an answer uses the same letters as a word, is a single
+dictionary lookup instead of a search of the dictionary.
+
+The unscramble puzzle uses it to accept any real word made from the scrambled letters, and to leave out words with
+too many anagrams, and scrambles that already spell a word, when it picks its scrambles.
+
+    >>> index = AnagramIndex(["listen", "silent", "enlist", "tinsel", "stone"])
+    >>> sorted(index.anagrams("Inlets"))
+    ['enlist', 'listen', 'silent', 'tinsel']
+"""
+from __future__ import annotations
+import itertools
+import math
+import os
+from collections import Counter
+from typing import Iterable, Iterator
+
+from wordlist import WORDS_FILE
+
+
+def signature(word: str) -> str:
+    """Return the signature of the given word: its letters in lowercase, in sorted order.
+
+    >>> signature("Listen")
+    'eilnst'
+    """
+    return "".join(sorted(word.lower()))
+
+
+def arrangements(word: str) -> int:
+    """Return the number of different ways the letters of the given word can be arranged.
+
+    >>> arrangements("Canada")
+    120
+    """
+    count = math.factorial(len(word))
+    for repeats in Counter(word.lower()).values():
+        count //= math.factorial(repeats)
+    return count
+
+
+class AnagramIndex:
+    """An immutable dictionary of words, grouped by signature.
+
+    Words are kept in lowercase.
+
+    Instance Attributes:
+        - words: the words in this index, in the order they were given
+
+    Representation Invariants:
+        - len(self.words) == len(set(self.words))
+        - all(word in self.anagrams(word) for word in self.words)
+    """
+    # Private Instance Attributes:
+    #   - _groups: a mapping from each signature to the words in this index with that signature
+
+    words: tuple[str, ...]
+    _groups: dict[str, frozenset[str]]
+
+    def __init__(self, words: Iterable[str]) -> None:
+        """Initialize an index of the given words, ignoring duplicates and case."""
+        groups = {}
+        for word in dict.fromkeys(word.lower() for word in words):
+            groups.setdefault(signature(word), []).append(word)
+        self.words = tuple(word for group in groups.values() for word in group)
+        self._groups = {key: frozenset(group) for key, group in groups.items()}
+
+    def __contains__(self, word: object) -> bool:
+        return isinstance(word, str) and word in self._groups.get(signature(word), ())
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def anagrams(self, letters: str) -> frozenset[str]:
+        """Return the words in this index made of exactly the given letters (in any order and case)."""
+        return self._groups.get(signature(letters), frozenset())
+
+    def is_anagram(self, answer: str, word: str) -> bool:
+        """Return whether answer is a word in this index made of exactly the letters of the given word."""
+        return answer.lower() in self.anagrams(word)
+
+
+_indexes: dict[tuple[str, tuple[str, ...]], AnagramIndex] = {}
+
+
+def load_anagram_index(filen: str = WORDS_FILE, extra: Iterable[str] = ()) -> AnagramIndex:
+    """Return the AnagramIndex of the given extra words followed by the words in the given file, with one word per
+    line. A relative path is relative to the directory of this module.
+
+    The file is only read and indexed the first time it is loaded in this process, and it is only merged with the
+    same extra words once.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filen)
+    extra = tuple(extra)
+    index = _indexes.get((path, extra))
+    if index is None:
+        if extra:
+            index = AnagramIndex(itertools.chain(extra, load_anagram_index(path)))
+        else:
+            with open(path) as f:
+                index = AnagramIndex(line.strip() for line in f if line.strip())
+        _indexes[(path, extra)] = index
+    return index
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
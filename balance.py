@@ -0,0 +1,380 @@
+"""CSC111 Project 1: Text Adventure Game - Balancing
+
+This module estimates how hard the game is by simulating a large number of playthroughs by simulated players.
+
+Every simulated player follows the fastest route to a win found by the solver, possibly with some detours, and
+plays each puzzle on the route until they win it. A policy describes how the player plays: the moves they choose in
+rock paper scissors, how often they solve the Wordle, and how often they unscramble a word correctly. Playthroughs
+are simulated many at a time with NumPy arrays (or one at a time in pure Python if NumPy isn't installed), in
+batches spread over a pool of processes.
+
+    python balance.py --games 1000000 --policy casual
+"""
+from __future__ import annotations
+import argparse
+import math
+import os
+import random
+from dataclasses import dataclass
+from multiprocessing import Pool
+from typing import Any, Callable, Optional
+
+from adventure import KEEP_PLAYING_SCORE
+from puzzles import Puzzle
+from solver import Rules, solve
+from world import load_world
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: playthroughs are simulated one at a time in pure Python
+    np = None
+
+# Rock paper scissors moves are numbered so that move a beats move b if and only if (a - b) % 3 == 1
+ROCK, PAPER, SCISSORS = 0, 1, 2
+
+# Playthroughs are simulated in batches of this many games
+_BATCH = 65536
+
+
+@dataclass(frozen=True)
+class Policy:
+    """How a simulated player plays.
+
+    Instance Attributes:
+        - name: the name of this policy
+        - rps_weights: the probability of the player choosing rock, paper and scissors in each round
+        - wordle_rate: the probability of the player solving a Wordle within its guesses
+        - unscramble_rate: the probability of the player unscrambling each word correctly
+        - detour_mean: the mean number of moves the player wastes off the fastest route
+
+    Representation Invariants:
+        - abs(sum(self.rps_weights) - 1) < 1e-9
+        - 0 <= self.wordle_rate <= 1 and 0 <= self.unscramble_rate <= 1
+        - self.detour_mean >= 0
+    """
+    name: str
+    rps_weights: tuple[float, float, float] = (1 / 3, 1 / 3, 1 / 3)
+    wordle_rate: float = 1.0
+    unscramble_rate: float = 1.0
+    detour_mean: float = 0.0
+
+
+POLICIES = {policy.name: policy for policy in [
+    Policy("optimal"),
+    Policy("casual", wordle_rate=0.9, unscramble_rate=0.95, detour_mean=3.0),
+    Policy("novice", rps_weights=(0.5, 0.25, 0.25), wordle_rate=0.7, unscramble_rate=0.85, detour_mean=6.0),
+]}
+
+
+@dataclass(frozen=True)
+class Step:
+    """One command on the route followed by the simulated players.
+
+    Instance Attributes:
+        - command: the command
+        - turns: the turns taken by the command
+        - points: the points the command gives
+        - puzzle: the puzzle that must be won for the command to succeed, or None
+    """
+    command: str
+    turns: int
+    points: int
+    puzzle: Optional[Puzzle] = None
+
+
+def plan_route(game_data_file: str, initial_location_id: int = 1, turns: int = 25) -> list[Step]:
+    """Return the steps of the fastest win of the game in the given file, as found by the solver.
+
+    Raise ValueError if the game can't be won in the given number of turns.
+    """
+    world = load_world(game_data_file)
+    solution = solve(game_data_file, initial_location_id, turns, processes=1)
+    if not solution.winnable:
+        raise ValueError(f"{game_data_file} can't be won in {turns} turns")
+
+    rules = Rules.from_world(world)
+    state = rules.start_state(initial_location_id)
+    steps = []
+    for command in solution.route:
+        _, state, cost = next(s for s in rules.successors(state) if s[0] == command)
+        item = world.items.get(command.removeprefix("drop "))
+        points = item.target_points if item is not None else 0
+        puzzle = world.puzzles.get(command) if cost else None
+        steps.append(Step(command, cost, points, puzzle))
+    return steps
+
+
+# ----------------------------------------------------------------------------------------------
+# Puzzles: each returns whether each of m attempts at a puzzle succeeds
+# ----------------------------------------------------------------------------------------------
+
+def _rps_matches(policy: Policy, puzzle: Any, rng: Any, m: int) -> Any:
+    """Play m rock paper scissors matches against an opponent choosing moves uniformly at random, and return a
+    boolean array of whether the player won each match.
+
+    Rounds are played 16 at a time for every match still going, so almost every match is decided in one batch.
+    """
+    wins = np.zeros(m, dtype=np.int64)
+    losses = np.zeros(m, dtype=np.int64)
+    won = np.zeros(m, dtype=bool)
+    going = np.arange(m)
+    while going.size:
+        results = (rng.choice(3, (going.size, 16), p=policy.rps_weights) - rng.integers(0, 3, (going.size, 16))) % 3
+        total_wins = wins[going, None] + np.cumsum(results == 1, axis=1)
+        total_losses = losses[going, None] + np.cumsum(results == 2, axis=1)
+        over = (total_wins >= puzzle.wins) | (total_losses >= puzzle.wins)
+        finished = over.any(axis=1)
+        last = over.argmax(axis=1)
+        rows = np.arange(going.size)
+        won[going[finished]] = total_wins[rows, last][finished] >= puzzle.wins
+        wins[going[~finished]] = total_wins[~finished, -1]
+        losses[going[~finished]] = total_losses[~finished, -1]
+        going = going[~finished]
+    return won
+
+
+def _wordles(policy: Policy, puzzle: Any, rng: Any, m: int) -> Any:
+    """Play m games of Wordle, and return a boolean array of whether the player won each game."""
+    return rng.random(m) < policy.wordle_rate
+
+
+def _unscrambles(policy: Policy, puzzle: Any, rng: Any, m: int) -> Any:
+    """Play m rounds of unscrambling words, and return a boolean array of whether the player won each round."""
+    return (rng.random((m, puzzle.rounds)) < policy.unscramble_rate).all(axis=1)
+
+
+def _sequences(policy: Policy, puzzle: Any, rng: Any, m: int) -> Any:
+    """Play m attempts at each puzzle of a sequence, and return a boolean array of whether the player won all of
+    the puzzles of each attempt."""
+    won = np.ones(m, dtype=bool)
+    for part in puzzle.puzzles:
+        won &= PUZZLES[part.kind][0](policy, part, rng, m)
+    return won
+
+
+def _exchanges(policy: Policy, puzzle: Any, rng: Any, m: int) -> Any:
+    """Make m exchanges, which always succeed on the route to a win."""
+    return np.ones(m, dtype=bool)
+
+
+def _rps_match_py(policy: Policy, puzzle: Any, rng: random.Random) -> bool:
+    """Play one rock paper scissors match, and return whether the player won."""
+    wins = losses = 0
+    while wins < puzzle.wins and losses < puzzle.wins:
+        result = (rng.choices((ROCK, PAPER, SCISSORS), policy.rps_weights)[0] - rng.randrange(3)) % 3
+        wins += result == 1
+        losses += result == 2
+    return wins == puzzle.wins
+
+
+def _wordle_py(policy: Policy, puzzle: Any, rng: random.Random) -> bool:
+    """Play one game of Wordle, and return whether the player won."""
+    return rng.random() < policy.wordle_rate
+
+
+def _unscramble_py(policy: Policy, puzzle: Any, rng: random.Random) -> bool:
+    """Play one round of unscrambling words, and return whether the player won."""
+    return all(rng.random() < policy.unscramble_rate for _ in range(puzzle.rounds))
+
+
+def _sequence_py(policy: Policy, puzzle: Any, rng: random.Random) -> bool:
+    """Play the puzzles of a sequence until one is lost, and return whether the player won all of them."""
+    return all(PUZZLES[part.kind][1](policy, part, rng) for part in puzzle.puzzles)
+
+
+def _exchange_py(policy: Policy, puzzle: Any, rng: random.Random) -> bool:
+    """Make one exchange, which always succeeds on the route to a win."""
+    return True
+
+
+# The simulation of each kind of puzzle, batched (for NumPy) and for a single attempt (for pure Python)
+PUZZLES: dict[str, tuple[Callable[[Policy, Any, Any, int], Any], Callable[[Policy, Any, random.Random], bool]]] = {
+    "rock paper scissors": (_rps_matches, _rps_match_py),
+    "wordle": (_wordles, _wordle_py),
+    "unscramble": (_unscrambles, _unscramble_py),
+    "sequence": (_sequences, _sequence_py),
+    "exchange": (_exchanges, _exchange_py),
+}
+
+
+# ----------------------------------------------------------------------------------------------
+# Simulation
+# ----------------------------------------------------------------------------------------------
+
+@dataclass
+class BalanceReport:
+    """The results of simulating many playthroughs.
+
+    Instance Attributes:
+        - policy: the name of the policy the players followed
+        - turns: the turn budget of the game
+        - games: the number of playthroughs simulated
+        - wins: the number of playthroughs won
+        - turn_counts: turn_counts[t] is the number of playthroughs that took t turns in total
+        - score_counts: score_counts[s] is the number of playthroughs that ended with a score of s
+    """
+    policy: str
+    turns: int
+    games: int
+    wins: int
+    turn_counts: list[int]
+    score_counts: list[int]
+
+    @property
+    def win_rate(self) -> float:
+        """Return the fraction of playthroughs that were won."""
+        return self.wins / self.games if self.games else 0.0
+
+    def percentile(self, counts: list[int], fraction: float) -> int:
+        """Return the smallest value v such that at least the given fraction of playthroughs have a value <= v
+        according to counts (either turn_counts or score_counts)."""
+        needed = math.ceil(fraction * self.games)
+        total = 0
+        for value, count in enumerate(counts):
+            total += count
+            if total >= needed:
+                return value
+        return len(counts) - 1
+
+    def summary(self) -> str:
+        """Return a description of these results for people to read."""
+        over_budget = sum(self.turn_counts[self.turns:])
+        passing = sum(self.score_counts[KEEP_PLAYING_SCORE:])
+        return "\n".join([
+            f"{self.games} games with the '{self.policy}' policy and {self.turns} turns:",
+            f"  win rate: {self.win_rate:.2%}",
+            f"  turns: median {self.percentile(self.turn_counts, 0.5)}, "
+            f"90th percentile {self.percentile(self.turn_counts, 0.9)}, "
+            f"{over_budget / self.games:.2%} of games used all {self.turns} turns",
+            f"  score: median {self.percentile(self.score_counts, 0.5)}, "
+            f"{passing / self.games:.2%} of games reached {KEEP_PLAYING_SCORE} points",
+        ])
+
+
+def _add_counts(total: list[int], counts: list[int]) -> None:
+    """Add counts to total element by element, extending total if counts is longer."""
+    total.extend([0] * (len(counts) - len(total)))
+    for i, count in enumerate(counts):
+        total[i] += count
+
+
+def _simulate_batch(args: tuple[list[Step], Policy, int, int, int]) -> tuple[int, list[int], list[int]]:
+    """Simulate the given number of playthroughs of steps with the given policy, turn budget and seed, and return
+    the number of wins and the counts of total turns and final scores (see BalanceReport)."""
+    steps, policy, turns, games, seed = args
+    if np is None:
+        return _simulate_batch_py(steps, policy, turns, games, seed)
+    rng = np.random.default_rng(seed)
+
+    # failures[g, k] is the number of times player g failed the puzzle of step k before winning it. A player
+    # never fails more than turns times, since they have run out of turns by then.
+    failures = np.zeros((games, len(steps)), dtype=np.int64)
+    for k, step in enumerate(steps):
+        if step.puzzle is not None:
+            play = PUZZLES[step.puzzle.kind][0]
+            going = np.arange(games)
+            while going.size and failures[going[0], k] < turns:
+                going = going[~play(policy, step.puzzle, rng, going.size)]
+                failures[going, k] += 1
+
+    cost = np.array([step.turns for step in steps], dtype=np.int64)
+    attempt_cost = np.array([step.puzzle.turns if step.puzzle is not None else 0 for step in steps], dtype=np.int64)
+    after = np.cumsum([step.points for step in steps])
+    before = after - [step.points for step in steps]
+    detours = rng.poisson(policy.detour_mean, games) if policy.detour_mean else np.zeros(games, dtype=np.int64)
+
+    # The game is lost after the first command that leaves no turns while the score is below KEEP_PLAYING_SCORE:
+    # either a failed attempt at a puzzle, or a step that takes a turn.
+    used = detours[:, None] + np.cumsum(cost + failures * attempt_cost, axis=1)
+    lost_failing = (failures > 0) & (used - cost >= turns) & (before < KEEP_PLAYING_SCORE)
+    lost_step = (cost > 0) & (used >= turns) & (after < KEEP_PLAYING_SCORE)
+    lost_at = lost_failing | lost_step
+    lost = lost_at.any(axis=1) | (detours >= turns)
+    first = lost_at.argmax(axis=1)
+
+    scores = np.where(lost_failing[np.arange(games), first], before[first], after[first])
+    scores = np.where(detours >= turns, 0, np.where(lost, scores, after[-1]))
+    total_turns = np.where(lost, np.minimum(used[:, -1], turns), used[:, -1])
+    return (int(games - lost.sum()), np.bincount(total_turns).tolist(), np.bincount(scores).tolist())
+
+
+def _simulate_batch_py(steps: list[Step], policy: Policy, turns: int, games: int,
+                       seed: int) -> tuple[int, list[int], list[int]]:
+    """Return the same as _simulate_batch, simulating one playthrough at a time without NumPy."""
+    rng = random.Random(seed)
+    wins = 0
+    turn_counts = []
+    score_counts = []
+    for _ in range(games):
+        used, score, lost = _poisson(rng, policy.detour_mean), 0, False
+        if used >= turns:
+            lost = True
+        for step in steps:
+            if lost:
+                break
+            failures = 0
+            if step.puzzle is not None:
+                while not lost and failures < turns and not PUZZLES[step.puzzle.kind][1](policy, step.puzzle, rng):
+                    failures += 1
+                    used += step.puzzle.turns
+                    lost = used >= turns and score < KEEP_PLAYING_SCORE
+                if lost:
+                    break
+            used += step.turns
+            score += step.points
+            lost = step.turns > 0 and used >= turns and score < KEEP_PLAYING_SCORE
+        wins += not lost
+        _add_counts(turn_counts, [0] * min(used, turns if lost else used) + [1])
+        _add_counts(score_counts, [0] * score + [1])
+    return wins, turn_counts, score_counts
+
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    """Return a random number from the Poisson distribution with the given mean."""
+    limit = math.exp(-mean)
+    count, product = 0, rng.random()
+    while product > limit:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def simulate(game_data_file: str, policy: Policy, games: int, turns: int = 25, initial_location_id: int = 1,
+             seed: Optional[int] = None, processes: Optional[int] = None) -> BalanceReport:
+    """Simulate the given number of playthroughs of the game in the given file by players following policy,
+    in batches spread over a pool of processes (one per CPU by default), and return the results.
+
+    The same seed always gives the same results with the same number of games.
+    """
+    steps = plan_route(game_data_file, initial_location_id, turns)
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    batches = [(steps, policy, turns, min(_BATCH, games - start), seed + i)
+               for i, start in enumerate(range(0, games, _BATCH))]
+    processes = processes or os.cpu_count() or 1
+    if processes == 1 or len(batches) == 1:
+        results = map(_simulate_batch, batches)
+    else:
+        with Pool(processes) as pool:
+            results = pool.map(_simulate_batch, batches)
+
+    report = BalanceReport(policy.name, turns, games, 0, [], [])
+    for wins, turn_counts, score_counts in results:
+        report.wins += wins
+        _add_counts(report.turn_counts, turn_counts)
+        _add_counts(report.score_counts, score_counts)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many playthroughs to see how hard the game is.")
+    parser.add_argument('game_data_file', nargs='?', default='game_data.json')
+    parser.add_argument('--games', type=int, default=1_000_000)
+    parser.add_argument('--policy', choices=sorted(POLICIES), action='append',
+                        help="policy of the simulated players; may be given more than once (default: all)")
+    parser.add_argument('--turns', type=int, default=25, help="the turn budget of the game")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--processes', type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    for name in args.policy or sorted(POLICIES):
+        print(simulate(args.game_data_file, POLICIES[name], args.games, args.turns, seed=args.seed,
+                       processes=args.processes).summary())
@@ -0,0 +1,246 @@
+"""CSC111 Project 1: Text Adventure Game - Benchmarks
+
+This module measures how fast the game is: loading the world, playing turns headlessly, checking Wordle guesses,
+keeping the event log, storing and querying game results, and how much memory each game session uses. Results are
+saved as JSON, and can be compared against a saved baseline to flag regressions:
+
+    python benchmarks.py --output baseline.json
+    python benchmarks.py --baseline baseline.json
+
+Timings are the best of several repeats, which is the least noisy estimate of how fast the code can run.
+"""
+from __future__ import annotations
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import Callable, Optional
+
+import wordlist
+import world
+from adventure import AdventureGame
+from output import NullSink
+from proj1_event_logger import Event, EventList
+from results_store import GameResult, ResultsStore
+from wordle import pattern_code
+from wordlist import load_word_list
+
+GAME_DATA_FILE = 'game_data.json'
+
+# The commands played by every game in the turn benchmark: a loop of moves, menu commands and a wrong input
+TURN_SCRIPT = ["go east", "go north", "kitchen", "room", "look", "inventory", "score", "bogus", "go south",
+               "go west", "route charger", "undo", "redo"]
+
+
+@dataclass
+class Result:
+    """The result of one benchmark.
+
+    Instance Attributes:
+        - name: the name of the benchmark
+        - value: the measured value
+        - unit: the unit of value
+        - higher_is_better: whether a higher value means the code got faster (or smaller)
+    """
+    name: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+
+def _best_time(run: Callable[[], object], repeat: int) -> float:
+    """Return the shortest time in seconds taken by run over the given number of calls."""
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_load(repeat: int) -> list[Result]:
+    """Measure loading the world from disk (cold) and from the cache shared by the games of a process (warm)."""
+    def cold() -> None:
+        world._worlds.clear()
+        world.load_world(GAME_DATA_FILE)
+
+    cold_time = _best_time(cold, repeat)
+    warm_time = _best_time(lambda: [world.load_world(GAME_DATA_FILE) for _ in range(1000)], repeat) / 1000
+    return [Result("load_cold", cold_time * 1e3, "ms", False),
+            Result("load_warm", warm_time * 1e6, "us", False)]
+
+
+def bench_turns(turns: int, repeat: int) -> list[Result]:
+    """Measure how many turns per second a game plays headlessly, writing its output to a NullSink."""
+    sink = NullSink()
+
+    def play() -> None:
+        played = 0
+        seed = 0
+        while played < turns:
+            game = AdventureGame(GAME_DATA_FILE, 1, turns=10 ** 9, time_limit=10 ** 9, seed=seed)
+            sink.write_result(game.start())
+            for command in TURN_SCRIPT:
+                sink.write_result(game.step(command))
+            played += len(TURN_SCRIPT)
+            seed += 1
+
+    played = -(-turns // len(TURN_SCRIPT)) * len(TURN_SCRIPT)
+    return [Result("turns_per_second", played / _best_time(play, repeat), "turns/s", True)]
+
+
+def bench_wordle(repeat: int) -> list[Result]:
+    """Measure checking guesses against the word list, and scoring guesses against an answer, over words.txt."""
+    words = load_word_list()
+    guesses = list(words)
+    answer = guesses[len(guesses) // 2]
+    validate = _best_time(lambda: [guess in words for guess in guesses], repeat)
+    score = _best_time(lambda: [pattern_code(guess, answer) for guess in guesses], repeat)
+
+    def load_words() -> None:
+        wordlist._word_lists.clear()
+        load_word_list()
+
+    load = _best_time(load_words, repeat)
+    return [Result("wordle_validate_per_second", len(guesses) / validate, "words/s", True),
+            Result("wordle_feedback_per_second", len(guesses) / score, "words/s", True),
+            Result("word_list_load", load * 1e3, "ms", False)]
+
+
+def bench_event_log(events: int, repeat: int) -> list[Result]:
+    """Measure appending events to an event log, reading its id log, and removing every event again."""
+    commands = ["go east", "go west", "look", None]
+
+    def fill() -> EventList:
+        log = EventList()
+        for i in range(events):
+            log.add_event(Event(i % 7 + 1, ""), commands[i % 4])
+        return log
+
+    append_time = _best_time(fill, repeat)
+    id_log_time = _best_time(fill().get_id_log, repeat)
+    undo_time = float('inf')
+    for _ in range(repeat):
+        log = fill()
+        start = time.perf_counter()
+        for _ in range(events):
+            log.remove_last_event()
+        undo_time = min(undo_time, time.perf_counter() - start)
+    return [Result("event_append_per_second", events / append_time, "events/s", True),
+            Result("event_undo_per_second", events / undo_time, "events/s", True),
+            Result("event_id_log", id_log_time * 1e3, "ms", False)]
+
+
+def bench_results(rows: int, repeat: int) -> list[Result]:
+    """Measure adding the given number of random game results to a results database in batches, then querying the
+    leaderboards and a player's history."""
+    rng = random.Random(0)
+    endings = ["submitted", "quit", "out of turns", "out of time"]
+    results = [GameResult(f"player{rng.randrange(rows // 50 + 1)}", rng.randrange(100), rng.randrange(26),
+                          rng.uniform(60, 600), rng.choice(endings), {"charger": 1}, [1, 2, 3, 3, 2, 1], i)
+               for i in range(rows)]
+    with tempfile.TemporaryDirectory() as directory:
+        store = ResultsStore(os.path.join(directory, "results.db"))
+        start = time.perf_counter()
+        for i in range(0, rows, 1000):
+            store.add(results[i:i + 1000])
+        add_time = time.perf_counter() - start
+        top = _best_time(store.top_scores, repeat)
+        fastest = _best_time(store.fastest, repeat)
+        history = _best_time(lambda: store.history("player1"), repeat)
+        store.close()
+    return [Result("results_add_per_second", rows / add_time, "results/s", True),
+            Result("results_top_scores", top * 1e3, "ms", False),
+            Result("results_fastest", fastest * 1e3, "ms", False),
+            Result("results_history", history * 1e3, "ms", False)]
+
+
+def bench_memory(counts: list[int]) -> list[Result]:
+    """Measure the memory used per started game session, with the given numbers of sessions alive at once."""
+    world.load_world(GAME_DATA_FILE)
+    load_word_list()
+    results = []
+    for count in counts:
+        gc.collect()
+        tracemalloc.start()
+        games = []
+        for seed in range(count):
+            game = AdventureGame(GAME_DATA_FILE, 1, seed=seed)
+            game.start()
+            games.append(game)
+        used, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append(Result(f"memory_per_session_{count}", used / count / 1024, "KiB", False))
+        del games
+    return results
+
+
+def run_all(quick: bool = False) -> list[Result]:
+    """Run every benchmark and return the results. If quick is True, use smaller sizes and fewer repeats."""
+    repeat = 3 if quick else 5
+    return (bench_load(repeat)
+            + bench_turns(10_000 if quick else 100_000, repeat)
+            + bench_wordle(repeat)
+            + bench_event_log(100_000 if quick else 1_000_000, repeat)
+            + bench_results(20_000 if quick else 1_000_000, repeat)
+            + bench_memory([1, 1000] if quick else [1, 1000, 10_000]))
+
+
+def save_results(results: list[Result], path: str) -> None:
+    """Save the given results to a JSON file, along with the Python version and machine they were measured on."""
+    with open(path, 'w') as f:
+        json.dump({'python': sys.version.split()[0], 'machine': platform.platform(),
+                   'results': [asdict(r) for r in results]}, f, indent=1)
+
+
+def load_results(path: str) -> list[Result]:
+    """Return the results saved to the given JSON file by save_results."""
+    with open(path) as f:
+        return [Result(**r) for r in json.load(f)['results']]
+
+
+def compare(results: list[Result], baseline: list[Result], threshold: float = 0.2) -> list[str]:
+    """Return a description of every result that is worse than the baseline result of the same name by more than
+    the given fraction."""
+    regressions = []
+    old = {r.name: r for r in baseline}
+    for result in results:
+        before = old.get(result.name)
+        if before is None or before.value == 0:
+            continue
+        change = (result.value - before.value) / before.value
+        if not result.higher_is_better:
+            change = -change
+        if change < -threshold:
+            regressions.append(f"{result.name}: {before.value:.4g} -> {result.value:.4g} {result.unit} "
+                               f"({abs(change):.0%} worse)")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the text adventure game.")
+    parser.add_argument('--output', metavar='FILE', help="save the results to FILE")
+    parser.add_argument('--baseline', metavar='FILE', help="compare the results with the results saved in FILE")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="fraction by which a result may be worse than the baseline (default: 0.2)")
+    parser.add_argument('--quick', action='store_true', help="use smaller sizes, for a quick check")
+    args = parser.parse_args()
+
+    measured = run_all(args.quick)
+    for r in measured:
+        print(f"{r.name:32} {r.value:14.4g} {r.unit}")
+    if args.output:
+        save_results(measured, args.output)
+    failures: Optional[list[str]] = None
+    if args.baseline:
+        failures = compare(measured, load_results(args.baseline), args.threshold)
+        print("\n".join(["Regressions:"] + failures) if failures else "No regressions.")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,231 @@
+"""CSC111 Project 1: Text Adventure Game - Command Router
+
+This module maps what the player types to the handler of a command, in constant time.
+
+Menu commands (e.g. "look") are registered with a handler each. Moving along one of a location's
+available commands, and picking up one of its items, each have a single handler. Besides exact commands, the player
+can type an alias (e.g. "n" for "go north") or any prefix that matches only one command (e.g. "inv" for "inventory").
+Input that means nothing else is matched against the commands and item names with a typo or two (e.g. "go est" for
+"go east"): if exactly one of them is closest, the player meant it, and otherwise the closest are suggested.
+Some menu commands take an argument after a space (e.g. "route charger"), which is passed on to their handler.
+
+The index of aliases and prefixes, and the BK-tree of typos (see fuzzy.BKTree), for each location's available
+commands are built once when the world is loaded (see build_exit_index and build_exit_tree), and the ones for menu
+commands once when they are registered.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, replace
+from typing import TYPE_CHECKING, Callable, Mapping, Optional
+
+from fuzzy import BKTree, max_typos
+from game_entities import Location
+
+if TYPE_CHECKING:
+    from adventure import AdventureGame, Routine
+
+# A handler applies a command to a game. It returns a routine if the command needs more input from the player.
+Handler = Callable[['AdventureGame', str], Optional['Routine']]
+
+# Shorthands the player can type for available commands, if the location has that command
+EXIT_ALIASES = {
+    "n": "go north", "north": "go north",
+    "s": "go south", "south": "go south",
+    "e": "go east", "east": "go east",
+    "w": "go west", "west": "go west",
+    "u": "go up", "up": "go up",
+    "d": "go down", "down": "go down",
+}
+
+
+def _prefix_index(commands: list[str], aliases: Mapping[str, str]) -> dict[str, tuple[str, ...]]:
+    """Return a mapping from every alias and proper prefix of the given commands to the commands it could mean.
+
+    Aliases always mean exactly one command, even if they are also the prefix of other commands.
+    """
+    index = {}
+    for command in commands:
+        for end in range(1, len(command)):
+            prefix = command[:end]
+            index[prefix] = index.get(prefix, ()) + (command,)
+    for alias, command in aliases.items():
+        if command in commands:
+            index[alias] = (command,)
+    return index
+
+
+def build_exit_index(available_commands: Mapping[str, int]) -> dict[str, tuple[str, ...]]:
+    """Return the alias and prefix index for a location with the given available commands."""
+    return _prefix_index(list(available_commands), EXIT_ALIASES)
+
+
+def build_exit_tree(available_commands: Mapping[str, int]) -> BKTree:
+    """Return the BK-tree of typos for a location with the given available commands."""
+    return BKTree(available_commands)
+
+
+@dataclass(frozen=True, slots=True)
+class Route:
+    """What the player's input means.
+
+    Instance Attributes:
+        - command: the full command the player meant, or what they typed if it is ambiguous
+        - handler: the handler of the command, or None if the input is ambiguous or a misspelling that must be
+          confirmed
+        - candidates: the commands the input could mean, if it is ambiguous or a misspelling that must be confirmed
+        - argument: the argument given after the command, for commands that take one
+        - corrected: whether the input was a misspelling of the command
+    """
+    command: str
+    handler: Optional[Handler]
+    candidates: tuple[str, ...] = ()
+    argument: str = ""
+    corrected: bool = False
+
+
+class CommandRouter:
+    """A dispatch table from commands to their handlers.
+
+    Instance Attributes:
+        - menu: the menu commands, in the order they were registered
+        - menu_line: the line telling the player which menu commands they can use
+    """
+    # Private Instance Attributes:
+    #   - _handlers: a mapping from each menu command to its handler
+    #   - _aliases: a mapping from each alias of a menu command to that command
+    #   - _takes_argument: the menu commands that can be followed by an argument
+    #   - _confirm_typos: the menu commands that are only suggested, never run, when the input is a misspelling
+    #   - _menu_index: the alias and prefix index of the menu commands
+    #   - _menu_tree: the BK-tree of typos of the menu commands
+    #   - _move_handler: the handler for a location's available commands
+    #   - _item_handler: the handler for items at a location
+
+    menu: list[str]
+    menu_line: str
+    _handlers: dict[str, Handler]
+    _aliases: dict[str, str]
+    _takes_argument: set[str]
+    _confirm_typos: set[str]
+    _menu_index: dict[str, tuple[str, ...]]
+    _menu_tree: BKTree
+    _move_handler: Optional[Handler]
+    _item_handler: Optional[Handler]
+
+    def __init__(self) -> None:
+        """Initialize a router with no commands."""
+        self.menu = []
+        self.menu_line = "What to do? Choose from: "
+        self._handlers = {}
+        self._aliases = {}
+        self._takes_argument = set()
+        self._confirm_typos = set()
+        self._menu_index = {}
+        self._menu_tree = BKTree(())
+        self._move_handler = None
+        self._item_handler = None
+
+    def register(self, command: str, handler: Handler, aliases: tuple[str, ...] = (),
+                 takes_argument: bool = False, confirm_typos: bool = False) -> None:
+        """Register the given handler for the given menu command, which the player can also type as any of aliases.
+
+        If takes_argument is True, the player can follow the command with an argument, and the handler is given the
+        command and argument separated by a space (e.g. "route charger"). If confirm_typos is True, a misspelling of
+        the command is only suggested to the player instead of being run, for commands that are costly to run by
+        mistake (e.g. "quit").
+        """
+        self.menu.append(command)
+        self.menu_line = "What to do? Choose from: " + ", ".join(self.menu)
+        self._handlers[command] = handler
+        if takes_argument:
+            self._takes_argument.add(command)
+        if confirm_typos:
+            self._confirm_typos.add(command)
+        for alias in aliases:
+            self._aliases[alias] = command
+        self._menu_index = _prefix_index(self.menu, self._aliases)
+        self._menu_tree = BKTree(self.menu)
+
+    def register_move(self, handler: Handler) -> None:
+        """Register the handler for moving along one of a location's available commands."""
+        self._move_handler = handler
+
+    def register_item(self, handler: Handler) -> None:
+        """Register the handler for an item at the player's location."""
+        self._item_handler = handler
+
+    def resolve(self, location: Location, exit_index: Mapping[str, tuple[str, ...]], text: str,
+                exit_tree: Optional[BKTree] = None, item_tree: Optional[BKTree] = None) -> Optional[Route]:
+        """Return what the given input means at the given location, whose alias and prefix index is exit_index,
+        or None if it doesn't mean anything there.
+
+        Exact commands and item names take priority over commands with an argument, which take priority over aliases,
+        which take priority over prefixes (so "s" means "go south" where the location has that command, even though
+        it is also a prefix of "score", and means nothing where it doesn't). Typos are only matched if the input means
+        nothing else, against the menu commands, the location's available commands (if their BK-tree exit_tree is
+        given) and the names of the items at the location (if the BK-tree item_tree of every item name is given).
+        A single match is used as if it had been typed, unless it is a command registered with confirm_typos, which is
+        only suggested when it is reached through a prefix or a typo.
+        """
+        if text in location.available_commands:
+            return Route(text, self._move_handler)
+        if text in self._handlers:
+            return Route(text, self._handlers[text])
+        if text in location.items:
+            return Route(text, self._item_handler)
+        head, _, argument = text.partition(" ")
+        if argument:
+            commands = (head,) if head in self._handlers else self._menu_index.get(head, ())
+            corrected = not commands
+            if corrected:
+                commands = self._menu_tree.closest(head, max_typos(head))
+            if len(commands) == 1 and commands[0] in self._takes_argument:
+                return Route(commands[0], self._handlers[commands[0]], argument=argument.strip(), corrected=corrected)
+
+        alias = EXIT_ALIASES.get(text)
+        if alias in location.available_commands:
+            return Route(alias, self._move_handler)
+        if alias is not None:  # a direction the player can't go here, never a prefix of a menu command
+            return None
+        if text in self._aliases:
+            return Route(self._aliases[text], self._handlers[self._aliases[text]])
+
+        candidates = exit_index.get(text, ()) + self._menu_index.get(text, ())
+        if not candidates:
+            candidates = self._typos(location, text, exit_tree, item_tree)
+            if len(candidates) == 1 and candidates[0] not in self._confirm_typos:
+                return replace(self.resolve(location, exit_index, candidates[0]), corrected=True)
+        if len(candidates) == 1 and candidates[0] in self._confirm_typos and text != candidates[0]:
+            return Route(text, None, candidates)
+        elif len(candidates) == 1:
+            return self.resolve(location, exit_index, candidates[0])
+        elif candidates:
+            return Route(text, None, candidates)
+        else:
+            return None
+
+    def _typos(self, location: Location, text: str, exit_tree: Optional[BKTree],
+               item_tree: Optional[BKTree]) -> tuple[str, ...]:
+        """Return the commands and item names at the given location closest to the given input, if they are within
+        max_typos(text) edits of it."""
+        radius = max_typos(text)
+        if radius == 0:
+            return ()
+        found = self._menu_tree.search(text, radius)
+        if exit_tree is not None:
+            found += exit_tree.search(text, radius)
+        if item_tree is not None:
+            found += [(distance, name) for distance, name in item_tree.search(text, radius) if name in location.items]
+        if not found:
+            return ()
+        closest = min(distance for distance, _ in found)
+        return tuple(sorted({name for distance, name in found if distance == closest}))
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
@@ -0,0 +1,156 @@
+"""CSC111 Project 1: Text Adventure Game - Typo Matching
+
+This module finds the words closest to a misspelled one, so that the game can understand a player's typos instead of
+making them type a command again.
+
+Words are compared by edit distance: the number of letters that must be inserted, deleted, replaced or swapped with
+the next letter to turn one word into the other. The words of a vocabulary are kept in a BK-tree, in which every
+word's children are grouped by their distance from it. Since edit distance obeys the triangle inequality, a search
+for the words within a few edits of some input only needs to visit the children whose distance is within that many
+edits of their parent's distance to the input, instead of comparing the input to every word in the vocabulary.
+
+    >>> tree = BKTree(["look", "inventory", "score", "quit"])
+    >>> tree.closest("lokk", 1)
+    ('look',)
+"""
+from __future__ import annotations
+import os
+from typing import Iterable, Iterator, Optional
+
+from wordlist import WORDS_FILE, load_word_list
+
+# Inputs shorter than each length are allowed that many fewer typos (see max_typos)
+TYPO_LENGTHS = (3, 8)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Return the number of single letter insertions, deletions and replacements, and swaps of two letters, needed
+    to turn a into b (the Damerau-Levenshtein distance between them).
+
+    >>> edit_distance("kitten", "sitting")
+    3
+    >>> edit_distance("ca", "abc")
+    2
+    """
+    # Letters the words start or end with in common never need editing
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < len(a) - start and end < len(b) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+    if not a or not b:
+        return len(a) + len(b)
+
+    # table[i + 1][j + 1] is the distance between a[:i] and b[:j]. Its first row and column are larger than any
+    # distance, so that a swap never reaches back past the start of either word.
+    infinity = len(a) + len(b)
+    table = [[infinity] * (len(b) + 2), [infinity, *range(len(b) + 1)]]
+    table += [[infinity, i] + [0] * len(b) for i in range(1, len(a) + 1)]
+    last_row = {}  # the last row in which each letter of a was seen
+    for i in range(1, len(a) + 1):
+        letter = a[i - 1]
+        above, row = table[i], table[i + 1]
+        last_column = 0  # the last column in which letter matched b, in this row
+        for j in range(1, len(b) + 1):
+            other = b[j - 1]
+            k, m = last_row.get(other, 0), last_column
+            if letter == other:
+                last_column = j
+                best = above[j]
+            else:
+                best = min(above[j], row[j], above[j + 1]) + 1
+            row[j + 1] = min(best, table[k][m] + (i - k - 1) + 1 + (j - m - 1))
+        last_row[letter] = i
+    return table[-1][-1]
+
+
+def max_typos(text: str) -> int:
+    """Return the number of typos to allow in the given input: none for very short inputs, more for long ones.
+
+    >>> [max_typos(text) for text in ("go", "lok", "inventroy")]
+    [0, 1, 2]
+    """
+    return sum(len(text) >= length for length in TYPO_LENGTHS)
+
+
+class BKTree:
+    """A vocabulary of words, searchable by edit distance.
+
+    Instance Attributes:
+        - words: the words in this tree, in the order they were given
+    """
+    # Private Instance Attributes:
+    #   - _root: the first word and its children, or None if the tree is empty. Each node is a (word, children) pair,
+    #            where children maps each distance to the node of the child at that distance from word.
+
+    words: tuple[str, ...]
+    _root: Optional[tuple[str, dict[int, tuple]]]
+
+    def __init__(self, words: Iterable[str]) -> None:
+        """Initialize a tree of the given words, ignoring duplicates."""
+        self.words = tuple(dict.fromkeys(words))
+        self._root = None
+        for word in self.words:
+            if self._root is None:
+                self._root = (word, {})
+                continue
+            node = self._root
+            while True:
+                distance = edit_distance(word, node[0])
+                child = node[1].get(distance)
+                if child is None:
+                    node[1][distance] = (word, {})
+                    break
+                node = child
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def search(self, text: str, radius: int) -> list[tuple[int, str]]:
+        """Return (distance, word) for every word in this tree within radius edits of text, closest first."""
+        found = []
+        stack = [self._root] if self._root is not None else []
+        while stack:
+            word, children = stack.pop()
+            distance = edit_distance(text, word)
+            if distance <= radius:
+                found.append((distance, word))
+            stack.extend(child for d, child in children.items() if distance - radius <= d <= distance + radius)
+        return sorted(found)
+
+    def closest(self, text: str, radius: int) -> tuple[str, ...]:
+        """Return the words in this tree within radius edits of text that are closest to it, in sorted order."""
+        found = self.search(text, radius)
+        return tuple(word for distance, word in found if distance == found[0][0]) if found else ()
+
+
+_trees: dict[str, BKTree] = {}
+
+
+def load_word_tree(filen: str = WORDS_FILE) -> BKTree:
+    """Return the BKTree of the word list in the given file (see wordlist.load_word_list).
+
+    The tree is only built the first time it is loaded in this process.
+    """
+    path = os.path.abspath(filen)
+    tree = _trees.get(path)
+    if tree is None:
+        tree = BKTree(load_word_list(path))
+        _trees[path] = tree
+    return tree
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
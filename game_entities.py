@@ -18,11 +18,11 @@ please consult our Course Syllabus.
 
 This file is Copyright (c) 2025 CSC111 Teaching Team
 """
-from dataclasses import dataclass
-from typing import Any
+from dataclasses import dataclass, field
+from typing import Any, Optional
 
 
-@dataclass
+@dataclass(frozen=True)
 class Item:
     """An item in our text adventure game world.
     Instance Attributes:
@@ -31,6 +31,8 @@ class Item:
         - start_position: The location id where this item originally is
         - target_position: The location this item should be depositied at
         - target_points: Points earned by depositing item at correct location
+        - puzzle: the settings of the puzzle played to pick up this item at its start position (see puzzles.py),
+                  or None if it can just be picked up
     Representation Invariants:
         - start_position != target_position
     """
@@ -47,6 +49,7 @@ class Item:
     start_position: int
     target_position: int
     target_points: int
+    puzzle: Optional[dict[str, Any]] = field(default=None, compare=False)
 
 
 # Note: Other entities you may want to add, depending on your game plan:
@@ -59,6 +62,7 @@ class Location:
 
     Instance Attributes:
         - id_num: integer id for this location
+        - name: the short name of this location (e.g. "Dorm Room"), or "" if it has none
         - brief_description: brief description of this location
         - long_description: a longer description of the location
         - available_commands: a mapping of available commands at this location to
@@ -69,6 +73,7 @@ class Location:
     Representation Invariants:
     """
     id_num: int
+    name: str
     brief_description: str
     long_description: str
     available_commands: dict[str, int]
@@ -81,12 +86,14 @@ class Location:
     # The only thing you must NOT change is the name of this class: Location.
     # All locations in your game MUST be represented as an instance of this class.
 
-    def __init__(self, location_id: int, brief_description: str, long_description: str, other: list[Any]) -> None:
+    def __init__(self, location_id: int, brief_description: str, long_description: str, other: list[Any],
+                 name: str = "") -> None:
         # vars[1] = availablecoms, 2 = items, 3 = visited bool, so that pythonTA doesn't get mad
         """Initialize a new location.
         """
 
         self.id_num = location_id
+        self.name = name
         self.brief_description = brief_description
         self.long_description = long_description
         self.available_commands = other[0]
@@ -0,0 +1,420 @@
+"""CSC111 Project 1: Text Adventure Game - Game Server
+
+This module hosts many AdventureGame sessions at once over a plain TCP line protocol.
+Every connection is a coroutine with its own game, so one process can serve thousands of players.
+Time limits are enforced by one DeadlineScheduler shared by every session: players are warned as their time runs
+out, and their game ends (and idle players are disconnected) on time, without waiting for their next input.
+After each step the server sends all of the game's output at once, one line at a time followed by the prompt for
+the next input (see output.StreamSink), and reads one line of input per step. Before playing, a player can send
+'width <characters>' to have descriptions wrapped for their display; the console client sends its terminal's width.
+The result of every finished game can be added to a results database (see results_store), from a background thread
+so that no session waits for it.
+
+Run the server with:  python game_server.py --port 8111
+Play on it with:      python game_server.py --connect --port 8111
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import cProfile
+import os
+import secrets
+import shutil
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from adventure import ACTION_PROMPT, AdventureGame, TurnResult
+from fuzzy import load_word_tree
+from metrics import METRICS
+from output import StreamSink
+from results_store import ResultsWriter, game_result
+from savegame import Checkpointer, delete_save, load_game
+from scheduler import Deadline, DeadlineScheduler
+
+# Players are warned when they have this many seconds left to finish their game
+TIME_WARNINGS = (60, 10)
+
+# The longest name a player can give
+MAX_NAME_LENGTH = 32
+
+# The narrowest and widest displays descriptions can be wrapped for, in characters
+MIN_WIDTH, MAX_WIDTH = 20, 500
+
+
+@dataclass(eq=False)
+class Session:
+    """One player connected to the server.
+
+    Instance Attributes:
+        - session_id: unique id of this session on its server
+        - game: the game being played in this session
+        - writer: the stream used to send output to the player
+        - sink: writes the output of each turn to writer
+        - last_active: the time (from time.monotonic) of the player's last input
+        - task: the task running this session
+        - save_code: the code the player can use to resume this session's game, or None if it isn't saved
+        - checkpointer: saves this session's game after every turn, or None if it isn't saved
+        - idle_deadline: disconnects the player if they don't send any input in time, or None before the game starts
+        - time_deadlines: warn the player as their time runs out, and end their game when it does
+        - player: the name the player gave, or None if they haven't given one
+    """
+    session_id: int
+    game: AdventureGame
+    writer: asyncio.StreamWriter
+    last_active: float = field(default_factory=time.monotonic)
+    task: Optional[asyncio.Task] = None
+    save_code: Optional[str] = None
+    checkpointer: Optional[Checkpointer] = None
+    idle_deadline: Optional[Deadline] = None
+    time_deadlines: list[Deadline] = field(default_factory=list)
+    player: Optional[str] = None
+    sink: StreamSink = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.sink = StreamSink(self.writer)
+
+    async def send(self, lines: list[str]) -> None:
+        """Send the given lines of text to the player."""
+        self.sink.write(lines)
+        await self.writer.drain()
+
+    async def send_result(self, result: TurnResult) -> None:
+        """Send the output of a turn, followed by the next prompt if the game is still going."""
+        self.sink.write_result(result)
+        await self.writer.drain()
+
+
+class GameServer:
+    """An asyncio TCP server running one AdventureGame per connection.
+
+    Instance Attributes:
+        - game_data_file: the game data file each session's game is loaded from
+        - initial_location_id: the location each session starts at
+        - idle_timeout: seconds a player may go without sending input before being disconnected
+        - record_dir: directory to save a recording of every session to when it ends, or None
+        - save_dir: directory to save every game in progress to after each turn, so that players can resume their
+          game after being disconnected (e.g. by a server restart), or None
+        - profile_dir: directory to save cProfile statistics of every session to when it ends, or None
+        - results_file: the database to add the result of every finished game to, or None
+        - results: adds the results of finished games to results_file, or None if it isn't open
+        - sessions: the sessions currently connected, by session id
+        - scheduler: the deadlines of every session
+
+    Representation Invariants:
+        - idle_timeout > 0
+    """
+    # Private Instance Attributes:
+    #   - _server: the underlying asyncio server, or None if it isn't listening
+    #   - _next_id: the id to give the next session
+    #   - _draining: whether the server is shutting down and refusing new sessions
+
+    game_data_file: str
+    initial_location_id: int
+    idle_timeout: float
+    record_dir: Optional[str]
+    save_dir: Optional[str]
+    profile_dir: Optional[str]
+    results_file: Optional[str]
+    results: Optional[ResultsWriter]
+    sessions: dict[int, Session]
+    scheduler: DeadlineScheduler
+    _server: Optional[asyncio.AbstractServer]
+    _next_id: int
+    _draining: bool
+
+    def __init__(self, game_data_file: str = 'game_data.json', initial_location_id: int = 1,
+                 idle_timeout: float = 300, record_dir: Optional[str] = None, save_dir: Optional[str] = None,
+                 profile_dir: Optional[str] = None, results_file: Optional[str] = None) -> None:
+        """Initialize a new server that isn't listening yet."""
+        self.game_data_file = game_data_file
+        self.initial_location_id = initial_location_id
+        self.idle_timeout = idle_timeout
+        self.record_dir = record_dir
+        self.save_dir = save_dir
+        self.profile_dir = profile_dir
+        self.results_file = results_file
+        self.results = None
+        self.sessions = {}
+        self.scheduler = DeadlineScheduler()
+        self._server = None
+        self._next_id = 1
+        self._draining = False
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8111, backlog: int = 1024) -> None:
+        """Start listening for players on the given host and port.
+
+        backlog is the number of connections the operating system queues before the server accepts them.
+        """
+        # Built now, rather than in the middle of the first game that needs it
+        load_word_tree()
+        if self.results_file is not None:
+            self.results = ResultsWriter(self.results_file)
+        self._server = await asyncio.start_server(self._handle_connection, host, port, backlog=backlog)
+        self.scheduler.attach(asyncio.get_running_loop())
+
+    @property
+    def port(self) -> int:
+        """Return the port the server is listening on."""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Serve players until the server is drained."""
+        async with self._server:
+            try:
+                await self._server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    async def drain(self, grace: float = 30) -> None:
+        """Stop accepting new players, and give connected players the given number of seconds to finish
+        before disconnecting them."""
+        self._draining = True
+        if self._server is not None:
+            self._server.close()
+        tasks = [s.task for s in self.sessions.values() if s.task is not None]
+        for session in list(self.sessions.values()):
+            try:
+                await session.send([f"The server is shutting down. You have {int(grace)} seconds left to play."])
+            except ConnectionError:
+                pass
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=grace)
+            for task in still_running:
+                task.cancel()
+            await asyncio.gather(*still_running, return_exceptions=True)
+        if self.results is not None:
+            # Closing waits for the results of the last games to be written
+            await asyncio.to_thread(self.results.close)
+            self.results = None
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Run one session for a newly connected player."""
+        if self._draining:
+            writer.close()
+            return
+        game = AdventureGame(self.game_data_file, self.initial_location_id)
+        if self.profile_dir is not None:
+            game.profiler = cProfile.Profile()
+        session = Session(self._next_id, game, writer, task=asyncio.current_task())
+        self._next_id += 1
+        METRICS.inc("sessions")
+        self.sessions[session.session_id] = session
+        try:
+            await self._play(session, reader)
+        except ConnectionError:
+            pass
+        except asyncio.CancelledError:
+            # Sessions are only cancelled by drain(); end them quietly instead of propagating to asyncio.streams
+            writer.write(b"The server has shut down. Goodbye!\n")
+        finally:
+            del self.sessions[session.session_id]
+            self._cancel_deadlines(session)
+            writer.close()
+            if self.results is not None and session.game.ending is not None:
+                self.results.submit(game_result(session.game))
+            if self.record_dir is not None:
+                name = f"session-{session.session_id}-{session.game.recording.seed}.json"
+                session.game.save_recording(os.path.join(self.record_dir, name))
+            if session.game.profiler is not None:
+                session.game.profiler.dump_stats(os.path.join(self.profile_dir, f"session-{session.session_id}.prof"))
+
+    async def _play(self, session: Session, reader: asyncio.StreamReader) -> None:
+        """Step the session's game with each line sent by the player until the game ends."""
+        result = session.game.start()
+        if self.save_dir is not None:
+            self._start_saving(session, secrets.token_hex(4))
+            result.lines.append(f"Your save code is {session.save_code}. If you are disconnected, reconnect and "
+                                f"enter 'resume {session.save_code}' to continue this game.")
+        if self.results is not None:
+            result.lines.append("Enter 'name <your name>' before playing to put your results on the leaderboard.")
+        await session.send_result(result)
+        session.idle_deadline = self.scheduler.schedule(self.idle_timeout, self._idle_out, session)
+        self._schedule_time_limit(session)
+        first_input = True
+        while not result.game_over:
+            # The scheduler closes the connection if the player is idle or out of time, which ends this read
+            line = await reader.readline()
+            if not line:
+                return
+            session.last_active = time.monotonic()
+            self.scheduler.reschedule(session.idle_deadline, self.idle_timeout)
+            command = line.decode(errors='replace')
+            if first_input and command.startswith("width "):
+                result = self._width(session, command[len("width "):].strip())
+                await session.send_result(result)
+                continue
+            if first_input and self.results is not None and command.startswith("name "):
+                # The player can still resume a saved game after giving their name
+                result = self._name(session, command[len("name "):].strip())
+                await session.send_result(result)
+                continue
+            if first_input and self.save_dir is not None and command.startswith("resume "):
+                result = self._resume(session, command[len("resume "):].strip())
+                self._schedule_time_limit(session)
+            else:
+                result = session.game.step(command)
+            first_input = False
+            if session.checkpointer is not None:
+                if result.game_over:
+                    delete_save(session.checkpointer.path)
+                else:
+                    session.checkpointer.checkpoint(session.game)
+            await session.send_result(result)
+
+    def _schedule_time_limit(self, session: Session) -> None:
+        """Schedule the warnings and the end of the session's game for when its time runs out."""
+        for deadline in session.time_deadlines:
+            self.scheduler.cancel(deadline)
+        left = session.game.time_left()
+        session.time_deadlines = [self.scheduler.schedule(left - warning, self._warn, session, warning)
+                                  for warning in TIME_WARNINGS if left > warning]
+        session.time_deadlines.append(self.scheduler.schedule(left, self._time_up, session))
+
+    def _cancel_deadlines(self, session: Session) -> None:
+        """Cancel every deadline of the given session."""
+        for deadline in session.time_deadlines:
+            self.scheduler.cancel(deadline)
+        if session.idle_deadline is not None:
+            self.scheduler.cancel(session.idle_deadline)
+
+    def _warn(self, session: Session, seconds: int) -> None:
+        """Tell the player of the given session that they have the given number of seconds left."""
+        if not session.game.ongoing_sim[0]:
+            return
+        if seconds % 60 != 0:
+            left = "1 second" if seconds == 1 else f"{seconds} seconds"
+        else:
+            left = "1 minute" if seconds == 60 else f"{seconds // 60} minutes"
+        session.sink.write([f"Hurry! You have {left} left."])
+
+    def _time_up(self, session: Session) -> None:
+        """End the game of the given session, which has run out of time, and disconnect the player."""
+        left = session.game.time_left()
+        if left > 0:
+            # The game's clock is behind the scheduler's (e.g. it was paused while saved); check again later
+            session.time_deadlines[-1] = self.scheduler.schedule(left, self._time_up, session)
+            return
+        result = session.game.expire()
+        if not result.game_over:
+            return
+        METRICS.inc("timeouts", reason="time")
+        session.sink.write_result(result)
+        if session.checkpointer is not None:
+            delete_save(session.checkpointer.path)
+            session.checkpointer = None
+        session.writer.close()
+
+    def _idle_out(self, session: Session) -> None:
+        """Disconnect the player of the given session, who hasn't sent any input for idle_timeout seconds."""
+        METRICS.inc("timeouts", reason="idle")
+        session.sink.write(["You were idle for too long and have been disconnected."])
+        session.writer.close()
+
+    def _start_saving(self, session: Session, save_code: str) -> None:
+        """Save the session's game under the given save code from now on."""
+        session.save_code = save_code
+        session.checkpointer = Checkpointer(os.path.join(self.save_dir, f"{save_code}.sav"))
+
+    def _width(self, session: Session, width: str) -> TurnResult:
+        """Wrap the descriptions of the session's game to the given display width, and return the reply to the
+        player."""
+        game = session.game
+        if not width.isdigit() or not MIN_WIDTH <= int(width) <= MAX_WIDTH:
+            lines = [f"Please enter a width of {MIN_WIDTH} to {MAX_WIDTH} characters."]
+        else:
+            game.width = int(width)
+            lines = [f"Descriptions will be wrapped to {width} characters."]
+        return TurnResult(lines, 0, game.turnsleft, False, ACTION_PROMPT)
+
+    def _name(self, session: Session, name: str) -> TurnResult:
+        """Keep the results of the session's game under the given name, and return the reply to the player."""
+        game = session.game
+        if not name or len(name) > MAX_NAME_LENGTH or not name.isprintable():
+            lines = [f"Please enter a name of 1 to {MAX_NAME_LENGTH} letters, numbers, spaces or symbols."]
+        else:
+            session.player = game.player = name
+            lines = [f"Your results will be kept under the name {name}."]
+        return TurnResult(lines, 0, game.turnsleft, False, ACTION_PROMPT)
+
+    def _resume(self, session: Session, save_code: str) -> TurnResult:
+        """Replace the session's game with the game saved under the given save code, and return its start."""
+        game = session.game
+        path = os.path.join(self.save_dir, f"{save_code}.sav")
+        if not save_code.isalnum() or not os.path.exists(path):
+            return TurnResult(["There is no saved game with that code."], 0, game.turnsleft, False, ACTION_PROMPT)
+        session.game = load_game(path)
+        session.game.profiler = game.profiler
+        session.game.width = game.width
+        if session.player is not None:
+            session.game.player = session.player
+        self._start_saving(session, save_code)
+        return session.game.start()
+
+
+async def run_server(args: argparse.Namespace) -> None:
+    """Run a GameServer with the given command line arguments until it receives SIGINT or SIGTERM, then drain it.
+
+    If a metrics file is given, metrics are written to it whenever the server receives SIGUSR1, and when it stops.
+    """
+    host, port, grace = args.host, args.port, args.grace
+    server = GameServer(idle_timeout=args.idle_timeout, record_dir=args.record_dir, save_dir=args.save_dir,
+                        profile_dir=args.profile_dir, results_file=args.results)
+    await server.start(host, port)
+    print(f"Serving on {host}:{server.port}")
+    serving = asyncio.create_task(server.serve_forever())
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    if args.metrics:
+        METRICS.enable()
+        loop.add_signal_handler(signal.SIGUSR1, METRICS.write, args.metrics)
+    await stop.wait()
+    print(f"Draining {len(server.sessions)} sessions...")
+    await server.drain(grace)
+    serving.cancel()
+    await asyncio.gather(serving, return_exceptions=True)
+    if args.metrics:
+        METRICS.write(args.metrics)
+
+
+async def run_client(host: str, port: int) -> None:
+    """Play on a game server from this console."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"width {max(MIN_WIDTH, min(MAX_WIDTH, shutil.get_terminal_size().columns))}\n".encode())
+    loop = asyncio.get_running_loop()
+
+    def forward_input() -> None:
+        # stdin is read on a daemon thread, so the client can exit while it is blocked waiting for input
+        for line in sys.stdin:
+            loop.call_soon_threadsafe(writer.write, line.encode())
+
+    threading.Thread(target=forward_input, daemon=True).start()
+    while line := await reader.readline():
+        print(line.decode().rstrip("\n"))
+    writer.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host the text adventure for many players over TCP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8111)
+    parser.add_argument('--idle-timeout', type=float, default=300)
+    parser.add_argument('--grace', type=float, default=30, help="seconds players get to finish on shutdown")
+    parser.add_argument('--record-dir', help="directory to save a recording of every session to")
+    parser.add_argument('--save-dir', help="directory to save games in progress to, so players can resume them")
+    parser.add_argument('--metrics', metavar='FILE',
+                        help="save metrics to FILE (.json or Prometheus text) on SIGUSR1 and on shutdown")
+    parser.add_argument('--profile-dir', help="directory to save cProfile statistics of every session to")
+    parser.add_argument('--results', metavar='FILE', help="add the result of every finished game to the results "
+                                                          "database FILE")
+    parser.add_argument('--connect', action='store_true', help="connect to a server as a player")
+    args = parser.parse_args()
+    if args.connect:
+        asyncio.run(run_client(args.host, args.port))
+    else:
+        asyncio.run(run_server(args))
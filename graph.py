@@ -0,0 +1,158 @@
+"""CSC111 Project 1: Text Adventure Game - World Graph
+
+This module contains WorldGraph, an index of the shortest routes between every pair of locations of a world.
+
+The locations and their available commands form a directed graph. When a world is loaded, a breadth-first search
+from every location finds the location before every other location, and the command taken there, on a shortest
+route to it. Answering "how do I get there?" during a game then just follows these steps back from the destination,
+instead of searching.
+
+For worlds too large to search from every location up front, the index can be lazy instead: a route is searched for
+the first time it is needed, and the search stops as soon as it reaches the destination. Only the most recently used
+routes are kept.
+"""
+from __future__ import annotations
+from collections import OrderedDict, deque
+from typing import Callable, Mapping, Optional
+
+
+class WorldGraph:
+    """The shortest routes between the locations of a world.
+
+    Instance Attributes:
+        - capacity: the number of routes kept, or None to search from every location up front
+    """
+    # Private Instance Attributes:
+    #   - _exits: a mapping from each location id to its available commands and the locations they lead to
+    #   - _names: a mapping from each location id to its name
+    #   - _load_places: a function returning the mapping from the lowercase name of each named location to its id,
+    #                   used instead of _names if it isn't None
+    #   - _places: a mapping from the lowercase name of each named location to its id, or None if it hasn't been
+    #              built yet
+    #   - _previous: _previous[a][b] is the location before b and the command taken there, on a shortest route
+    #                from location a to location b, for every b reachable from a other than a itself (only if
+    #                capacity is None)
+    #   - _routes: the commands of the shortest route from a to b, or None if there is none, for the capacity most
+    #              recently used pairs (a, b), the least recently used first (only if capacity is not None)
+
+    capacity: Optional[int]
+    _exits: Mapping[int, Mapping[str, int]]
+    _names: Mapping[int, str]
+    _load_places: Optional[Callable[[], dict[str, int]]]
+    _places: Optional[dict[str, int]]
+    _previous: dict[int, dict[int, tuple[int, str]]]
+    _routes: OrderedDict[tuple[int, int], Optional[tuple[str, ...]]]
+
+    def __init__(self, exits: Mapping[int, Mapping[str, int]], names: Optional[Mapping[int, str]] = None,
+                 capacity: Optional[int] = None, load_places: Optional[Callable[[], dict[str, int]]] = None) -> None:
+        """Initialize the index for the locations with the given exits (a mapping from each location id to its
+        available commands), and the given location names. If load_places is given, it is called the first time
+        places is needed instead of going through every location's name.
+
+        If capacity is None, every location is searched now. Otherwise, routes are searched when they are first
+        needed, and only the capacity most recently used routes are kept.
+
+        Commands leading to locations that aren't in exits are ignored.
+        """
+        self.capacity = capacity
+        self._exits = exits
+        self._names = names or {}
+        self._load_places = load_places
+        self._places = None
+        self._previous = {}
+        self._routes = OrderedDict()
+        if capacity is None:
+            for source in exits:
+                self._previous[source] = self._search(source)
+
+    @property
+    def places(self) -> dict[str, int]:
+        """Return a mapping from the lowercase name of each named location to its id."""
+        if self._places is None and self._load_places is not None:
+            self._places = self._load_places()
+        elif self._places is None:
+            self._places = {name.lower(): loc_id for loc_id, name in self._names.items() if name}
+        return self._places
+
+    def _search(self, source: int, target: Optional[int] = None) -> dict[int, tuple[int, str]]:
+        """Return the location before each location reachable from source, and the command taken there, on a
+        shortest route from source to it. If a target is given, the search stops once it reaches target, so only
+        the route to target is sure to be complete."""
+        previous = {}
+        queue = deque([source])
+        while queue and target not in previous:
+            loc_id = queue.popleft()
+            exits = self._exits.get(loc_id)
+            if exits is None:  # a command leading to a location that doesn't exist
+                del previous[loc_id]
+                continue
+            for command, next_id in exits.items():
+                if next_id != source and next_id not in previous:
+                    previous[next_id] = (loc_id, command)
+                    queue.append(next_id)
+        return previous
+
+    def _route(self, source: int, target: int) -> Optional[tuple[str, ...]]:
+        """Return the commands of a shortest route from source to target, or None if target can't be reached
+        from source, searching for it if needed."""
+        if target == source:
+            return ()
+        if target not in self._exits:
+            return None
+        if self.capacity is None:
+            previous = self._previous[source]
+        elif (source, target) in self._routes:
+            self._routes.move_to_end((source, target))
+            return self._routes[(source, target)]
+        else:
+            previous = self._search(source, target)
+
+        if target not in previous:
+            commands = None
+        else:
+            steps = []
+            at = target
+            while at != source:
+                at, command = previous[at]
+                steps.append(command)
+            commands = tuple(reversed(steps))
+
+        if self.capacity is not None:
+            self._routes[(source, target)] = commands
+            if len(self._routes) > self.capacity:
+                self._routes.popitem(last=False)
+        return commands
+
+    def distance(self, source: int, target: int) -> Optional[int]:
+        """Return the number of moves on a shortest route from source to target, or None if target can't be
+        reached from source."""
+        commands = self._route(source, target)
+        return None if commands is None else len(commands)
+
+    def next_command(self, source: int, target: int) -> Optional[str]:
+        """Return the first command to take on a shortest route from source to target, or None if target can't be
+        reached from source or is source."""
+        commands = self._route(source, target)
+        return commands[0] if commands else None
+
+    def route(self, source: int, target: int) -> Optional[list[str]]:
+        """Return the commands of a shortest route from source to target, or None if target can't be reached
+        from source. The route from a location to itself is empty."""
+        commands = self._route(source, target)
+        return None if commands is None else list(commands)
+
+    def reachable(self, source: int) -> set[int]:
+        """Return the ids of every location that can be reached from source, including source."""
+        previous = self._previous[source] if self.capacity is None else self._search(source)
+        return set(previous) | {source}
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
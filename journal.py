@@ -0,0 +1,238 @@
+"""CSC111 Project 1: Text Adventure Game - Command Journal
+
+This module contains the Journal used to undo and redo commands. Every change a command makes to the game is
+recorded as an operation that knows how to apply and revert itself, and the operations of one command are grouped
+into a transaction. Undoing a command reverts its operations in reverse order, and redoing it applies them again,
+so each step takes constant time no matter how many commands have been undone.
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Optional
+
+from game_entities import Item
+from proj1_event_logger import Event
+
+if TYPE_CHECKING:
+    from adventure import AdventureGame
+
+
+class Operation:
+    """A single change to the state of a game, which can be applied and reverted."""
+
+    def apply(self, game: AdventureGame) -> None:
+        """Make this change to the given game."""
+        raise NotImplementedError
+
+    def revert(self, game: AdventureGame) -> None:
+        """Undo this change to the given game, which must be in the state right after it was applied."""
+        raise NotImplementedError
+
+
+@dataclass(slots=True)
+class Move(Operation):
+    """The player moving from one location to another."""
+    source: int
+    target: int
+
+    def apply(self, game: AdventureGame) -> None:
+        game.current_location_id = self.target
+
+    def revert(self, game: AdventureGame) -> None:
+        game.current_location_id = self.source
+
+
+@dataclass(slots=True)
+class ChangeScore(Operation):
+    """The player's score changing by delta points."""
+    delta: int
+
+    def apply(self, game: AdventureGame) -> None:
+        game.score += self.delta
+
+    def revert(self, game: AdventureGame) -> None:
+        game.score -= self.delta
+
+
+@dataclass(slots=True)
+class ChangeTurns(Operation):
+    """The number of turns the player has left changing by delta."""
+    delta: int
+
+    def apply(self, game: AdventureGame) -> None:
+        game.turnsleft += self.delta
+
+    def revert(self, game: AdventureGame) -> None:
+        game.turnsleft -= self.delta
+
+
+@dataclass(slots=True)
+class Pocket(Operation):
+    """An item being added to the player's inventory, with the given position in the order items were picked up."""
+    item: Item
+    order: int
+
+    def apply(self, game: AdventureGame) -> None:
+        game.inventory[self.item.name] = self.item
+        game.pocket_order[self.item.name] = self.order
+
+    def revert(self, game: AdventureGame) -> None:
+        del game.inventory[self.item.name]
+        del game.pocket_order[self.item.name]
+
+
+@dataclass(slots=True)
+class Unpocket(Operation):
+    """An item being removed from the player's inventory, which had the given position in the order items were
+    picked up."""
+    item: Item
+    order: int
+
+    def apply(self, game: AdventureGame) -> None:
+        del game.inventory[self.item.name]
+        del game.pocket_order[self.item.name]
+
+    def revert(self, game: AdventureGame) -> None:
+        game.inventory[self.item.name] = self.item
+        game.pocket_order[self.item.name] = self.order
+
+
+@dataclass(slots=True)
+class PlaceItem(Operation):
+    """An item being put down at a location."""
+    loc_id: int
+    item: Item
+
+    def apply(self, game: AdventureGame) -> None:
+        game.edit_location(self.loc_id).additem(self.item)
+        game.item_locations[self.item.name] = self.loc_id
+
+    def revert(self, game: AdventureGame) -> None:
+        game.edit_location(self.loc_id).takeitem(self.item.name)
+        game.item_locations[self.item.name] = None
+
+
+@dataclass(slots=True)
+class RemoveItem(Operation):
+    """An item being taken away from a location."""
+    loc_id: int
+    item: Item
+
+    def apply(self, game: AdventureGame) -> None:
+        game.edit_location(self.loc_id).takeitem(self.item.name)
+        game.item_locations[self.item.name] = None
+
+    def revert(self, game: AdventureGame) -> None:
+        game.edit_location(self.loc_id).additem(self.item)
+        game.item_locations[self.item.name] = self.loc_id
+
+
+@dataclass(slots=True)
+class LogEvent(Operation):
+    """A new event being added to the end of the game's event log."""
+    event: Event
+    command: Optional[str]
+
+    def apply(self, game: AdventureGame) -> None:
+        game.event_log.add_event(self.event, self.command)
+
+    def revert(self, game: AdventureGame) -> None:
+        game.event_log.remove_last_event()
+
+
+@dataclass
+class Transaction:
+    """The operations made by one command.
+
+    Instance Attributes:
+        - command: the command that made these operations
+        - operations: the operations, in the order they were applied
+    """
+    command: str
+    operations: list[Operation] = field(default_factory=list)
+
+
+class Journal:
+    """The history of the commands that changed a game, which can be undone and redone.
+
+    Instance Attributes:
+        - current: the transaction of the command being applied, or None if no command is being applied
+    """
+    # Private Instance Attributes:
+    #   - _done: the transactions that can be undone, the most recent last
+    #   - _undone: the transactions that can be redone, the most recently undone last
+
+    current: Optional[Transaction]
+    _done: list[Transaction]
+    _undone: list[Transaction]
+
+    def __init__(self) -> None:
+        """Initialize an empty journal."""
+        self.current = None
+        self._done = []
+        self._undone = []
+
+    def begin(self, command: str) -> None:
+        """Start recording the operations of the given command."""
+        self.current = Transaction(command)
+
+    def record(self, game: AdventureGame, operation: Operation) -> None:
+        """Apply the given operation to game, as part of the current transaction if there is one."""
+        operation.apply(game)
+        if self.current is not None:
+            self.current.operations.append(operation)
+
+    def commit(self) -> bool:
+        """Finish the current transaction, and return whether it changed the game.
+
+        A transaction that changed the game can be undone, and makes commands that were undone before it impossible
+        to redo.
+        """
+        transaction, self.current = self.current, None
+        if transaction is None or not transaction.operations:
+            return False
+        self._done.append(transaction)
+        self._undone.clear()
+        return True
+
+    def can_undo(self) -> bool:
+        """Return whether there is a command to undo."""
+        return bool(self._done)
+
+    def can_redo(self) -> bool:
+        """Return whether there is an undone command to redo."""
+        return bool(self._undone)
+
+    def undo(self, game: AdventureGame) -> str:
+        """Revert the most recent command that changed game, and return that command.
+
+        Preconditions:
+            - self.can_undo()
+        """
+        transaction = self._done.pop()
+        for operation in reversed(transaction.operations):
+            operation.revert(game)
+        self._undone.append(transaction)
+        return transaction.command
+
+    def redo(self, game: AdventureGame) -> str:
+        """Apply the most recently undone command to game again, and return that command.
+
+        Preconditions:
+            - self.can_redo()
+        """
+        transaction = self._undone.pop()
+        for operation in transaction.operations:
+            operation.apply(game)
+        self._done.append(transaction)
+        return transaction.command
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
@@ -0,0 +1,204 @@
+"""CSC111 Project 1: Text Adventure Game - Metrics
+
+This module collects counters and latency histograms from running games, and exports them as a Prometheus-style
+text file or a JSON snapshot.
+
+All metrics are collected in METRICS, which is disabled by default. While it is disabled, recording a metric
+returns immediately and timing a phase uses a shared do-nothing context manager, so the instrumentation can stay in
+the code (and METRICS can be enabled in production) at negligible cost.
+
+    METRICS.enable()
+    with METRICS.timer("render"):
+        ...
+    METRICS.inc("commands", command="look")
+    METRICS.write("metrics.prom")
+"""
+from __future__ import annotations
+import bisect
+import contextlib
+import json
+import math
+import time
+from typing import Any, ContextManager
+
+# Upper bounds of the buckets of latency histograms, in seconds
+LATENCY_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, math.inf)
+
+# The prefix of the name of every exported metric
+PREFIX = "adventure_"
+
+# A metric is identified by its name and its labels, sorted by label name
+Key = tuple[str, tuple[tuple[str, str], ...]]
+
+_NULL_TIMER = contextlib.nullcontext()
+
+
+class Histogram:
+    """Counts of observed values, by bucket.
+
+    Instance Attributes:
+        - bounds: the upper bound of each bucket, in increasing order; the last is infinity
+        - counts: counts[i] is the number of observed values <= bounds[i] and greater than bounds[i - 1]
+        - total: the sum of the observed values
+        - count: the number of observed values
+    """
+    bounds: tuple[float, ...]
+    counts: list[int]
+    total: float
+    count: int
+
+    def __init__(self, bounds: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Add the given value to this histogram."""
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class _Timer:
+    """Observes the time spent inside a with statement in a latency histogram."""
+    # Private Instance Attributes:
+    #   - _metrics: the metrics the time is recorded in
+    #   - _key: the key of the histogram the time is recorded in
+    #   - _start: the time at which the with statement was entered
+
+    _metrics: Metrics
+    _key: Key
+    _start: float
+
+    def __init__(self, metrics: Metrics, key: Key) -> None:
+        self._metrics = metrics
+        self._key = key
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._metrics.observe_key(self._key, time.perf_counter() - self._start)
+
+
+class Metrics:
+    """Counters and histograms collected while games run.
+
+    Instance Attributes:
+        - enabled: whether metrics are being collected
+        - counters: the value of each counter
+        - histograms: each histogram
+    """
+    enabled: bool
+    counters: dict[Key, float]
+    histograms: dict[Key, Histogram]
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.counters = {}
+        self.histograms = {}
+
+    def enable(self) -> None:
+        """Start collecting metrics."""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Stop collecting metrics. Metrics already collected are kept."""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Forget every metric collected so far."""
+        self.counters.clear()
+        self.histograms.clear()
+
+    def inc(self, name: str, amount: float = 1, **labels: object) -> None:
+        """Add amount to the counter with the given name and labels, if metrics are enabled."""
+        if self.enabled:
+            key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels: object) -> None:
+        """Add value to the histogram with the given name and labels, if metrics are enabled."""
+        if self.enabled:
+            self.observe_key((name, tuple(sorted((k, str(v)) for k, v in labels.items()))), value)
+
+    def observe_key(self, key: Key, value: float) -> None:
+        """Add value to the histogram with the given key, whether or not metrics are enabled."""
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def timer(self, phase: str) -> ContextManager[None]:
+        """Return a context manager recording the time spent inside it in the phase_seconds histogram of the
+        given phase, if metrics are enabled."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, ("phase_seconds", (("phase", phase),)))
+
+    def to_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted({name for name, _ in self.counters}):
+            lines.append(f"# TYPE {PREFIX}{name}_total counter")
+            for (other, labels), value in sorted(self.counters.items()):
+                if other == name:
+                    lines.append(f"{PREFIX}{name}_total{_labels(labels)} {value:g}")
+        for name in sorted({name for name, _ in self.histograms}):
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+            for (other, labels), histogram in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+                if other != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.bounds, histogram.counts):
+                    cumulative += count
+                    le = "+Inf" if bound == math.inf else f"{bound:g}"
+                    lines.append(f"{PREFIX}{name}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+                lines.append(f"{PREFIX}{name}_sum{_labels(labels)} {histogram.total:g}")
+                lines.append(f"{PREFIX}{name}_count{_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> dict[str, Any]:
+        """Return every metric as a JSON-compatible snapshot."""
+        return {
+            'counters': [{'name': name, 'labels': dict(labels), 'value': value}
+                         for (name, labels), value in sorted(self.counters.items())],
+            'histograms': [{'name': name, 'labels': dict(labels),
+                            'bounds': [b if b != math.inf else None for b in histogram.bounds],
+                            'counts': histogram.counts, 'sum': histogram.total, 'count': histogram.count}
+                           for (name, labels), histogram in sorted(self.histograms.items(), key=lambda kv: kv[0])],
+        }
+
+    def write(self, path: str) -> None:
+        """Write every metric to the given file: a JSON snapshot if its name ends in .json, and in the Prometheus
+        text format otherwise."""
+        with open(path, 'w') as f:
+            if path.endswith('.json'):
+                json.dump(self.to_json(), f, indent=1)
+            else:
+                f.write(self.to_prometheus())
+
+
+def _labels(labels: tuple[tuple[str, str], ...]) -> str:
+    """Return the given labels in the Prometheus text format."""
+    if not labels:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+
+# The metrics of this process
+METRICS = Metrics()
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
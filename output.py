@@ -0,0 +1,128 @@
+"""CSC111 Project 1: Text Adventure Game - Game Output
+
+This module contains the buffer that a game collects its output in during a turn, and the sinks that the output
+of each turn is written to, all at once, when the turn is over: the console, a network stream, a list (for checking
+the output of a game in code), or nowhere (for measuring how fast the game itself runs).
+"""
+from __future__ import annotations
+import sys
+from typing import TYPE_CHECKING, Any, Optional, TextIO
+
+if TYPE_CHECKING:
+    from adventure import TurnResult
+
+
+class OutputBuffer:
+    """The lines of text output by a game during the current turn."""
+    # Private Instance Attributes:
+    #   - _lines: the lines output so far, in order
+
+    _lines: list[str]
+
+    def __init__(self) -> None:
+        """Initialize an empty buffer."""
+        self._lines = []
+
+    def say(self, *parts: object) -> None:
+        """Add a line of text, joining the given parts with spaces like print()."""
+        self._lines.append(" ".join(str(p) for p in parts))
+
+    def extend(self, lines: tuple[str, ...] | list[str]) -> None:
+        """Add the given lines of text."""
+        self._lines.extend(lines)
+
+    def take(self) -> list[str]:
+        """Return the lines output so far, and empty the buffer."""
+        lines, self._lines = self._lines, []
+        return lines
+
+
+class Sink:
+    """Somewhere the output of a game is written to, once per turn."""
+
+    def write(self, lines: list[str], prompt: str = "") -> None:
+        """Write the given lines of text, followed by the prompt for the player's next input (if any)."""
+        raise NotImplementedError
+
+    def write_result(self, result: TurnResult) -> None:
+        """Write the output of a turn, followed by the next prompt if the game is still going."""
+        self.write(result.lines, "" if result.game_over else result.prompt)
+
+    def close(self) -> None:
+        """Release anything held by this sink. Nothing can be written to it afterwards."""
+
+
+class ConsoleSink(Sink):
+    """Writes output to a text stream, the standard output by default.
+
+    Instance Attributes:
+        - stream: the stream output is written to
+    """
+    stream: TextIO
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = sys.stdout if stream is None else stream
+
+    def write(self, lines: list[str], prompt: str = "") -> None:
+        self.stream.write("".join(line + "\n" for line in lines) + prompt)
+        self.stream.flush()
+
+
+class StreamSink(Sink):
+    """Writes output to a binary stream, such as a socket or an asyncio.StreamWriter, using the server's line
+    protocol: every line of output and the prompt each end with a newline.
+
+    Instance Attributes:
+        - writer: the stream output is written to
+    """
+    writer: Any
+
+    def __init__(self, writer: Any) -> None:
+        self.writer = writer
+
+    def write(self, lines: list[str], prompt: str = "") -> None:
+        text = "".join(line + "\n" for line in lines)
+        if prompt:
+            text += prompt.strip() + "\n"
+        self.writer.write(text.encode())
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class ListSink(Sink):
+    """Keeps all output in memory.
+
+    Instance Attributes:
+        - lines: every line written, in order
+        - prompts: every prompt written, in order
+    """
+    lines: list[str]
+    prompts: list[str]
+
+    def __init__(self) -> None:
+        self.lines = []
+        self.prompts = []
+
+    def write(self, lines: list[str], prompt: str = "") -> None:
+        self.lines.extend(lines)
+        if prompt:
+            self.prompts.append(prompt)
+
+
+class NullSink(Sink):
+    """Discards all output."""
+
+    def write(self, lines: list[str], prompt: str = "") -> None:
+        pass
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
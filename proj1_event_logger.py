@@ -22,21 +22,20 @@ This file is Copyright (c) 2025 CSC111 Teaching Team
 """
 
 from __future__ import annotations
+from array import array
 from dataclasses import dataclass
-from typing import Optional
+from typing import Callable, Iterator, Optional, TextIO
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     """
-    A node representing one event in an adventure game.
+    One event in an adventure game.
 
     Instance Attributes:
     - id_num: Integer id of this event's location
     - description: Long description of this event's location
     - next_command: String command which leads this event to the next event, None if this is the last game event
-    - next: Event object representing the next event in the game, or None if this is the last game event
-    - prev: Event object representing the previous event in the game, None if this is the first game event
     """
 
     # NOTES:
@@ -47,81 +46,183 @@ class Event:
 
     id_num: int
     description: str
-    next_command: Optional[str]
-    next: Optional[Event]
-    prev: Optional[Event]
+    next_command: Optional[str] = None
+
+
+# Every distinct command logged in this process, and its index in _command_names.
+# Event lists store these indexes instead of the command strings.
+_command_names: list[str] = []
+_command_ids: dict[str, int] = {}
+_NO_COMMAND = -1
+
+
+def _intern_command(command: Optional[str]) -> int:
+    """Return the id of the given command, giving it a new id if it hasn't been logged before."""
+    if command is None:
+        return _NO_COMMAND
+    cid = _command_ids.get(command)
+    if cid is None:
+        cid = len(_command_names)
+        _command_names.append(command)
+        _command_ids[command] = cid
+    return cid
 
 
 class EventList:
     """
-    A linked list of game events.
+    A list of game events.
+
+    Events are stored compactly as two arrays: the location id of each event, and the id of the command used to
+    reach it. Descriptions are not copied into each event, but looked up by location id when an event is read.
+    Adding, removing the last event, the length and reading any event by index all take constant time.
+
+    If a stream file is given, every change to the list is also appended to it, so the list can be rebuilt with
+    EventList.load after a crash.
 
     Instance Attributes:
-        - first: the first event to happen in the game
-        - last: the latest event to happen this game
+        - first: the first event to happen in the game, or None if there are no events
+        - last: the latest event to happen this game, or None if there are no events
 
     Representation Invariants:
-        - first is None == last is None
+        - len(self._ids) == len(self._commands)
+        - len(self._commands) == 0 or self._commands[0] == _NO_COMMAND
     """
-    first: Optional[Event]
-    last: Optional[Event]
+    # Private Instance Attributes:
+    #   - _ids: the location id of each event, in order
+    #   - _commands: the id of the command that led to each event (_NO_COMMAND for the first event)
+    #   - _describe: a function returning the description of a location id, or None
+    #   - _descriptions: the description of each location id seen so far, used when _describe is None
+    #   - _stream: the file every change is appended to, or None
+
+    _ids: array
+    _commands: array
+    _describe: Optional[Callable[[int], str]]
+    _descriptions: dict[int, str]
+    _stream: Optional[TextIO]
+
+    def __init__(self, describe: Optional[Callable[[int], str]] = None, stream_path: Optional[str] = None) -> None:
+        """Initialize a new empty event list.
+
+        describe returns the description of a location id; if it isn't given, the description of the first event
+        added at each location is used for every event there. If stream_path is given, every change to this list
+        is appended to that file.
+        """
+        self._ids = array('i')
+        self._commands = array('i')
+        self._describe = describe
+        self._descriptions = {}
+        self._stream = None if stream_path is None else open(stream_path, 'a', encoding='utf-8')
 
-    def __init__(self) -> None:
-        """Initialize a new empty event list."""
+    @classmethod
+    def load(cls, stream_path: str, describe: Optional[Callable[[int], str]] = None) -> EventList:
+        """Return the event list recorded in the given stream file, which continues to be appended to.
 
-        self.first = None
-        self.last = None
+        A change that was only partly written (e.g. because the game crashed while writing it) is ignored.
+        """
+        events = cls(describe)
+        with open(stream_path, encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                if line[0] == "+":
+                    loc_id, _, command = line[1:-1].partition(" ")
+                    events._ids.append(int(loc_id))
+                    events._commands.append(_intern_command(command or None))
+                elif line[0] == "-":
+                    events.remove_last_event()
+        events._stream = open(stream_path, 'a', encoding='utf-8')
+        return events
+
+    def close(self) -> None:
+        """Close this list's stream file, if it has one."""
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, index: int) -> Event:
+        """Return the event at the given index, like a list."""
+        if index < 0:
+            index += len(self._ids)
+        if not 0 <= index < len(self._ids):
+            raise IndexError("event index out of range")
+        loc_id = self._ids[index]
+        next_command = None
+        if index + 1 < len(self._commands):
+            next_command = _command_names[self._commands[index + 1]]
+        return Event(loc_id, self._description(loc_id), next_command)
+
+    def __iter__(self) -> Iterator[Event]:
+        for index in range(len(self._ids)):
+            yield self[index]
+
+    @property
+    def first(self) -> Optional[Event]:
+        """The first event to happen in the game, or None if there are no events."""
+        return self[0] if self._ids else None
+
+    @property
+    def last(self) -> Optional[Event]:
+        """The latest event to happen this game, or None if there are no events."""
+        return self[-1] if self._ids else None
+
+    def _description(self, loc_id: int) -> str:
+        """Return the description of the location with the given id."""
+        if self._describe is not None:
+            return self._describe(loc_id)
+        return self._descriptions.get(loc_id, "")
 
     def display_events(self) -> None:
         """Display all events in chronological order."""
-        curr = self.first
-        while curr:
-            print(f"Location: {curr.id_num}, Command: {curr.next_command}")
-            curr = curr.next
+        for event in self:
+            print(f"Location: {event.id_num}, Command: {event.next_command}")
 
     def is_empty(self) -> bool:
         """Return whether this event list is empty."""
-        return self.first is None
+        return not self._ids
 
     def add_event(self, event: Event, command: str = None) -> None:
         """Add the given new event to the end of this event list.
         The given command is the command which was used to reach this new event, or None if this is the first
         event in the game.
         """
-        # Hint: You should update the previous node's <next_command> as needed
-        if command is None:
-            self.first = event
-            self.last = event
-        else:
-            self.last.next_command = command
-            self.last.next = event
-            event.prev = self.last
-            self.last = event
+        if self._describe is None:
+            self._descriptions.setdefault(event.id_num, event.description)
+        self._commands.append(_intern_command(command) if self._ids else _NO_COMMAND)
+        self._ids.append(event.id_num)
+        if self._stream is not None:
+            self._stream.write(f"+{event.id_num} {command or ''}\n")
+            self._stream.flush()
 
     def remove_last_event(self) -> None:
         """Remove the last event from this event list.
         If the list is empty, do nothing."""
-
-        # Hint: The <next_command> and <next> attributes for the new last event should be updated as needed
-
-        if self.first is not None:
-            if self.first == self.last:
-                self.first = None
-                self.last = None
-            else:
-                self.last.prev.next = None
-                self.last = self.last.prev
+        if self._ids:
+            self._ids.pop()
+            self._commands.pop()
+            if self._stream is not None:
+                self._stream.write("-\n")
+                self._stream.flush()
 
     def get_id_log(self) -> list[int]:
         """Return a list of all location IDs visited for each event in this list, in sequence."""
-
-        result = []
-        event = self.first
-        while event != self.last:
-            result.append(event.id_num)
-            event = event.next
-        result.append(self.last.id_num)
-        return result
+        return self._ids.tolist()
+
+    def get_command_log(self) -> list[Optional[str]]:
+        """Return a list of the command used to reach each event in this list, in sequence (None for the first)."""
+        return [None if cid == _NO_COMMAND else _command_names[cid] for cid in self._commands]
+
+    @classmethod
+    def from_log(cls, ids: list[int], commands: list[Optional[str]],
+                 describe: Optional[Callable[[int], str]] = None) -> EventList:
+        """Return a new event list with the given location IDs and commands (as returned by get_id_log and
+        get_command_log)."""
+        events = cls(describe)
+        events._ids.extend(ids)
+        events._commands.extend(_intern_command(command) for command in commands)
+        return events
 
     # Note: You may add other methods to this class as needed
 
@@ -0,0 +1,463 @@
+"""CSC111 Project 1: Text Adventure Game - Puzzles
+
+This module contains the puzzles the player must win to pick up some items. A puzzle is attached to an item in the
+game data file with a "puzzle" object naming its kind and settings, and is played when the item is picked up at its
+start position:
+
+    "puzzle": {"kind": "rock paper scissors", "wins": 3, "intro": ["..."], "won": ["..."], "lost": ["..."]}
+
+Every puzzle is a state machine that is given one input at a time. Its progress is kept in a dict of plain values
+(its state), not in the Puzzle object, which only holds the settings from the game data and can be shared. So a
+puzzle in progress never holds up anything else in the process, and can be saved with its game and resumed.
+
+New kinds of puzzles are subclasses of Puzzle registered with register_puzzle, and are available to any world.
+"""
+from __future__ import annotations
+import random
+from dataclasses import dataclass
+from typing import Any, Callable, ClassVar, Collection, Optional
+
+from anagram import AnagramIndex, arrangements, load_anagram_index
+from fuzzy import load_word_tree, max_typos
+from wordle import WordleSolver, decode, pattern_code
+from wordlist import load_word_list
+
+# The outcomes of a puzzle
+WON, LOST = "won", "lost"
+
+# The state of a puzzle in progress: plain Python values only, so that it can be saved along with its game
+PuzzleState = dict[str, Any]
+
+# Every kind of puzzle, by the name used for it in game data files
+PUZZLE_KINDS: dict[str, type[Puzzle]] = {}
+
+
+def register_puzzle(kind: str) -> Callable[[type[Puzzle]], type[Puzzle]]:
+    """Return a class decorator registering a subclass of Puzzle as the given kind of puzzle."""
+    def register(cls: type[Puzzle]) -> type[Puzzle]:
+        cls.kind = kind
+        PUZZLE_KINDS[kind] = cls
+        return cls
+    return register
+
+
+def make_puzzle(spec: dict[str, Any]) -> Puzzle:
+    """Return the puzzle with the given settings (the "puzzle" object of an item in the game data).
+
+    Preconditions:
+        - not puzzle_problems(spec, ...)
+    """
+    return PUZZLE_KINDS[spec['kind']](spec)
+
+
+def puzzle_problems(spec: Any, item_names: Collection[str]) -> list[str]:
+    """Return a description of every problem in the given puzzle settings, for a world whose items have the given
+    names. The settings are valid if and only if the returned list is empty."""
+    if not isinstance(spec, dict):
+        return ["puzzle must be an object"]
+    if spec.get('kind') not in PUZZLE_KINDS:
+        return [f"unknown puzzle kind {spec.get('kind')!r}"]
+    return PUZZLE_KINDS[spec['kind']].problems(spec, item_names)
+
+
+@dataclass
+class Player:
+    """What a puzzle can see of, and do to, the player playing it.
+
+    Instance Attributes:
+        - say: outputs a line of text to the player, joining its arguments with spaces like print()
+        - rng: the random number generator of the player's game
+        - held: the names of the items the player holds
+    """
+    say: Callable[..., None]
+    rng: random.Random
+    held: Collection[str]
+
+
+class Puzzle:
+    """A puzzle played one input at a time.
+
+    Instance Attributes:
+        - kind: the name this kind of puzzle is registered under
+        - intro: the lines output when the puzzle begins
+        - won: the lines output when the player wins
+        - lost: the lines output when the player loses
+        - turns: the number of turns playing the puzzle uses, whether it is won or lost
+        - gives: the name of the item the player hands over when they win, or None if they keep everything
+    """
+    kind: ClassVar[str] = ""
+    default_turns: ClassVar[int] = 1
+    intro: tuple[str, ...]
+    won: tuple[str, ...]
+    lost: tuple[str, ...]
+    turns: int
+    gives: Optional[str]
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        """Initialize a puzzle with the given settings."""
+        self.intro = tuple(spec.get('intro', ()))
+        self.won = tuple(spec.get('won', ()))
+        self.lost = tuple(spec.get('lost', ()))
+        self.turns = spec.get('turns', self.default_turns)
+        self.gives = None
+
+    @classmethod
+    def problems(cls, spec: dict[str, Any], item_names: Collection[str]) -> list[str]:
+        """Return a description of every problem in the given settings for this kind of puzzle."""
+        problems = [f"{cls.kind} puzzle: '{key}' must be a list of lines" for key in ('intro', 'won', 'lost')
+                    if not _is_list_of(spec.get(key, []), str)]
+        if not _is_count(spec.get('turns', cls.default_turns), 0):
+            problems.append(f"{cls.kind} puzzle: 'turns' must be a whole number of turns")
+        return problems
+
+    @staticmethod
+    def outcome(state: PuzzleState) -> Optional[str]:
+        """Return WON or LOST if the puzzle in the given state is over, and None if it is still being played."""
+        return state['outcome']
+
+    def begin(self, player: Player) -> PuzzleState:
+        """Start playing this puzzle, and return its state. The puzzle may be over immediately."""
+        for line in self.intro:
+            player.say(line)
+        state = self._begin(player)
+        state.setdefault('outcome', None)
+        self._announce(state, player)
+        return state
+
+    def step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        """Update the given state of this puzzle with the player's answer to its prompt.
+
+        Preconditions:
+            - self.outcome(state) is None
+        """
+        self._step(state, answer, player)
+        self._announce(state, player)
+
+    def prompt(self, state: PuzzleState) -> str:
+        """Return the prompt for the player's next answer in the given state."""
+        raise NotImplementedError
+
+    def resume(self, state: PuzzleState, player: Player) -> None:
+        """Output what the player needs to see again to continue this puzzle in the given state after their game was
+        resumed."""
+
+    def _begin(self, player: Player) -> PuzzleState:
+        """Start playing this puzzle (after its intro), and return its state."""
+        raise NotImplementedError
+
+    def _step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        """Update the given state with the player's answer, setting its outcome if the puzzle is over."""
+        raise NotImplementedError
+
+    def _announce(self, state: PuzzleState, player: Player) -> None:
+        """Output the lines for the outcome of the puzzle in the given state, if it is over."""
+        if state['outcome'] is not None:
+            for line in self.won if state['outcome'] == WON else self.lost:
+                player.say(line)
+
+
+def _is_list_of(value: Any, kind: type) -> bool:
+    """Return whether value is a list of values of the given type."""
+    return isinstance(value, list) and all(isinstance(v, kind) for v in value)
+
+
+def _is_count(value: Any, least: int) -> bool:
+    """Return whether value is an integer of at least the given value."""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= least
+
+
+@register_puzzle("rock paper scissors")
+class RockPaperScissors(Puzzle):
+    """A rock paper scissors match against an opponent choosing moves at random, won by the first to win the given
+    number of rounds. Ties are replayed.
+
+    Instance Attributes:
+        - wins: the number of rounds needed to win the match
+    """
+    MOVES: ClassVar[tuple[str, ...]] = ("rock", "paper", "scissors")
+    BEATS: ClassVar[set[tuple[str, str]]] = {("rock", "scissors"), ("scissors", "paper"), ("paper", "rock")}
+    wins: int
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        super().__init__(spec)
+        self.wins = spec.get('wins', 3)
+
+    @classmethod
+    def problems(cls, spec: dict[str, Any], item_names: Collection[str]) -> list[str]:
+        problems = super().problems(spec, item_names)
+        if not _is_count(spec.get('wins', 3), 1):
+            problems.append(f"{cls.kind} puzzle: 'wins' must be a positive number of rounds")
+        return problems
+
+    def prompt(self, state: PuzzleState) -> str:
+        return "\nEnter your move: "
+
+    def _begin(self, player: Player) -> PuzzleState:
+        return {'scores': [0, 0], 'opponent': self.MOVES[player.rng.randint(0, 2)]}
+
+    def _step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        if answer not in self.MOVES:
+            return
+        scores = state['scores']
+        if answer == state['opponent']:
+            player.say("Tie! try again.")
+        else:
+            scores[0 if (answer, state['opponent']) in self.BEATS else 1] += 1
+            player.say(f"Opponent's move: {state['opponent']}")
+            player.say(f"Current score: {scores[0]}-{scores[1]}")
+            if max(scores) >= self.wins:
+                state['outcome'] = WON if scores[0] > scores[1] else LOST
+                return
+        state['opponent'] = self.MOVES[player.rng.randint(0, 2)]
+
+
+@register_puzzle("wordle")
+class Wordle(Puzzle):
+    """A game of Wordle with a random word from the word list. The player may ask for a hint at any time, and is
+    offered the closest words in the word list when they guess a word that isn't in it.
+
+    Instance Attributes:
+        - guesses: the number of guesses the player has
+    """
+    SUGGESTIONS: ClassVar[int] = 5
+    guesses: int
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        super().__init__(spec)
+        self.guesses = spec.get('guesses', 6)
+
+    @classmethod
+    def problems(cls, spec: dict[str, Any], item_names: Collection[str]) -> list[str]:
+        problems = super().problems(spec, item_names)
+        if not _is_count(spec.get('guesses', 6), 1):
+            problems.append(f"{cls.kind} puzzle: 'guesses' must be a positive number of guesses")
+        return problems
+
+    def prompt(self, state: PuzzleState) -> str:
+        return "\nEnter a 5 letter word: "
+
+    def _begin(self, player: Player) -> PuzzleState:
+        player.say("-O-: correct, -/-: in the word but incorrect position, -X-: not in word.")
+        player.say("Stuck? Enter 'hint' for a suggestion.")
+        return {'answer': load_word_list().random_word(player.rng), 'guesses': [], 'left': self.guesses}
+
+    def _step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        words = load_word_list()
+        if answer == "hint":
+            # The solver is rebuilt from the guesses so far, rather than kept in the state
+            solver = WordleSolver(words.words)
+            for guess, code in state['guesses']:
+                solver.add_guess(guess, code)
+            player.say(f"Hint: try '{solver.hint()}'.")
+            return
+        if len(answer) != 5 or answer not in words:
+            player.say("Please enter a valid 5 letter word: ")
+            suggestions = load_word_tree().closest(answer, max(1, max_typos(answer)))
+            if suggestions:
+                player.say(f"Did you mean: {', '.join(suggestions[:self.SUGGESTIONS])}?")
+            return
+        player.say("====================")
+        code = pattern_code(answer, state['answer'])
+        state['guesses'].append([answer, code])
+        if answer == state['answer']:
+            state['outcome'] = WON
+            player.say("You got it!")
+        player.say(f"Your entry: {answer}")
+        player.say(f"result: {decode(code)}")
+        state['left'] -= 1
+        player.say(f"Turns left: {state['left']}")
+        if state['outcome'] is None and state['left'] == 0:
+            state['outcome'] = LOST
+
+
+@register_puzzle("unscramble")
+class Unscramble(Puzzle):
+    """Unscrambling a number of words chosen at random, one at a time. Any word from the puzzle's words or dictionary
+    made of the scrambled letters is a correct answer. A single wrong answer loses.
+
+    The words are chosen from a themed list if the puzzle has one, and from its dictionary otherwise. Words with more
+    than max_anagrams anagrams (counting the word itself) are never chosen, and a scramble is never itself a word.
+
+    Instance Attributes:
+        - words: the words to choose from
+        - index: the anagram index of the words that are accepted as answers
+        - rounds: the number of words the player must unscramble
+    """
+    default_rounds: ClassVar[int] = 5
+    default_anagrams: ClassVar[int] = 3
+    words: tuple[str, ...]
+    index: AnagramIndex
+    rounds: int
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        super().__init__(spec)
+        self.index, self.words = self._pool(spec)
+        self.rounds = spec.get('rounds', min(self.default_rounds, len(self.words)))
+
+    @classmethod
+    def _pool(cls, spec: dict[str, Any]) -> tuple[AnagramIndex, tuple[str, ...]]:
+        """Return the anagram index of the accepted answers, and the words to choose from, for the given settings.
+
+        Preconditions:
+            - 'words' in spec or 'dictionary' in spec
+        """
+        themed = spec.get('words', [])
+        index = load_anagram_index(spec['dictionary'], themed) if 'dictionary' in spec else AnagramIndex(themed)
+        most = spec.get('max_anagrams', cls.default_anagrams)
+        words = tuple(word for word in themed or index
+                      if len(index.anagrams(word)) <= most and arrangements(word) > len(index.anagrams(word)))
+        return index, words
+
+    @classmethod
+    def problems(cls, spec: dict[str, Any], item_names: Collection[str]) -> list[str]:
+        problems = super().problems(spec, item_names)
+        if 'words' not in spec and 'dictionary' not in spec:
+            return problems + [f"{cls.kind} puzzle: needs 'words' or a 'dictionary' to choose from"]
+        if 'words' in spec and (not _is_list_of(spec['words'], str) or not spec['words']):
+            problems.append(f"{cls.kind} puzzle: 'words' must be a non-empty list of words")
+        if 'dictionary' in spec and not isinstance(spec['dictionary'], str):
+            problems.append(f"{cls.kind} puzzle: 'dictionary' must be the name of a word file")
+        if not _is_count(spec.get('max_anagrams', cls.default_anagrams), 1):
+            problems.append(f"{cls.kind} puzzle: 'max_anagrams' must be a positive number of words")
+        if problems:
+            return problems
+        try:
+            _, words = cls._pool(spec)
+        except OSError as error:
+            return problems + [f"{cls.kind} puzzle: can't read dictionary: {error}"]
+        rounds = spec.get('rounds', min(cls.default_rounds, len(words)))
+        if not words:
+            problems.append(f"{cls.kind} puzzle: no words can be scrambled without too many solutions")
+        elif not _is_count(rounds, 1) or rounds > len(words):
+            problems.append(f"{cls.kind} puzzle: 'rounds' must be between 1 and the number of words that can be "
+                            f"scrambled ({len(words)})")
+        return problems
+
+    def prompt(self, state: PuzzleState) -> str:
+        return "\nUnscrambled word: "
+
+    def resume(self, state: PuzzleState, player: Player) -> None:
+        player.say(state['scrambled'])
+
+    def _begin(self, player: Player) -> PuzzleState:
+        words = list(self.words)
+        player.rng.shuffle(words)
+        state = {'words': words[:self.rounds], 'round': 0}
+        self._scramble(state, player)
+        return state
+
+    def _scramble(self, state: PuzzleState, player: Player) -> None:
+        """Scramble the word of the current round until it doesn't spell an answer, and show it to the player."""
+        word = state['words'][state['round']]
+        answers = self.index.anagrams(word)
+        letters = list(word)
+        player.rng.shuffle(letters)
+        while "".join(letters).lower() in answers:
+            player.rng.shuffle(letters)
+        state['scrambled'] = "".join(letters)
+        player.say(state['scrambled'])
+
+    def _step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        word = state['words'][state['round']]
+        if not self.index.is_anagram(answer, word):
+            player.say("Incorrect. You'll have to try again!")
+            state['outcome'] = LOST
+            return
+        if answer == word.lower():
+            player.say("Correct!")
+        else:
+            player.say(f"Correct! The word we had in mind was '{word}', but '{answer}' works too.")
+        state['round'] += 1
+        if state['round'] < len(state['words']):
+            self._scramble(state, player)
+        else:
+            player.say()
+            player.say(f"Congratulations! You got {state['round']}/{len(state['words'])}!")
+            state['outcome'] = WON
+
+
+@register_puzzle("sequence")
+class Sequence(Puzzle):
+    """Several puzzles played one after the other, won by winning all of them. The turns of the puzzles in the
+    sequence are ignored: playing the whole sequence uses the sequence's turns.
+
+    Instance Attributes:
+        - puzzles: the puzzles, in the order they are played
+    """
+    puzzles: tuple[Puzzle, ...]
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        super().__init__(spec)
+        self.puzzles = tuple(make_puzzle(part) for part in spec['puzzles'])
+
+    @classmethod
+    def problems(cls, spec: dict[str, Any], item_names: Collection[str]) -> list[str]:
+        problems = super().problems(spec, item_names)
+        parts = spec.get('puzzles')
+        if not isinstance(parts, list) or not parts:
+            return problems + [f"{cls.kind} puzzle: 'puzzles' must be a non-empty list of puzzles"]
+        for part in parts:
+            problems.extend(puzzle_problems(part, item_names))
+        return problems
+
+    def prompt(self, state: PuzzleState) -> str:
+        return self.puzzles[state['stage']].prompt(state['part'])
+
+    def resume(self, state: PuzzleState, player: Player) -> None:
+        self.puzzles[state['stage']].resume(state['part'], player)
+
+    def _begin(self, player: Player) -> PuzzleState:
+        state = {'stage': 0, 'part': self.puzzles[0].begin(player)}
+        self._advance(state, player)
+        return state
+
+    def _step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        self.puzzles[state['stage']].step(state['part'], answer, player)
+        self._advance(state, player)
+
+    def _advance(self, state: PuzzleState, player: Player) -> None:
+        """Move on to the next puzzle while the current one has been won, and set the outcome once the sequence is
+        over."""
+        while state['part']['outcome'] == WON and state['stage'] + 1 < len(self.puzzles):
+            state['stage'] += 1
+            state['part'] = self.puzzles[state['stage']].begin(player)
+        state['outcome'] = state['part']['outcome']
+
+
+@register_puzzle("exchange")
+class Exchange(Puzzle):
+    """Handing over an item for the puzzle's item. It is won immediately if the player holds the item to hand over,
+    and lost otherwise, and uses no turns by default.
+    """
+    default_turns = 0
+
+    def __init__(self, spec: dict[str, Any]) -> None:
+        super().__init__(spec)
+        self.gives = spec['give']
+
+    @classmethod
+    def problems(cls, spec: dict[str, Any], item_names: Collection[str]) -> list[str]:
+        problems = super().problems(spec, item_names)
+        if spec.get('give') not in item_names:
+            problems.append(f"{cls.kind} puzzle: 'give' must be the name of an item")
+        return problems
+
+    def prompt(self, state: PuzzleState) -> str:
+        return ""
+
+    def _begin(self, player: Player) -> PuzzleState:
+        return {'outcome': WON if self.gives in player.held else LOST}
+
+    def _step(self, state: PuzzleState, answer: str, player: Player) -> None:
+        raise AssertionError("an exchange never asks for input")
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
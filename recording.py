@@ -0,0 +1,62 @@
+"""CSC111 Project 1: Text Adventure Game - Session Recording
+
+This module contains the Recording class, which captures everything needed to reproduce a game exactly:
+the game's settings, the seed of its random number generator, and every input with the time it was entered.
+Recordings are replayed with the replay module.
+"""
+from __future__ import annotations
+import json
+from dataclasses import asdict, dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class Recording:
+    """A record of one game, from which it can be replayed.
+
+    Instance Attributes:
+        - game_data_file: the game data file the game was loaded from
+        - initial_location_id: the location the game started at
+        - turns: the number of turns the game started with
+        - time_limit: the number of seconds the player had to finish the game
+        - seed: the seed of the game's random number generator
+        - inputs: each input given to the game, with the number of seconds since the game started when it was given
+        - outcome: the state the game ended in (see AdventureGame.outcome), or None if it hasn't been recorded yet
+        - expired_at: the number of seconds since the game started when it was ended by running out of time while
+          waiting for input (see AdventureGame.expire), or None if it wasn't
+
+    Representation Invariants:
+        - all(t1 <= t2 for (t1, _), (t2, _) in zip(self.inputs, self.inputs[1:]))
+    """
+    game_data_file: str
+    initial_location_id: int
+    turns: int
+    time_limit: float
+    seed: int
+    inputs: list[tuple[float, str]] = field(default_factory=list)
+    outcome: Optional[dict[str, Any]] = None
+    expired_at: Optional[float] = None
+
+    def save(self, path: str) -> None:
+        """Save this recording to the given file as JSON."""
+        with open(path, 'w') as f:
+            json.dump(asdict(self), f)
+
+    @classmethod
+    def load(cls, path: str) -> Recording:
+        """Return the recording saved in the given file."""
+        with open(path) as f:
+            data = json.load(f)
+        data['inputs'] = [(t, command) for t, command in data['inputs']]
+        return cls(**data)
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
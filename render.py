@@ -0,0 +1,94 @@
+"""CSC111 Project 1: Text Adventure Game - Description Rendering
+
+This module wraps location descriptions into lines for display. Descriptions never change during a game, so each
+description is wrapped once per process (and per display width) and shared by every game, instead of being split
+and joined again every turn.
+"""
+from __future__ import annotations
+import textwrap
+from typing import Mapping, Optional
+
+from game_entities import Location
+
+WORDS_PER_LINE = 25
+
+
+def wrap_words(text: str, words_per_line: int = WORDS_PER_LINE) -> tuple[str, ...]:
+    """Return the given text split into lines of at most words_per_line words.
+
+    >>> wrap_words("a b c d e", 2)
+    ('a b', 'c d', 'e')
+    """
+    words = text.split(" ")
+    return tuple(" ".join(words[i:i + words_per_line]) for i in range(0, len(words), words_per_line))
+
+
+def wrap_width(text: str, width: int) -> tuple[str, ...]:
+    """Return the given text split into lines of at most width characters, breaking only between words
+    (a single word longer than width gets a line of its own)."""
+    return tuple(textwrap.wrap(text, width, break_long_words=False, break_on_hyphens=False)) or ("",)
+
+
+class DescriptionRenderer:
+    """The wrapped descriptions of the locations of one world.
+
+    Descriptions are wrapped into lines of WORDS_PER_LINE words by default, or to a given width in characters.
+
+    Instance Attributes:
+        - capacity: the number of wrapped descriptions kept before they are all forgotten, or None to keep all
+    """
+    # Private Instance Attributes:
+    #   - _lines: the wrapped lines of each description, by (location id, whether it is the long description, width)
+    #   - _exits: the lines listing each location's available commands, by location id
+
+    capacity: Optional[int]
+    _lines: dict[tuple[int, bool, Optional[int]], tuple[str, ...]]
+    _exits: dict[int, tuple[str, ...]]
+
+    def __init__(self, locations: Mapping[int, Location], prerender: bool = True,
+                 capacity: Optional[int] = None) -> None:
+        """Initialize a renderer for the given locations, wrapping all of their descriptions now if prerender is
+        True, and only when they are first needed otherwise."""
+        self.capacity = capacity
+        self._lines = {}
+        self._exits = {}
+        if prerender:
+            for location in locations.values():
+                self.description(location, True)
+                self.description(location, False)
+                self.exits(location)
+
+    def description(self, location: Location, long: bool, width: Optional[int] = None) -> tuple[str, ...]:
+        """Return the lines of the long (or brief) description of the given location, wrapped to the given width
+        in characters, or into lines of WORDS_PER_LINE words if width is None."""
+        key = (location.id_num, long, width)
+        lines = self._lines.get(key)
+        if lines is None:
+            text = location.long_description if long else location.brief_description
+            lines = wrap_words(text) if width is None else wrap_width(text, width)
+            if self.capacity is not None and len(self._lines) >= self.capacity:
+                self._lines.clear()
+            self._lines[key] = lines
+        return lines
+
+    def exits(self, location: Location) -> tuple[str, ...]:
+        """Return the lines listing the available commands of the given location."""
+        lines = self._exits.get(location.id_num)
+        if lines is None:
+            lines = ("At this location, you can also:",
+                     *(f"- {action}" for action in location.available_commands))
+            if self.capacity is not None and len(self._exits) >= self.capacity:
+                self._exits.clear()
+            self._exits[location.id_num] = lines
+        return lines
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
@@ -0,0 +1,100 @@
+"""CSC111 Project 1: Text Adventure Game - Replay
+
+This module replays recorded games (see the recording module) headlessly, as fast as possible, and checks that
+each replay ends in the same state as the original game. This reproduces player bug reports exactly, and lets a
+whole directory of recordings be used as a regression corpus:
+
+    python adventure.py --record bug.json
+    python replay.py bug.json recordings/*.json
+"""
+from __future__ import annotations
+import argparse
+from multiprocessing import Pool
+from typing import Optional
+
+from adventure import AdventureGame
+from recording import Recording
+
+
+class ReplayMismatch(Exception):
+    """Raised when a replayed game doesn't end in the same state as the recorded game.
+
+    Instance Attributes:
+        - expected: the outcome of the recorded game
+        - actual: the outcome of the replay
+    """
+    expected: dict
+    actual: dict
+
+    def __init__(self, expected: dict, actual: dict) -> None:
+        differences = [f"{k}: expected {expected[k]!r}, got {actual.get(k)!r}"
+                       for k in expected if expected[k] != actual.get(k)]
+        super().__init__("replay diverged from recording: " + "; ".join(differences))
+        self.expected = expected
+        self.actual = actual
+
+
+class ReplayClock:
+    """A clock that only moves when it is told to, so that a replay sees the same times as the recorded game.
+
+    Instance Attributes:
+        - now: the current time
+    """
+    now: float
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def replay(recording: Recording, check: bool = True) -> AdventureGame:
+    """Replay the given recording and return the resulting game.
+
+    If check is True and the recording has an outcome, raise ReplayMismatch if the replay ends in a different state.
+    """
+    clock = ReplayClock()
+    game = AdventureGame(recording.game_data_file, recording.initial_location_id, recording.turns,
+                         recording.time_limit, clock, recording.seed)
+    game.start()
+    for elapsed, command in recording.inputs:
+        clock.now = elapsed
+        game.step(command)
+    if recording.expired_at is not None:
+        clock.now = recording.expired_at
+        game.expire()
+
+    if check and recording.outcome is not None and game.outcome() != recording.outcome:
+        raise ReplayMismatch(recording.outcome, game.outcome())
+    return game
+
+
+def check_recording(path: str) -> Optional[str]:
+    """Replay the recording saved in the given file, and return a description of how it diverged,
+    or None if it reproduced the recorded outcome."""
+    try:
+        replay(Recording.load(path))
+    except ReplayMismatch as error:
+        return str(error)
+    return None
+
+
+def replay_corpus(paths: list[str], processes: Optional[int] = None) -> dict[str, str]:
+    """Replay every recording in the given files using a pool of processes (one per CPU by default), and return a
+    mapping from the path of each recording that diverged to how it diverged."""
+    with Pool(processes) as pool:
+        results = pool.map(check_recording, paths, chunksize=max(1, len(paths) // 64))
+    return {path: error for path, error in zip(paths, results) if error is not None}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded games and check they end the same way.")
+    parser.add_argument('recordings', nargs='+', metavar='RECORDING')
+    parser.add_argument('--processes', type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    failures = replay_corpus(args.recordings, args.processes)
+    for failed, reason in failures.items():
+        print(f"{failed}: {reason}")
+    print(f"{len(args.recordings) - len(failures)}/{len(args.recordings)} recordings reproduced.")
+    raise SystemExit(1 if failures else 0)
@@ -0,0 +1,261 @@
+"""CSC111 Project 1: Text Adventure Game - Results Store
+
+This module keeps the results of finished games in a SQLite database, for leaderboards and each player's history.
+
+Games record their results through a ResultsWriter, which writes them to the database on a background thread. A game
+only adds its result to a queue, and never waits for the disk. The writer thread writes every result waiting in the
+queue in one transaction, so the more results arrive at once, the fewer (and cheaper per result) the transactions.
+
+Every query is answered from an index, so it only reads the rows it returns, however many results are stored:
+
+    python results_store.py top
+    python results_store.py fastest --limit 5
+    python results_store.py history alice
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from adventure import SUBMITTED, AdventureGame
+from metrics import METRICS
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.db")
+
+_COLUMNS = "player, score, turns_used, elapsed, ending, puzzle_attempts, event_ids, finished_at"
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    turns_used INTEGER NOT NULL,
+    elapsed REAL NOT NULL,
+    ending TEXT NOT NULL,
+    puzzle_attempts TEXT NOT NULL,
+    event_ids BLOB NOT NULL,
+    finished_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_score ON results (score DESC, elapsed);
+CREATE INDEX IF NOT EXISTS results_by_time ON results (elapsed) WHERE ending = '{SUBMITTED}';
+CREATE INDEX IF NOT EXISTS results_by_player ON results (player, finished_at DESC);
+"""
+
+
+@dataclass(frozen=True)
+class GameResult:
+    """The result of one finished game.
+
+    Instance Attributes:
+        - player: the name of the player
+        - score: the player's final score
+        - turns_used: the number of turns the player used
+        - elapsed: the number of seconds the game took
+        - ending: how the game ended (see AdventureGame.ending)
+        - puzzle_attempts: the number of times the player started the puzzle of each item
+        - event_ids: the location id of every event of the game, in order (see EventList.get_id_log)
+        - finished_at: when the game ended, in seconds since the epoch
+
+    Representation Invariants:
+        - self.turns_used >= 0
+        - all(attempts > 0 for attempts in self.puzzle_attempts.values())
+    """
+    player: str
+    score: int
+    turns_used: int
+    elapsed: float
+    ending: str
+    puzzle_attempts: dict[str, int]
+    event_ids: list[int]
+    finished_at: float
+
+
+def game_result(game: AdventureGame) -> GameResult:
+    """Return the result of the given game, which has just ended.
+
+    Preconditions:
+        - game.ending is not None
+    """
+    return GameResult(game.player, game.score, game.recording.turns - game.turnsleft,
+                      round(game.time_limit - game.time_left(), 3), game.ending, dict(game.puzzle_attempts),
+                      game.event_log.get_id_log(), time.time())
+
+
+def _row(result: GameResult) -> tuple:
+    """Return the database row for the given result."""
+    return (result.player, result.score, result.turns_used, result.elapsed, result.ending,
+            json.dumps(result.puzzle_attempts), array('q', result.event_ids).tobytes(), result.finished_at)
+
+
+def _result(row: tuple) -> GameResult:
+    """Return the result in the given database row."""
+    player, score, turns_used, elapsed, ending, attempts, event_ids, finished_at = row
+    ids = array('q')
+    ids.frombytes(event_ids)
+    return GameResult(player, score, turns_used, elapsed, ending, json.loads(attempts), ids.tolist(), finished_at)
+
+
+class ResultsStore:
+    """A SQLite database of game results.
+
+    A store can only be used from the thread that opened it. Each thread should open its own store on the same
+    database file.
+
+    Instance Attributes:
+        - path: the database file, or ":memory:" for a database that is only kept in memory
+    """
+    # Private Instance Attributes:
+    #   - _connection: the connection to the database
+
+    path: str
+    _connection: sqlite3.Connection
+
+    def __init__(self, path: str = RESULTS_FILE) -> None:
+        """Open the database in the given file, creating it if it doesn't exist."""
+        self.path = path
+        self._connection = sqlite3.connect(path)
+        # Readers don't block the writer (and vice versa), and commits don't wait for the disk to sync
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def __len__(self) -> int:
+        return self._connection.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def add(self, results: Iterable[GameResult]) -> None:
+        """Add the given results to the database, in a single transaction."""
+        with self._connection:
+            self._connection.executemany(f"INSERT INTO results ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                         map(_row, results))
+
+    def top_scores(self, limit: int = 10) -> list[GameResult]:
+        """Return the limit results with the highest scores, the fastest first among equal scores."""
+        return self._select("ORDER BY score DESC, elapsed LIMIT ?", limit)
+
+    def fastest(self, limit: int = 10) -> list[GameResult]:
+        """Return the limit fastest results of games in which the player submitted their assignment."""
+        return self._select(f"WHERE ending = '{SUBMITTED}' ORDER BY elapsed LIMIT ?", limit)
+
+    def history(self, player: str, limit: int = 10) -> list[GameResult]:
+        """Return the limit most recent results of the given player, the most recent first."""
+        return self._select("WHERE player = ? ORDER BY finished_at DESC LIMIT ?", player, limit)
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def _select(self, clauses: str, *parameters: object) -> list[GameResult]:
+        """Return the results selected by the given SQL clauses, with the given parameters."""
+        rows = self._connection.execute(f"SELECT {_COLUMNS} FROM results {clauses}", parameters)
+        return [_result(row) for row in rows]
+
+
+# Put in a ResultsWriter's queue to stop its thread
+_STOP = object()
+
+
+class ResultsWriter:
+    """Adds game results to a ResultsStore from a background thread, in batches.
+
+    Instance Attributes:
+        - path: the database file results are added to
+        - batch_size: the most results added in a single transaction
+        - written: the number of results added to the database so far
+        - dropped: the number of results that couldn't be added to the database
+
+    Representation Invariants:
+        - self.batch_size > 0
+    """
+    # Private Instance Attributes:
+    #   - _queue: the results submitted but not yet added to the database, followed by _STOP once closed
+    #   - _thread: the thread adding results to the database
+
+    path: str
+    batch_size: int
+    written: int
+    dropped: int
+    _queue: queue.Queue
+    _thread: threading.Thread
+
+    def __init__(self, path: str = RESULTS_FILE, batch_size: int = 1000) -> None:
+        """Initialize a writer adding results to the database in the given file, and start its thread."""
+        self.path = path
+        self.batch_size = batch_size
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="results-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, result: GameResult) -> None:
+        """Add the given result to the database soon. This never waits for the database."""
+        self._queue.put(result)
+
+    def flush(self) -> None:
+        """Wait until every result submitted so far has been added to the database."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Add every result submitted so far to the database, then stop the writer's thread."""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _run(self) -> None:
+        """Add results to the database as they are submitted, until the writer is closed."""
+        store = ResultsStore(self.path)
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stopping = batch[-1] is _STOP
+                results = batch[:-1] if stopping else batch
+                try:
+                    store.add(results)
+                    self.written += len(results)
+                    METRICS.inc("results_written", len(results))
+                except sqlite3.Error:
+                    self.dropped += len(results)
+                    METRICS.inc("results_dropped", len(results))
+                finally:
+                    for _ in batch:
+                        self._queue.task_done()
+        finally:
+            store.close()
+
+
+def _show(results: list[GameResult]) -> None:
+    """Print the given results as a table."""
+    for rank, result in enumerate(results, 1):
+        finished = time.strftime("%Y-%m-%d %H:%M", time.localtime(result.finished_at))
+        print(f"{rank:>3}. {result.player:<20} {result.score:>4} points {result.turns_used:>3} turns "
+              f"{result.elapsed:>7.1f}s  {result.ending:<13} {finished}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show the leaderboards and players' results.")
+    parser.add_argument('query', choices=['top', 'fastest', 'history'])
+    parser.add_argument('player', nargs='?', help="the player whose history to show")
+    parser.add_argument('--db', default=RESULTS_FILE, help="the results database")
+    parser.add_argument('--limit', type=int, default=10)
+    args = parser.parse_args()
+    if args.query == 'history' and args.player is None:
+        parser.error("history needs the name of a player")
+    results_store = ResultsStore(args.db)
+    if args.query == 'top':
+        _show(results_store.top_scores(args.limit))
+    elif args.query == 'fastest':
+        _show(results_store.fastest(args.limit))
+    else:
+        _show(results_store.history(args.player, args.limit))
+    results_store.close()
@@ -0,0 +1,182 @@
+"""CSC111 Project 1: Text Adventure Game - Saving and Resuming Games
+
+This module saves games in progress to compact files, and resumes them.
+
+A save file is a sequence of records, each a 4 byte length followed by a pickle. The first record holds the full
+state of the game (see AdventureGame.get_state), and every following record is an incremental checkpoint holding
+only what changed since the record before it. This makes checkpointing after every turn cheap: usually a few
+changed numbers and the newest event and input. A record cut short by a crash is ignored when loading, and a file
+rewritten with a new full record replaces the old one only once it is completely written.
+"""
+from __future__ import annotations
+import os
+import pickle
+import struct
+import time
+from typing import Any, Callable, Optional
+
+from adventure import AdventureGame
+
+# State values that only grow at the end between checkpoints, so a checkpoint only needs their new elements
+_APPEND_ONLY = ('event_ids', 'event_commands', 'inputs')
+_LENGTH = struct.Struct('<I')
+
+
+class Checkpointer:
+    """Saves one game to a file after every turn, writing only what changed since the last checkpoint.
+
+    Instance Attributes:
+        - path: the file the game is saved to
+        - compact_every: the number of incremental checkpoints after which the whole file is rewritten
+          with a single full record, so that loading it stays fast
+
+    Representation Invariants:
+        - self.compact_every > 0
+    """
+    # Private Instance Attributes:
+    #   - _last: the state of the game at the last checkpoint, or None if nothing has been written yet
+    #   - _records: the number of incremental records written since the last full record
+
+    path: str
+    compact_every: int
+    _last: Optional[dict[str, Any]]
+    _records: int
+
+    def __init__(self, path: str, compact_every: int = 64) -> None:
+        """Initialize a checkpointer that saves to the given file. The first checkpoint replaces the file."""
+        self.path = path
+        self.compact_every = compact_every
+        self._last = None
+        self._records = 0
+
+    def checkpoint(self, game: AdventureGame) -> int:
+        """Save the given game, and return the number of bytes written."""
+        state = game.get_state()
+        if self._last is None or self._records >= self.compact_every:
+            written = _replace_records(self.path, [('full', state)])
+            self._records = 0
+        else:
+            changed = {}
+            extended = {}
+            for key, value in state.items():
+                old = self._last.get(key)
+                if key == 'rng' and value != old:
+                    changed[key] = _rng_patch(old, value)
+                elif key in _APPEND_ONLY and len(value) >= len(old) and value[:len(old)] == old:
+                    if len(value) > len(old):
+                        extended[key] = value[len(old):]
+                elif value != old:
+                    changed[key] = value
+            written = _write_records(self.path, 'ab', [('delta', changed, extended)])
+            self._records += 1
+        self._last = state
+        return written
+
+
+def _rng_patch(old: tuple, new: tuple) -> tuple:
+    """Return a patch turning the random number generator state old into new.
+
+    Drawing random numbers usually only changes a few words of the generator's internal state, so the patch is a
+    list of (position, value) pairs for the internal state instead of the whole state.
+    """
+    version, internal, gauss_next = new
+    return 'patch', version, [(i, v) for i, (v, o) in enumerate(zip(internal, old[1])) if v != o], gauss_next
+
+
+def _apply_rng_patch(old: tuple, patch: tuple) -> tuple:
+    """Return the random number generator state produced by applying the given patch (from _rng_patch) to old."""
+    _, version, changes, gauss_next = patch
+    internal = list(old[1])
+    for i, v in changes:
+        internal[i] = v
+    return version, tuple(internal), gauss_next
+
+
+def _encode_records(records: list[tuple]) -> bytearray:
+    """Return the given records as they are stored in a save file."""
+    data = bytearray()
+    for record in records:
+        payload = pickle.dumps(record, protocol=pickle.HIGHEST_PROTOCOL)
+        data += _LENGTH.pack(len(payload))
+        data += payload
+    return data
+
+
+def _write_records(path: str, mode: str, records: list[tuple]) -> int:
+    """Write the given records to the file at path, opened with the given mode, and return the bytes written."""
+    data = _encode_records(records)
+    with open(path, mode) as f:
+        f.write(data)
+    return len(data)
+
+
+def _replace_records(path: str, records: list[tuple]) -> int:
+    """Replace the file at path with one holding the given records, and return the bytes written.
+
+    The records are written to a temporary file first, which then replaces the old file in a single step, so a crash
+    while writing leaves the old file as it was.
+    """
+    data = _encode_records(records)
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    return len(data)
+
+
+def load_state(path: str) -> dict[str, Any]:
+    """Return the state of the game saved in the given file, as of its last complete checkpoint."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    state = None
+    pos = 0
+    while pos + _LENGTH.size <= len(data):
+        (length,) = _LENGTH.unpack_from(data, pos)
+        pos += _LENGTH.size
+        if pos + length > len(data):
+            break
+        record = pickle.loads(data[pos:pos + length])
+        pos += length
+        if record[0] == 'full':
+            state = record[1]
+        else:
+            _, changed, extended = record
+            if 'rng' in changed:
+                changed['rng'] = _apply_rng_patch(state['rng'], changed['rng'])
+            state.update(changed)
+            for key, tail in extended.items():
+                state[key] = state[key] + tail
+    if state is None:
+        raise ValueError(f"{path} does not contain a saved game")
+    return state
+
+
+def save_game(game: AdventureGame, path: str) -> int:
+    """Save the full state of the given game to the given file, and return the number of bytes written."""
+    return Checkpointer(path).checkpoint(game)
+
+
+def load_game(path: str, clock: Callable[[], float] = time.monotonic) -> AdventureGame:
+    """Return the game saved in the given file. Call start on it to resume playing."""
+    return AdventureGame.from_state(load_state(path), clock)
+
+
+def delete_save(path: str) -> None:
+    """Delete the given save file, if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
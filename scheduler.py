@@ -0,0 +1,198 @@
+"""CSC111 Project 1: Text Adventure Game - Deadline Scheduler
+
+This module contains DeadlineScheduler, which calls functions when their deadlines on the monotonic clock are due.
+The game server uses one scheduler for all of its sessions, to warn players that their time is running out, end
+their games when it does, and disconnect idle players, on time and whether or not they send any input.
+
+Deadlines are kept in a binary heap ordered by due time, so scheduling a deadline and running it when it is due each
+take O(log n) time for n deadlines. Cancelling and rescheduling a deadline only mark its old heap entry as stale, and
+stale entries are dropped when they reach the top of the heap, or all at once when they make up most of it. Attached
+to an asyncio event loop, the scheduler keeps a single timer on the loop, for its earliest deadline.
+
+The deadlines of a saved session are cancelled when the player disconnects, and scheduled again from the time left on
+the game's own clock (which stops while the game is saved) when they resume it, even on another server process.
+
+    scheduler = DeadlineScheduler()
+    scheduler.attach(asyncio.get_running_loop())
+    deadline = scheduler.schedule(600, end_game, session)
+    scheduler.reschedule(deadline, 300)
+"""
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Callable, Iterator, Optional
+
+# The heap is rebuilt without its stale entries once there are more than this many and they are most of the heap
+_COMPACT_MINIMUM = 64
+
+
+class Deadline:
+    """A function to call at a given time.
+
+    Instance Attributes:
+        - when: the time (on the scheduler's clock) at which the deadline is due, if it is scheduled
+        - callback: the function called when the deadline is due
+        - args: the arguments callback is called with
+    """
+    # Private Instance Attributes:
+    #   - _entry: the sequence number of this deadline's live heap entry, or None if it isn't scheduled
+
+    when: float
+    callback: Callable[..., Any]
+    args: tuple
+    _entry: Optional[int]
+
+    def __init__(self, callback: Callable[..., Any], args: tuple) -> None:
+        self.when = 0.0
+        self.callback = callback
+        self.args = args
+        self._entry = None
+
+    @property
+    def scheduled(self) -> bool:
+        """Return whether this deadline is waiting to be called."""
+        return self._entry is not None
+
+
+class DeadlineScheduler:
+    """Deadlines on a monotonic clock, called in order of due time.
+
+    Callbacks are called from run_due (or from the event loop the scheduler is attached to), and must not raise.
+    """
+    # Private Instance Attributes:
+    #   - _clock: function returning the current time in seconds
+    #   - _heap: (due time, sequence number, deadline) for every scheduled deadline, and for stale entries
+    #   - _counter: the sequence numbers given to heap entries, which keep entries with the same due time in order
+    #   - _stale: the number of stale entries in _heap
+    #   - _loop: the event loop the scheduler is attached to, or None
+    #   - _timer: the loop's timer for the earliest deadline, or None
+    #   - _timer_when: the due time the timer was set for
+
+    _clock: Callable[[], float]
+    _heap: list[tuple[float, int, Deadline]]
+    _counter: Iterator[int]
+    _stale: int
+    _loop: Optional[asyncio.AbstractEventLoop]
+    _timer: Optional[asyncio.TimerHandle]
+    _timer_when: float
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        """Initialize a scheduler with no deadlines, using the given clock."""
+        self._clock = clock
+        self._heap = []
+        self._counter = itertools.count()
+        self._stale = 0
+        self._loop = None
+        self._timer = None
+        self._timer_when = 0.0
+
+    def __len__(self) -> int:
+        """Return the number of scheduled deadlines."""
+        return len(self._heap) - self._stale
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Call deadlines from the given event loop when they are due, until detach is called."""
+        self._loop = loop
+        self._arm()
+
+    def detach(self) -> None:
+        """Stop calling deadlines from the event loop. Deadlines stay scheduled, and can be run with run_due."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._loop = None
+
+    def schedule(self, delay: float, callback: Callable[..., Any], *args: Any) -> Deadline:
+        """Schedule a call of callback with the given arguments in delay seconds, and return its deadline."""
+        deadline = Deadline(callback, args)
+        self._push(deadline, self._clock() + delay)
+        return deadline
+
+    def cancel(self, deadline: Deadline) -> None:
+        """Stop the given deadline from being called. Cancelling a deadline that isn't scheduled does nothing."""
+        if deadline.scheduled:
+            self._retire(deadline)
+
+    def reschedule(self, deadline: Deadline, delay: float) -> None:
+        """Make the given deadline due in delay seconds instead, scheduling it again if it was cancelled or already
+        called."""
+        if deadline.scheduled:
+            self._retire(deadline)
+        self._push(deadline, self._clock() + delay)
+
+    def next_delay(self) -> Optional[float]:
+        """Return the number of seconds until the earliest deadline is due (0 if it is overdue), or None if no
+        deadline is scheduled."""
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return max(0.0, self._heap[0][0] - self._clock())
+
+    def run_due(self) -> int:
+        """Call every deadline that is due, in order of due time, and return the number called.
+
+        Deadlines scheduled by the callbacks are called too if they are already due.
+        """
+        called = 0
+        now = self._clock()
+        while True:
+            self._drop_stale()
+            if not self._heap or self._heap[0][0] > now:
+                return called
+            _, _, deadline = heapq.heappop(self._heap)
+            deadline._entry = None
+            deadline.callback(*deadline.args)
+            called += 1
+
+    def _push(self, deadline: Deadline, when: float) -> None:
+        """Add a heap entry making the given deadline due at the given time."""
+        deadline.when = when
+        deadline._entry = next(self._counter)
+        heapq.heappush(self._heap, (when, deadline._entry, deadline))
+        if self._loop is not None and (self._timer is None or when < self._timer_when):
+            self._arm()
+
+    def _retire(self, deadline: Deadline) -> None:
+        """Make the live heap entry of the given scheduled deadline stale."""
+        deadline._entry = None
+        self._stale += 1
+        if self._stale > _COMPACT_MINIMUM and self._stale * 2 > len(self._heap):
+            self._heap = [entry for entry in self._heap if entry[2]._entry == entry[1]]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _drop_stale(self) -> None:
+        """Remove stale entries from the top of the heap."""
+        while self._heap and self._heap[0][2]._entry != self._heap[0][1]:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+
+    def _arm(self) -> None:
+        """Set the event loop's timer for the earliest deadline."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        delay = self.next_delay()
+        if delay is not None:
+            self._timer_when = self._heap[0][0]
+            self._timer = self._loop.call_later(delay, self._fire)
+
+    def _fire(self) -> None:
+        """Call the deadlines that are due, and set the timer for the next one."""
+        self._timer = None
+        self.run_due()
+        if self._loop is not None and self._timer is None:
+            self._arm()
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
@@ -0,0 +1,293 @@
+"""CSC111 Project 1: Text Adventure Game - Solver
+
+This module proves whether a game world can be won, and in how few turns, by searching every state the game can
+reach: the player's location, inventory, the items left at each location, and their score.
+
+States are explored one turn at a time (a breadth-first search where moves and puzzles cost a turn and picking up,
+exchanging and dropping items are free), and every state is only explored once. Each round of the search splits its
+states between a pool of processes, so large worlds are explored on every CPU.
+
+The solver assumes the player wins every puzzle on their first try, so the minimum turns it reports is a lower
+bound for real players. The time limit is not modelled.
+
+    python solver.py game_data.json --turns 25
+"""
+from __future__ import annotations
+import argparse
+import heapq
+import os
+from collections import defaultdict
+from dataclasses import dataclass, field
+from multiprocessing import Pool
+from typing import Optional
+
+from adventure import KEEP_PLAYING_SCORE, REQUIRED_ITEMS, SUBMIT_LOCATION
+from world import World, load_world
+
+# A state is (location id, inventory, items on the ground, score). The inventory has bit i set if the player holds
+# item i. Items on the ground have bit 2i set if item i is at its start position and bit 2i + 1 if it is at its
+# target position. Scores are capped at KEEP_PLAYING_SCORE, since higher scores don't change what the player can do.
+State = tuple[int, int, int, int]
+
+# The successor of a state reached by submitting the assignment
+WON = (0, 0, 0, 0)
+
+# Rounds with fewer states than this are explored in this process, since sending them to the pool costs more
+_PARALLEL_THRESHOLD = 2048
+
+
+@dataclass(frozen=True)
+class Rules:
+    """What the player can do in a world, in the form used by the search.
+
+    Instance Attributes:
+        - exits: a mapping from each location id to its available commands and the locations they lead to
+        - names: the name of each item, by item number
+        - starts: the start position of each item, by item number
+        - targets: the target position of each item, by item number
+        - points: the points of each item, by item number
+        - required: the bits of the items needed to submit
+        - puzzle_turns: the turns taken to win the puzzle (or make the exchange) of each item at its start position,
+          or 0 if it has none, by item number
+        - exchanges: the number of the item that must be handed over to get each item at its start position
+          instead of picking it up, or None if it can be picked up, by item number
+    """
+    exits: dict[int, tuple[tuple[str, int], ...]]
+    names: tuple[str, ...]
+    starts: tuple[int, ...]
+    targets: tuple[int, ...]
+    points: tuple[int, ...]
+    required: int
+    puzzle_turns: tuple[int, ...]
+    exchanges: tuple[Optional[int], ...]
+
+    @classmethod
+    def from_world(cls, world: World) -> Rules:
+        """Return the rules of the given world."""
+        names = tuple(world.items)
+        items = [world.items[name] for name in names]
+        puzzles = [world.puzzles.get(name) for name in names]
+        return cls({loc_id: tuple(loc.available_commands.items()) for loc_id, loc in world.locations.items()},
+                   names, tuple(item.start_position for item in items),
+                   tuple(item.target_position for item in items), tuple(item.target_points for item in items),
+                   sum(1 << names.index(name) for name in REQUIRED_ITEMS),
+                   tuple(p.turns if p is not None else 0 for p in puzzles),
+                   tuple(names.index(p.gives) if p is not None and p.gives is not None else None for p in puzzles))
+
+    def start_state(self, location_id: int) -> State:
+        """Return the state at the start of a game starting at the given location."""
+        return location_id, 0, sum(1 << (2 * i) for i in range(len(self.names))), 0
+
+    def successors(self, state: State) -> list[tuple[str, State, int]]:
+        """Return (command, next state, turns taken) for every command that changes the given state.
+
+        The next state is WON if the command wins the game.
+        """
+        loc, inventory, ground, score = state
+        result = [(command, (target, inventory, ground, score), 1) for command, target in self.exits[loc]]
+
+        for i, name in enumerate(self.names):
+            bit = 1 << i
+            points = self.points[i]
+            if self.starts[i] == loc and ground >> (2 * i) & 1:
+                on_ground = 1 << (2 * i)
+            elif self.targets[i] == loc and ground >> (2 * i + 1) & 1:
+                on_ground = 1 << (2 * i + 1)
+            else:
+                on_ground = 0
+
+            if on_ground and self.starts[i] == loc and self.exchanges[i] is not None:
+                # The item is taken from where it is, like one picked up; the item exchanged for it is used up
+                given = 1 << self.exchanges[i]
+                if inventory & given:
+                    result.append((name, (loc, inventory & ~given | bit, ground & ~on_ground, self._add(score, points)),
+                                   self.puzzle_turns[i]))
+            elif on_ground:
+                turns = self.puzzle_turns[i] if self.starts[i] == loc else 0
+                result.append((name, (loc, inventory | bit, ground & ~on_ground, self._add(score, points)), turns))
+
+            if inventory & bit and self.targets[i] == loc:
+                result.append((f"drop {name}", (loc, inventory & ~bit, ground | 1 << (2 * i + 1),
+                                                self._add(score, points)), 0))
+
+        if loc == SUBMIT_LOCATION and (inventory & self.required == self.required
+                                       or self._ground_bits(loc, ground) & self.required == self.required):
+            result.append(("submit", WON, 0))
+        return result
+
+    def _ground_bits(self, loc: int, ground: int) -> int:
+        """Return the bits of the items on the ground at the given location."""
+        bits = 0
+        for i in range(len(self.names)):
+            at_start = self.starts[i] == loc and ground >> (2 * i) & 1
+            at_target = self.targets[i] == loc and ground >> (2 * i + 1) & 1
+            if at_start or at_target:
+                bits |= 1 << i
+        return bits
+
+    @staticmethod
+    def _add(score: int, points: int) -> int:
+        """Return score plus points, capped at KEEP_PLAYING_SCORE."""
+        return min(score + points, KEEP_PLAYING_SCORE)
+
+
+@dataclass
+class Solution:
+    """What the solver found out about a world.
+
+    Instance Attributes:
+        - min_turns: the fewest turns needed to win, or None if the game can't be won
+        - route: the commands of a fastest win, or None if the game can't be won
+        - turns: the turn budget the search used
+        - states: the number of distinct states reachable within the turn budget
+        - dead_ends: the reachable states from which the game can no longer be won with the turns left when they
+          are first reached, including those where the player has run out of turns
+        - out_of_turns: the number of reachable states in which the player has run out of turns
+    """
+    min_turns: Optional[int]
+    route: Optional[list[str]]
+    turns: int
+    states: int
+    dead_ends: set[State] = field(default_factory=set)
+    out_of_turns: int = 0
+
+    @property
+    def winnable(self) -> bool:
+        """Return whether the game can be won within the turn budget."""
+        return self.min_turns is not None
+
+
+_rules: Optional[Rules] = None
+
+
+def _init_worker(rules: Rules) -> None:
+    """Set the rules used by _expand in a worker process."""
+    global _rules
+    _rules = rules
+
+
+def _expand(states: list[State]) -> list[list[tuple[str, State, int]]]:
+    """Return the successors of each of the given states, using the rules set by _init_worker."""
+    return [_rules.successors(state) for state in states]
+
+
+def solve(game_data_file: str, initial_location_id: int = 1, turns: int = 25,
+          processes: Optional[int] = None) -> Solution:
+    """Search every state of the game in the given file reachable within the given number of turns, and return
+    what was found. Rounds of the search are split between a pool of processes (one per CPU by default)."""
+    rules = Rules.from_world(load_world(game_data_file))
+    start = rules.start_state(initial_location_id)
+    processes = processes or os.cpu_count() or 1
+    with Pool(processes, initializer=_init_worker, initargs=(rules,)) as pool:
+        return _search(rules, start, turns, pool, processes)
+
+
+def _search(rules: Rules, start: State, turns: int, pool: Pool, processes: int) -> Solution:
+    """Search every state reachable from start within the given number of turns, using pool (which has the given
+    number of processes) for large rounds."""
+    parents = {start: None}
+    first_turn = {start: 0}
+    predecessors = defaultdict(list)
+    winners = []
+    out_of_turns = set()
+    win_turns = None
+    win_state = None
+
+    turn = 0
+    frontier = [start]
+    next_turn = []
+    while frontier:
+        if len(frontier) >= _PARALLEL_THRESHOLD:
+            chunk = -(-len(frontier) // (processes * 4))
+            expanded = [s for part in pool.map(_expand, [frontier[i:i + chunk]
+                                                         for i in range(0, len(frontier), chunk)]) for s in part]
+        else:
+            expanded = [rules.successors(state) for state in frontier]
+
+        free = []
+        for state, successors in zip(frontier, expanded):
+            for command, successor, cost in successors:
+                if successor == WON:
+                    winners.append(state)
+                    if win_turns is None:
+                        win_turns, win_state = turn, (state, command)
+                    continue
+                predecessors[successor].append((state, cost))
+                if cost:
+                    next_turn.append((successor, state, command))
+                elif successor not in parents:
+                    parents[successor] = (state, command)
+                    first_turn[successor] = turn
+                    free.append(successor)
+        frontier = free
+
+        if not frontier:
+            # Every state reachable this turn has been explored; move on to the states reached by taking a turn
+            turn += 1
+            for successor, state, command in next_turn:
+                if successor in parents:
+                    continue
+                parents[successor] = (state, command)
+                first_turn[successor] = turn
+                if turn >= turns and successor[3] < KEEP_PLAYING_SCORE:
+                    out_of_turns.add(successor)
+                else:
+                    frontier.append(successor)
+            next_turn = []
+
+    solution = Solution(win_turns, None, turns, len(parents), out_of_turns=len(out_of_turns))
+    if win_state is not None:
+        solution.route = _route(parents, *win_state)
+    solution.dead_ends = set(parents) - _can_win(winners, predecessors, first_turn, turns)
+    return solution
+
+
+def _route(parents: dict[State, Optional[tuple[State, str]]], state: State, command: str) -> list[str]:
+    """Return the commands leading from the start to state, followed by command."""
+    commands = [command]
+    while parents[state] is not None:
+        state, command = parents[state]
+        commands.append(command)
+    return commands[::-1]
+
+
+def _can_win(winners: list[State], predecessors: dict[State, list[tuple[State, int]]], first_turn: dict[State, int],
+             turns: int) -> set[State]:
+    """Return every state from which one of winners can be reached before the player runs out of turns, given the
+    predecessors of each state (and the turns taken to get from each), and the turn each state was first reached at.
+
+    A state reached at turn t can win if t plus its fewest turns to win is below the turn budget. Turns taken once the
+    score reaches KEEP_PLAYING_SCORE don't count, since the player can keep playing after running out of turns.
+    """
+    # needed[state] is the fewest turns from state to a win, not counting turns taken with a score that lets the
+    # player keep playing. Each state is settled in order of its turns needed (Dijkstra's algorithm, backwards).
+    needed = dict.fromkeys(winners, 0)
+    heap = [(0, state) for state in needed]
+    while heap:
+        turns_needed, state = heapq.heappop(heap)
+        if turns_needed > needed[state]:
+            continue
+        for previous, cost in predecessors.get(state, ()):
+            through = 0 if state[3] >= KEEP_PLAYING_SCORE else turns_needed + cost
+            if through < needed.get(previous, through + 1):
+                needed[previous] = through
+                heapq.heappush(heap, (through, previous))
+    return {state for state, turns_needed in needed.items()
+            if state[3] >= KEEP_PLAYING_SCORE or first_turn[state] + turns_needed < turns}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find the fewest turns needed to win a game world.")
+    parser.add_argument('game_data_file', nargs='?', default='game_data.json')
+    parser.add_argument('--start', type=int, default=1, help="id of the starting location")
+    parser.add_argument('--turns', type=int, default=25, help="the turn budget of the game")
+    parser.add_argument('--processes', type=int, help="number of worker processes (default: one per CPU)")
+    args = parser.parse_args()
+    result = solve(args.game_data_file, args.start, args.turns, args.processes)
+    print(f"{result.states} states reachable, {len(result.dead_ends)} dead ends "
+          f"({result.out_of_turns} out of turns).")
+    if result.winnable:
+        print(f"Winnable in {result.min_turns} of {result.turns} turns: {', '.join(result.route)}")
+    else:
+        print(f"Not winnable in {result.turns} turns.")
+    raise SystemExit(0 if result.winnable else 1)
@@ -0,0 +1,69 @@
+"""CSC111 Project 1: Text Adventure Game - Command Router Tests
+
+Run with:  python -m pytest test_commands.py
+"""
+from __future__ import annotations
+
+from adventure import ACTION_PROMPT, ROUTER, AdventureGame
+from commands import build_exit_index
+from game_entities import Location
+
+DIRECTIONS = {"n": "go north", "s": "go south", "e": "go east", "w": "go west", "u": "go up", "d": "go down"}
+
+
+def _crossroads() -> Location:
+    """Return a location with an exit in every direction."""
+    return Location(1, "", "", [{command: 2 for command in DIRECTIONS.values()}, {}, False], "Crossroads")
+
+
+def test_direction_aliases_resolve_to_moves() -> None:
+    """Each single letter direction alias is a move, even where it is also the prefix of a menu command."""
+    location = _crossroads()
+    exit_index = build_exit_index(location.available_commands)
+    for alias, command in DIRECTIONS.items():
+        route = ROUTER.resolve(location, exit_index, alias)
+        assert route is not None and route.command == command
+        assert route.handler is AdventureGame._move
+
+
+def test_aliases_move_the_player_in_game() -> None:
+    """Typing "s" at St George Street moves the player south, instead of asking which command was meant."""
+    game = AdventureGame('game_data.json', 1, seed=0)
+    game.start()
+    game.step("e")
+    south = game.get_location().available_commands["go south"]
+    assert game.step("s").lines[0] == "You decided to: go south"
+    assert game.current_location_id == south
+
+
+def test_missing_directions_are_invalid() -> None:
+    """Typing "u" or "d" where there is no way up or down is invalid, instead of running undo or drop."""
+    game = AdventureGame('game_data.json', 1, seed=0)
+    game.start()
+    game.step("e")
+    location = game.current_location_id
+    assert not {"go up", "go down"} & game.get_location().available_commands.keys()
+    for alias in ("u", "d"):
+        result = game.step(alias)
+        assert result.lines[0] == "That was an invalid option; try again."
+        assert result.prompt == ACTION_PROMPT
+    assert game.current_location_id == location
+
+
+def test_typos_of_game_ending_commands_are_only_suggested() -> None:
+    """A misspelt or shortened quit, submit or drop is suggested instead of run, while other misspelt or shortened
+    commands are run."""
+    game = AdventureGame('game_data.json', 1, seed=0)
+    game.start()
+    for typo, command in (("quiet", "quit"), ("submti", "submit"), ("dorp", "drop"), ("q", "quit"), ("sub", "submit"),
+                          ("dr", "drop")):
+        result = game.step(typo)
+        assert result.lines[0] == f"Did you mean: {command}?"
+        assert not result.game_over and result.prompt == ACTION_PROMPT
+    assert game.step("scoer").lines[0] == "You decided to: score"
+    assert game.step("sc").lines[0] == "You decided to: score"
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main(['test_commands.py'])
@@ -0,0 +1,32 @@
+"""CSC111 Project 1: Text Adventure Game - Puzzle Tests
+
+Run with:  python -m pytest test_puzzles.py
+"""
+from __future__ import annotations
+import random
+
+from puzzles import WON, Player, make_puzzle
+from world import load_world
+
+ALTERNATES = {"Midterm": "trimmed", "Student": "stunted", "Terminal": "tramline"}
+
+
+def test_unscramble_accepts_other_anagrams() -> None:
+    """The unscramble puzzle of the game is won by answering real words other than the ones it had in mind."""
+    sequence = load_world('game_data.json').items["usb drive"].puzzle
+    spec = next(part for part in sequence['puzzles'] if part['kind'] == "unscramble")
+    puzzle = make_puzzle({**spec, 'words': list(ALTERNATES), 'rounds': len(ALTERNATES)})
+    said: list[str] = []
+    player = Player(lambda *parts: said.append(" ".join(map(str, parts))), random.Random(0), ())
+
+    state = puzzle.begin(player)
+    while puzzle.outcome(state) is None:
+        word = state['words'][state['round']]
+        puzzle.step(state, ALTERNATES[word], player)
+    assert puzzle.outcome(state) == WON
+    assert "Correct! The word we had in mind was 'Terminal', but 'tramline' works too." in said
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main(['test_puzzles.py'])
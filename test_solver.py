@@ -0,0 +1,43 @@
+"""CSC111 Project 1: Text Adventure Game - Solver Tests
+
+Run with:  python -m pytest test_solver.py
+"""
+from __future__ import annotations
+
+from adventure import SUBMIT_LOCATION
+from solver import Rules, _search
+from world import load_world
+
+
+def test_exchanged_item_is_taken_from_the_ground() -> None:
+    """After the TCard is exchanged for the lucky mug, the mug is held and no longer at the porter's office."""
+    rules = Rules.from_world(load_world('game_data.json'))
+    mug, tcard = rules.names.index("lucky mug"), rules.names.index("tcard")
+    office = rules.starts[mug]
+    loc, inventory, ground, score = rules.start_state(office)
+    state = (loc, inventory | 1 << tcard, ground & ~(1 << 2 * tcard), score)
+
+    exchanged = [successor for command, successor, _ in rules.successors(state) if command == "lucky mug"]
+    assert len(exchanged) == 1
+    _, inventory, ground, _ = exchanged[0]
+    assert inventory == 1 << mug
+    assert not ground >> (2 * mug) & 1
+    assert "lucky mug" not in [command for command, _, _ in rules.successors(exchanged[0])]
+
+
+def test_state_first_reached_too_late_is_a_dead_end() -> None:
+    """A location with a route to the submit location is a dead end if there aren't enough turns left to follow it
+    by the time the player gets there."""
+    # 1 -> 2 -> 3 -> SUBMIT_LOCATION wins in 3 turns, but the detour 1 -> 5 -> 2 reaches 2 a turn later
+    exits = {1: (("a", 2), ("b", 5)), 5: (("c", 2),), 2: (("d", 3),), 3: (("e", SUBMIT_LOCATION),),
+             SUBMIT_LOCATION: ()}
+    rules = Rules(exits, (), (), (), (), 0, (), ())
+    solution = _search(rules, rules.start_state(1), 4, None, 1)
+    assert solution.min_turns == 3
+    assert (5, 0, 0, 0) in solution.dead_ends
+    assert (2, 0, 0, 0) not in solution.dead_ends
+
+
+if __name__ == "__main__":
+    import pytest
+    pytest.main(['test_solver.py'])
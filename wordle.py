@@ -0,0 +1,229 @@
+"""CSC111 Project 1: Text Adventure Game - Wordle Feedback Engine
+
+This module computes Wordle feedback for the USB drive puzzle.
+
+Feedback for a guess is encoded as a pattern code: the mark for position i (0 = not in the word, 1 = in the word
+but in the wrong position, 2 = correct) times 3 ** i, summed over every position. Repeated letters are marked like
+in Wordle: a guessed letter is only marked as present as many times as it appears in the answer, and correct
+positions are counted first.
+
+Whole batches of guesses can be scored against whole batches of answers at once with pattern_matrix, which is
+vectorized with NumPy when it is installed. This is used to give hints (the guess leaving the fewest expected
+candidates) and to precompute how hard every answer word is:
+
+    python wordle.py --difficulty difficulty.json
+"""
+from __future__ import annotations
+import argparse
+import json
+from collections import Counter
+from typing import Any, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional: batch scoring falls back to pure Python
+    np = None
+
+MISS, PRESENT, CORRECT = 0, 1, 2
+MARKS = ("-X-", "-/-", "-O-")
+
+# When giving a hint, at most this many guesses are tried against the remaining candidates
+HINT_POOL_LIMIT = 250
+
+
+def pattern_code(guess: str, answer: str) -> int:
+    """Return the pattern code of the feedback for guess when the word to find is answer.
+
+    Preconditions:
+        - len(guess) == len(answer)
+
+    >>> feedback(guess="speed", answer="abide")
+    ['-X-', '-X-', '-/-', '-X-', '-/-']
+    >>> pattern_code("abide", "abide") == 3 ** 5 - 1
+    True
+    """
+    marks = [MISS] * len(guess)
+    unmatched = Counter()
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            marks[i] = CORRECT
+        else:
+            unmatched[a] += 1
+    for i, g in enumerate(guess):
+        if marks[i] == MISS and unmatched[g] > 0:
+            marks[i] = PRESENT
+            unmatched[g] -= 1
+    return sum(m * 3 ** i for i, m in enumerate(marks))
+
+
+def decode(code: int, length: int = 5) -> list[str]:
+    """Return the marks shown to the player for the given pattern code."""
+    marks = []
+    for _ in range(length):
+        code, m = divmod(code, 3)
+        marks.append(MARKS[m])
+    return marks
+
+
+def feedback(guess: str, answer: str) -> list[str]:
+    """Return the marks shown to the player for guess when the word to find is answer."""
+    return decode(pattern_code(guess, answer), len(guess))
+
+
+def solved_code(length: int = 5) -> int:
+    """Return the pattern code of a correct guess of the given length."""
+    return 3 ** length - 1
+
+
+def pattern_matrix(guesses: Sequence[str], answers: Sequence[str], chunk: int = 512) -> Any:
+    """Return a matrix whose entry [i][j] is pattern_code(guesses[i], answers[j]).
+
+    The matrix is a NumPy array of uint8 if NumPy is installed, and a list of lists otherwise. With NumPy, guesses are
+    scored chunk rows at a time to bound memory use.
+
+    Preconditions:
+        - all words in guesses and answers have the same length, at most 5
+    """
+    if np is None:
+        return [[pattern_code(g, a) for a in answers] for g in guesses]
+
+    g_letters = _letter_array(guesses)
+    a_letters = _letter_array(answers)
+    length = a_letters.shape[1]
+    result = np.empty((len(guesses), len(answers)), dtype=np.uint8)
+    for start in range(0, len(guesses), chunk):
+        g = g_letters[start:start + chunk, None, :]
+        a = a_letters[None, :, :]
+        green = g == a
+        used = green.copy()
+        code = np.zeros(green.shape[:2], dtype=np.uint8)
+        for i in range(length):
+            looking = ~green[..., i]
+            present = np.zeros_like(looking)
+            for j in range(length):
+                # the first unused answer position holding guessed letter i makes it present
+                match = looking & ~used[..., j] & (g[..., i] == a[..., j])
+                used[..., j] |= match
+                present |= match
+                looking &= ~match
+            code += (green[..., i] * CORRECT + present * PRESENT).astype(np.uint8) * np.uint8(3 ** i)
+        result[start:start + chunk] = code
+    return result
+
+
+def _letter_array(words: Sequence[str]) -> Any:
+    """Return a NumPy array of shape (len(words), word length) of the character codes of the given words."""
+    return np.frombuffer("".join(words).encode('ascii'), dtype=np.uint8).reshape(len(words), -1)
+
+
+def expected_remaining(codes: Sequence[int]) -> float:
+    """Return the expected number of candidates left after a guess whose pattern code against each candidate is in
+    codes, if every candidate is equally likely to be the answer."""
+    if np is not None and isinstance(codes, np.ndarray):
+        counts = np.bincount(codes)
+        return float((counts.astype(np.int64) ** 2).sum()) / len(codes)
+    return sum(c * c for c in Counter(codes).values()) / len(codes)
+
+
+def filter_candidates(candidates: Sequence[str], guess: str, code: int) -> list[str]:
+    """Return the candidates that would have given the given pattern code for guess."""
+    return [w for w in candidates if pattern_code(guess, w) == code]
+
+
+def best_guess(candidates: Sequence[str], pool: Optional[Sequence[str]] = None) -> str:
+    """Return the guess from pool (default: the candidates) that leaves the fewest expected remaining candidates.
+
+    Ties are broken in favour of guesses that could be the answer, then by order in pool.
+
+    Preconditions:
+        - len(candidates) > 0
+    """
+    if len(candidates) <= 2:
+        return candidates[0]
+    if pool is None:
+        pool = candidates
+    is_candidate = set(candidates)
+    matrix = pattern_matrix(pool, candidates)
+    scores = [(expected_remaining(row), g not in is_candidate, i) for i, (g, row) in enumerate(zip(pool, matrix))]
+    return pool[min(scores)[2]]
+
+
+class WordleSolver:
+    """The candidates left in a game of Wordle, used to give the player hints.
+
+    Instance Attributes:
+        - candidates: the words that are consistent with all feedback given so far
+    """
+    # Private Instance Attributes:
+    #   - _openings: hints for very large candidate lists (in practice, before any guess), shared by all solvers
+
+    candidates: list[str]
+    _openings: dict[tuple[str, ...], str] = {}
+
+    def __init__(self, words: Sequence[str]) -> None:
+        """Initialize a solver for a game whose answer is one of the given words."""
+        self.candidates = list(words)
+
+    def add_guess(self, guess: str, code: int) -> None:
+        """Record that guess was given the feedback with the given pattern code."""
+        self.candidates = filter_candidates(self.candidates, guess, code)
+
+    def hint(self) -> Optional[str]:
+        """Return the best next guess, or None if no word is consistent with the feedback so far."""
+        if not self.candidates:
+            return None
+        key = tuple(self.candidates)
+        if key in WordleSolver._openings:
+            return WordleSolver._openings[key]
+        pool = self.candidates
+        if len(pool) > HINT_POOL_LIMIT:
+            step = len(pool) / HINT_POOL_LIMIT
+            pool = [pool[int(i * step)] for i in range(HINT_POOL_LIMIT)]
+        guess = best_guess(self.candidates, pool)
+        if len(self.candidates) > HINT_POOL_LIMIT:
+            # only large candidate lists are worth remembering: in practice, the full word list before any guess
+            WordleSolver._openings[key] = guess
+        return guess
+
+
+def difficulty(words: Sequence[str]) -> dict[str, int]:
+    """Return a mapping from each word to the number of guesses needed to find it when every guess is the
+    best_guess of the remaining candidates (only guessing words that could still be the answer)."""
+    result = {}
+    _solve_tree(list(words), 1, result)
+    return result
+
+
+def _solve_tree(candidates: list[str], depth: int, result: dict[str, int]) -> None:
+    """Record in result the number of guesses needed to find each of candidates, having already used depth - 1."""
+    guess = best_guess(candidates)
+    codes = pattern_matrix([guess], candidates)[0]
+    groups = {}
+    for word, code in zip(candidates, codes):
+        groups.setdefault(int(code), []).append(word)
+    for code, group in groups.items():
+        if code == solved_code(len(guess)):
+            result[guess] = depth
+        else:
+            _solve_tree(group, depth + 1, result)
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    # import python_ta
+    # python_ta.check_all(config={
+    #     'max-line-length': 120,
+    #     'disable': ['R1705', 'E9998', 'E9999']
+    # })
+    from wordlist import load_word_list
+
+    parser = argparse.ArgumentParser(description="Precompute the difficulty of every Wordle answer.")
+    parser.add_argument('--difficulty', metavar='OUTPUT', required=True,
+                        help="JSON file to write the number of guesses needed for each word to")
+    args = parser.parse_args()
+    scores = difficulty(load_word_list().words)
+    with open(args.difficulty, 'w') as out:
+        json.dump(scores, out, indent=0)
+    print(f"Average guesses: {sum(scores.values()) / len(scores):.3f}, max: {max(scores.values())}")
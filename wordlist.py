@@ -0,0 +1,82 @@
+"""CSC111 Project 1: Text Adventure Game - Word List
+
+This module loads the dictionary of 5 letter words used by the Wordle puzzle once per process,
+and shares it between every game.
+"""
+from __future__ import annotations
+import os
+import random
+from typing import Iterable, Iterator, Optional
+
+WORDS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "words.txt")
+
+
+class WordList:
+    """An immutable list of words with constant time membership checks and random choice.
+
+    Instance Attributes:
+        - words: the words in this list, in the order they were given
+
+    Representation Invariants:
+        - len(self.words) == len(set(self.words))
+    """
+    # Private Instance Attributes:
+    #   - _index: a mapping from each word to its position in words
+
+    words: tuple[str, ...]
+    _index: dict[str, int]
+
+    def __init__(self, words: Iterable[str]) -> None:
+        """Initialize a word list containing the given words, ignoring duplicates."""
+        self._index = {}
+        for word in words:
+            self._index.setdefault(word, len(self._index))
+        self.words = tuple(self._index)
+
+    def __contains__(self, word: object) -> bool:
+        return word in self._index
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.words)
+
+    def index(self, word: str) -> int:
+        """Return the position of the given word in this list.
+
+        Raise KeyError if the word is not in this list.
+        """
+        return self._index[word]
+
+    def random_word(self, rng: Optional[random.Random] = None) -> str:
+        """Return a random word from this list, using the given random number generator (or the random module)."""
+        return (rng or random).choice(self.words)
+
+
+_word_lists: dict[str, WordList] = {}
+
+
+def load_word_list(filen: str = WORDS_FILE) -> WordList:
+    """Return the WordList of 5 letter words in the given file, with one word per line.
+
+    The file is only read the first time it is loaded in this process.
+    """
+    path = os.path.abspath(filen)
+    words = _word_lists.get(path)
+    if words is None:
+        with open(path) as f:
+            words = WordList(line[0:5] for line in f if line.strip())
+        _word_lists[path] = words
+    return words
+
+
+if __name__ == "__main__":
+    # When you are ready to check your work with python_ta, uncomment the following lines.
+    # (Delete the "#" and space before each line.)
+    # IMPORTANT: keep this code indented inside the "if __name__ == '__main__'" block
+    import python_ta
+    python_ta.check_all(config={
+        'max-line-length': 120,
+        'disable': ['R1705', 'E9998', 'E9999']
+    })
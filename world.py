@@ -0,0 +1,645 @@
+"""CSC111 Project 1: Text Adventure Game - Shared World
+
+This module loads the game world (locations, their descriptions and exits, and item definitions) once per
+process into a World that is shared by every game, and gives each game a LocationOverlay holding only the
+locations that game has changed.
+
+Game data can also be validated and compiled ahead of time into an indexed world file, which is loaded instead of
+the JSON file as long as the JSON file is unchanged:
+
+    python world.py validate game_data.json
+    python world.py compile game_data.json
+
+A compiled world file can also be loaded directly (e.g. AdventureGame('campus.world', 1)). Its locations are then
+read from the file the first time they are needed, and only the most recently used ones are kept in memory, so
+loading a world takes about the same time however many locations it has.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import struct
+from collections import OrderedDict
+from collections.abc import Iterator, Mapping
+from dataclasses import astuple, dataclass
+from types import MappingProxyType
+from typing import Any, Callable, Optional
+
+from commands import build_exit_index, build_exit_tree
+from fuzzy import BKTree
+from graph import WorldGraph
+from metrics import METRICS
+from game_entities import Location, Item
+from puzzles import Puzzle, make_puzzle, puzzle_problems
+from render import DescriptionRenderer
+
+
+@dataclass(frozen=True)
+class World:
+    """The locations and items of a game world, shared by every game using it.
+
+    The Location objects in a World must never be mutated: games change locations through a LocationOverlay.
+
+    Instance Attributes:
+        - locations: a mapping from location id to Location object
+        - items: a mapping from item name to Item object
+        - exit_indexes: a mapping from location id to the alias and prefix index of its available commands
+          (see commands.build_exit_index)
+        - exit_trees: a mapping from location id to the BK-tree of typos of its available commands
+          (see commands.build_exit_tree)
+        - item_tree: the BK-tree of typos of every item name
+        - descriptions: the wrapped descriptions of the locations, shared by every game
+        - graph: the shortest routes between the locations
+        - puzzles: the puzzle of every item that has one, built the first time it is played
+
+    Representation Invariants:
+        - all(loc.visited is False for loc in self.locations.values())
+        - self.exit_indexes.keys() == self.locations.keys()
+        - self.exit_trees.keys() == self.locations.keys()
+
+    The locations of a world loaded from a compiled world file are a LocationStore, and its exit indexes and trees,
+    descriptions and graph are computed lazily.
+    """
+    locations: Mapping[int, Location]
+    items: Mapping[str, Item]
+    exit_indexes: Mapping[int, Mapping[str, tuple[str, ...]]]
+    exit_trees: Mapping[int, BKTree]
+    item_tree: BKTree
+    descriptions: DescriptionRenderer
+    graph: WorldGraph
+    puzzles: Mapping[str, Puzzle]
+
+
+class WorldFormatError(Exception):
+    """Raised when game data is not a valid world.
+
+    Instance Attributes:
+        - problems: a description of each problem found in the data
+    """
+    problems: list[str]
+
+    def __init__(self, problems: list[str]) -> None:
+        super().__init__("invalid game data:\n" + "\n".join(f"  - {p}" for p in problems))
+        self.problems = problems
+
+
+# A compiled world file starts with WORLD_MAGIC, followed by the SHA-256 hash of the JSON file it was compiled
+# from and a _HEADER. Then comes one pickled row (see _flatten) for every location, a pickled list of every item's
+# row, a pickled mapping from the lowercase name of every named location to its id (see WorldGraph.places), and an
+# index with one _ENTRY for every location, sorted by location id, giving where its row is in the file.
+WORLD_MAGIC = b"ADVWORLD4"
+WORLD_SUFFIX = ".world"
+_HASH_SIZE = 32
+_HEADER = struct.Struct('<QQQQ')  # number of locations, offsets of the item rows, the place names and the index
+_ENTRY = struct.Struct('<qQI')  # location id, offset of its row, length of its row
+
+# Worlds with more locations than this search routes lazily (see WorldGraph)
+EAGER_GRAPH_LIMIT = 2000
+
+# The number of locations and wrapped descriptions kept in memory for worlds loaded lazily
+LAZY_CAPACITY = 4096
+
+# The number of routes kept in memory for worlds whose routes are searched lazily
+LAZY_ROUTES = 256
+
+
+def snapshot_path(filen: str) -> str:
+    """Return the path of the compiled world for the given game data file."""
+    return os.path.splitext(filen)[0] + WORLD_SUFFIX
+
+
+def validate_game_data(data: dict, start: Optional[int] = None) -> list[str]:
+    """Return a description of every problem in the given game data (as loaded from a JSON file).
+
+    Every location must be reachable from the starting location start (the first location in the data by default),
+    every item's target position must be reachable from its start position, and every item's puzzle (if it has one)
+    must have valid settings.
+
+    The data is valid if and only if the returned list is empty.
+    """
+    problems = []
+    location_ids = set()
+    for loc_data in data['locations']:
+        if loc_data['id'] in location_ids:
+            problems.append(f"location {loc_data['id']} is defined more than once")
+        location_ids.add(loc_data['id'])
+    item_names = {itemdata['name'] for itemdata in data['items']}
+
+    found_at = {}
+    for loc_data in data['locations']:
+        for command, target in loc_data['available_commands'].items():
+            if target not in location_ids:
+                problems.append(f"location {loc_data['id']}: '{command}' leads to unknown location {target}")
+        for name in loc_data['items']:
+            if name not in item_names:
+                problems.append(f"location {loc_data['id']}: unknown item '{name}'")
+            elif name in found_at:
+                problems.append(f"item '{name}' is at both location {found_at[name]} and {loc_data['id']}")
+            else:
+                found_at[name] = loc_data['id']
+
+    for itemdata in data['items']:
+        name = itemdata['name']
+        if itemdata['start_position'] == itemdata['target_position']:
+            problems.append(f"item '{name}': start_position and target_position are both "
+                            f"{itemdata['start_position']}")
+        if itemdata['target_position'] not in location_ids:
+            problems.append(f"item '{name}': target_position {itemdata['target_position']} is not a location")
+        if name in found_at and found_at[name] != itemdata['start_position']:
+            problems.append(f"item '{name}': start_position is {itemdata['start_position']}, "
+                            f"but it is found at location {found_at[name]}")
+        if 'puzzle' in itemdata:
+            problems.extend(f"item '{name}': {problem}" for problem in puzzle_problems(itemdata['puzzle'], item_names))
+    if not problems:
+        problems.extend(_reachability_problems(data, start))
+    return problems
+
+
+def _reachability_problems(data: dict, start: Optional[int]) -> list[str]:
+    """Return a description of every location that can't be reached from start, and every item that can't be
+    brought from its start position to its target position, in the given game data.
+
+    Preconditions:
+        - the game data has no other problems (see validate_game_data)
+    """
+    graph = WorldGraph({d['id']: d['available_commands'] for d in data['locations']}, capacity=1)
+    if start is None:
+        start = data['locations'][0]['id']
+    reachable = graph.reachable(start)
+    problems = [f"location {d['id']} cannot be reached from location {start}"
+                for d in data['locations'] if d['id'] not in reachable]
+    for itemdata in data['items']:
+        if graph.distance(itemdata['start_position'], itemdata['target_position']) is None:
+            problems.append(f"item '{itemdata['name']}': target_position {itemdata['target_position']} cannot be "
+                            f"reached from start_position {itemdata['start_position']}")
+    return problems
+
+
+def compile_world(filen: str, output: Optional[str] = None) -> str:
+    """Validate the game data in the given JSON file and write it as a compiled world, returning the path written.
+
+    The compiled world is written to snapshot_path(filen) unless an output path is given. read_game_data uses it
+    instead of the JSON file for as long as the JSON file's contents don't change. It is written to a temporary file
+    first, which then replaces any old compiled world in a single step, so a process loading the world while it is
+    being compiled never sees a partly written file.
+
+    Raise WorldFormatError if the game data is not valid.
+    """
+    with open(filen, 'rb') as fl:
+        raw = fl.read()
+    data = json.loads(raw)
+    problems = validate_game_data(data)
+    if problems:
+        raise WorldFormatError(problems)
+
+    output = output or snapshot_path(filen)
+    location_rows, item_rows = _flatten(data)
+    index = []
+    temporary = output + '.tmp'
+    with open(temporary, 'wb') as out:
+        out.write(WORLD_MAGIC + hashlib.sha256(raw).digest() + bytes(_HEADER.size))
+        for row in location_rows:
+            payload = pickle.dumps(row, protocol=pickle.HIGHEST_PROTOCOL)
+            index.append((row[0], out.tell(), len(payload)))
+            out.write(payload)
+        items_offset = out.tell()
+        pickle.dump(item_rows, out, protocol=pickle.HIGHEST_PROTOCOL)
+        places_offset = out.tell()
+        pickle.dump({row[5].lower(): row[0] for row in location_rows if row[5]}, out,
+                    protocol=pickle.HIGHEST_PROTOCOL)
+        index_offset = out.tell()
+        for entry in sorted(index):
+            out.write(_ENTRY.pack(*entry))
+        out.seek(len(WORLD_MAGIC) + _HASH_SIZE)
+        out.write(_HEADER.pack(len(index), items_offset, places_offset, index_offset))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(temporary, output)
+    return output
+
+
+def _flatten(data: dict) -> tuple[list[tuple], list[tuple]]:
+    """Return the given game data as lists of tuples, in the order of the fields of Location and Item."""
+    locations = [(d['id'], d['brief_description'], d['long_description'], d['available_commands'], d['items'],
+                  d.get('name', '')) for d in data['locations']]
+    items = [(d['name'], d['description'], d['start_position'], d['target_position'], d['target_points'],
+              d.get('puzzle')) for d in data['items']]
+    return locations, items
+
+
+def _read_snapshot(filen: str, raw: bytes) -> Optional[tuple[list[tuple], list[tuple]]]:
+    """Return the flattened game data of the compiled world for the given game data file, whose contents are raw,
+    or None if there is no compiled world, it was compiled from different contents or it can't be read."""
+    try:
+        store = LocationStore(snapshot_path(filen))
+    except (FileNotFoundError, WorldFormatError):
+        return None
+    try:
+        if store.source_hash != hashlib.sha256(raw).digest():
+            return None
+        return list(store.rows()), [astuple(item) for item in store.items.values()]
+    except (EOFError, pickle.UnpicklingError, struct.error):  # a damaged file is as good as a stale one
+        return None
+    finally:
+        store.close()
+
+
+class LocationStore(Mapping[int, Location]):
+    """The locations of a compiled world file, read from the file when they are first needed.
+
+    The file is memory-mapped, and a location is found with a binary search of the file's index, so opening a store
+    takes the same time however many locations it has. Locations are read-only (see load_world), and only the
+    capacity most recently used locations are kept in memory.
+
+    Instance Attributes:
+        - path: the compiled world file
+        - capacity: the number of locations kept in memory
+        - items: a mapping from item name to every item in the world
+        - source_hash: the SHA-256 hash of the JSON file the world was compiled from
+    """
+    # Private Instance Attributes:
+    #   - _file: the open compiled world file
+    #   - _data: the memory-mapped contents of the file
+    #   - _count: the number of locations in the file
+    #   - _places_offset: where the place names start in the file
+    #   - _index_offset: where the index starts in the file
+    #   - _places: the mapping from the lowercase name of every named location to its id, or None if it hasn't been
+    #              read yet
+    #   - _resident: the locations in memory, the least recently used first
+
+    path: str
+    capacity: int
+    items: Mapping[str, Item]
+    source_hash: bytes
+    _file: Any
+    _data: mmap.mmap
+    _count: int
+    _places_offset: int
+    _index_offset: int
+    _places: Optional[dict[str, int]]
+    _resident: OrderedDict[int, Location]
+
+    def __init__(self, path: str, capacity: int = LAZY_CAPACITY) -> None:
+        """Open the compiled world file at the given path.
+
+        Raise WorldFormatError if the file isn't a compiled world file.
+        """
+        self.path = path
+        self.capacity = capacity
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file can't be memory-mapped
+            self._file.close()
+            raise WorldFormatError([f"{path} is not a compiled world"]) from None
+        start = len(WORLD_MAGIC) + _HASH_SIZE
+        if self._data[:len(WORLD_MAGIC)] != WORLD_MAGIC:
+            self.close()
+            raise WorldFormatError([f"{path} is not a compiled world"])
+        self.source_hash = self._data[len(WORLD_MAGIC):start]
+        try:
+            self._count, items_offset, self._places_offset, self._index_offset = _HEADER.unpack_from(self._data, start)
+            item_rows = pickle.loads(self._data[items_offset:self._places_offset])
+        except (EOFError, pickle.UnpicklingError, struct.error):
+            self.close()
+            raise WorldFormatError([f"{path} is a damaged compiled world"]) from None
+        self.items = MappingProxyType({row[0]: Item(*row) for row in item_rows})
+        self._places = None
+        self._resident = OrderedDict()
+
+    def places(self) -> dict[str, int]:
+        """Return a mapping from the lowercase name of every named location to its id, read from the file the first
+        time it is needed."""
+        if self._places is None:
+            self._places = pickle.loads(self._data[self._places_offset:self._index_offset])
+        return self._places
+
+    def close(self) -> None:
+        """Close the file. Locations in memory can still be used, but no others can be read."""
+        self._data.close()
+        self._file.close()
+
+    def _entry(self, position: int) -> tuple[int, int, int]:
+        """Return the index entry at the given position of the index."""
+        return _ENTRY.unpack_from(self._data, self._index_offset + position * _ENTRY.size)
+
+    def _find(self, loc_id: int) -> Optional[tuple[int, int, int]]:
+        """Return the index entry of the location with the given id, or None if there is no such location."""
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            entry = self._entry(middle)
+            if entry[0] < loc_id:
+                low = middle + 1
+            elif entry[0] > loc_id:
+                high = middle
+            else:
+                return entry
+        return None
+
+    def _read(self, entry: tuple[int, int, int]) -> tuple:
+        """Return the row of the location with the given index entry."""
+        _, offset, length = entry
+        return pickle.loads(self._data[offset:offset + length])
+
+    def __getitem__(self, loc_id: int) -> Location:
+        loc = self._resident.get(loc_id)
+        if loc is not None:
+            self._resident.move_to_end(loc_id)
+            return loc
+        entry = self._find(loc_id)
+        if entry is None:
+            raise KeyError(loc_id)
+        loc = _shared_location(self._read(entry), self.items)
+        self._resident[loc_id] = loc
+        if len(self._resident) > self.capacity:
+            self._resident.popitem(last=False)
+        return loc
+
+    def __contains__(self, loc_id: object) -> bool:
+        return loc_id in self._resident or (isinstance(loc_id, int) and self._find(loc_id) is not None)
+
+    def __iter__(self) -> Iterator[int]:
+        for position in range(self._count):
+            yield self._entry(position)[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def rows(self) -> Iterator[tuple]:
+        """Yield the row of every location (see _flatten), in order of location id, without keeping them."""
+        for position in range(self._count):
+            yield self._read(self._entry(position))
+
+
+class _FieldView(Mapping[int, Any]):
+    """A read-only mapping from each location id to one attribute of that location."""
+    # Private Instance Attributes:
+    #   - _locations: the locations
+    #   - _field: the name of the attribute
+
+    _locations: Mapping[int, Location]
+    _field: str
+
+    def __init__(self, locations: Mapping[int, Location], field: str) -> None:
+        self._locations = locations
+        self._field = field
+
+    def __getitem__(self, loc_id: int) -> Any:
+        return getattr(self._locations[loc_id], self._field)
+
+    def __contains__(self, loc_id: object) -> bool:
+        return loc_id in self._locations
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
+def _exit_index(available_commands: Mapping[str, int]) -> Mapping[str, tuple[str, ...]]:
+    """Return a read-only alias and prefix index for a location with the given available commands."""
+    return MappingProxyType(build_exit_index(available_commands))
+
+
+class ExitIndexes(Mapping[int, Any]):
+    """An index of each location's available commands, built the first time it is needed: the alias and prefix
+    index (see commands.build_exit_index) by default. Only the indexes of the capacity most recently used locations
+    are kept."""
+    # Private Instance Attributes:
+    #   - _locations: the locations
+    #   - _build: the function building the index of a location from its available commands
+    #   - _capacity: the number of indexes kept
+    #   - _indexes: the indexes built, the least recently used first
+
+    _locations: Mapping[int, Location]
+    _build: Callable[[Mapping[str, int]], Any]
+    _capacity: int
+    _indexes: OrderedDict[int, Any]
+
+    def __init__(self, locations: Mapping[int, Location], build: Callable[[Mapping[str, int]], Any] = _exit_index,
+                 capacity: int = LAZY_CAPACITY) -> None:
+        self._locations = locations
+        self._build = build
+        self._capacity = capacity
+        self._indexes = OrderedDict()
+
+    def __getitem__(self, loc_id: int) -> Any:
+        index = self._indexes.get(loc_id)
+        if index is not None:
+            self._indexes.move_to_end(loc_id)
+            return index
+        index = self._build(self._locations[loc_id].available_commands)
+        self._indexes[loc_id] = index
+        if len(self._indexes) > self._capacity:
+            self._indexes.popitem(last=False)
+        return index
+
+    def __contains__(self, loc_id: object) -> bool:
+        return loc_id in self._locations
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._locations)
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+
+def read_game_data(filen: str) -> tuple[dict[int, Location], dict[str, Item]]:
+    """Load locations and items from a JSON file with the given filename and
+    return a tuple consisting of (1) a dictionary of locations mapping each game location's ID to a Location object,
+    and (2) a dictionary mapping each item's name to its Item object.
+
+    Each location's items are a dictionary mapping item names to Item objects.
+    If the file has been compiled with compile_world since it last changed, the compiled world is loaded instead.
+    The file may also be a compiled world file itself.
+    """
+    if filen.endswith(WORLD_SUFFIX):
+        store = LocationStore(filen)
+        try:
+            flat = list(store.rows()), [astuple(item) for item in store.items.values()]
+        finally:
+            store.close()
+        return _materialize(*flat)
+
+    with open(filen, 'rb') as fl:
+        raw = fl.read()
+    flat = _read_snapshot(filen, raw)
+    if flat is None:
+        flat = _flatten(json.loads(raw))  # This loads all the data from the JSON file
+    return _materialize(*flat)
+
+
+def _materialize(location_rows: list[tuple], item_rows: list[tuple]) -> tuple[dict[int, Location], dict[str, Item]]:
+    """Return the locations and items (as returned by read_game_data) of the given rows (see _flatten)."""
+    items = {}
+    for row in item_rows:
+        items[row[0]] = Item(*row)
+
+    locations = {}
+    for loc_id, brief, long, commands, item_names, name in location_rows:
+        locations[loc_id] = Location(loc_id, brief, long, [commands, {j: items[j] for j in item_names}, False],
+                                     name)
+
+    return locations, items
+
+
+_worlds: dict[str, tuple[int, World]] = {}
+
+
+def load_world(filen: str) -> World:
+    """Return the World stored in the given game data file, which is either a JSON file or a compiled world file.
+
+    The file is only read the first time it is loaded in this process (or after it changes on disk); every other
+    call returns the same World object. The locations of a compiled world file are read when they are first needed
+    (see LocationStore).
+    """
+    path = os.path.abspath(filen)
+    mtime = os.stat(path).st_mtime_ns
+    cached = _worlds.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with METRICS.timer("load"):
+        if path.endswith(WORLD_SUFFIX):
+            world = _lazy_world(LocationStore(path))
+        else:
+            world = _eager_world(*read_game_data(path))
+    _worlds[path] = (mtime, world)
+    return world
+
+
+def _shared_location(row: tuple, items: Mapping[str, Item]) -> Location:
+    """Return a location to be shared by every game, from its row (see _flatten)."""
+    loc_id, brief, long, commands, item_names, name = row
+    # Read-only views, so that a game mutating a shared location by mistake fails loudly
+    return Location(loc_id, brief, long, [MappingProxyType(commands),
+                                          MappingProxyType({j: items[j] for j in item_names}), False], name)
+
+
+def _eager_world(locations: dict[int, Location], items: dict[str, Item]) -> World:
+    """Return a World of the given locations and items, with everything about it computed up front."""
+    for loc in locations.values():
+        # Read-only views, so that a game mutating a shared location by mistake fails loudly
+        loc.available_commands = MappingProxyType(loc.available_commands)
+        loc.items = MappingProxyType(loc.items)
+    exit_indexes = {loc_id: build_exit_index(loc.available_commands) for loc_id, loc in locations.items()}
+    exit_trees = {loc_id: build_exit_tree(loc.available_commands) for loc_id, loc in locations.items()}
+    graph = WorldGraph({loc_id: loc.available_commands for loc_id, loc in locations.items()},
+                       {loc_id: loc.name for loc_id, loc in locations.items()},
+                       None if len(locations) <= EAGER_GRAPH_LIMIT else LAZY_ROUTES)
+    return World(MappingProxyType(locations), MappingProxyType(items), MappingProxyType(exit_indexes),
+                 MappingProxyType(exit_trees), BKTree(items), DescriptionRenderer(locations), graph, PuzzleCache(items))
+
+
+def _lazy_world(store: LocationStore) -> World:
+    """Return a World of the locations in the given store, computing everything about them when first needed."""
+    return World(store, store.items, ExitIndexes(store), ExitIndexes(store, build_exit_tree),
+                 BKTree(store.items), DescriptionRenderer(store, False, LAZY_CAPACITY),
+                 WorldGraph(_FieldView(store, 'available_commands'), capacity=LAZY_ROUTES, load_places=store.places),
+                 PuzzleCache(store.items))
+
+
+class PuzzleCache(Mapping[str, Puzzle]):
+    """The puzzle of every item that has one, built from the item's settings the first time it is needed.
+
+    A puzzle only holds its settings (each game keeps the state of its own attempts), so one is shared by every game
+    using the world.
+    """
+    # Private Instance Attributes:
+    #   - _items: the items of the world
+    #   - _puzzles: the puzzles built so far
+
+    _items: Mapping[str, Item]
+    _puzzles: dict[str, Puzzle]
+
+    def __init__(self, items: Mapping[str, Item]) -> None:
+        self._items = items
+        self._puzzles = {}
+
+    def __getitem__(self, name: str) -> Puzzle:
+        puzzle = self._puzzles.get(name)
+        if puzzle is None:
+            spec = self._items[name].puzzle
+            if spec is None:
+                raise KeyError(name)
+            puzzle = make_puzzle(spec)
+            self._puzzles[name] = puzzle
+        return puzzle
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._items and self._items[name].puzzle is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, item in self._items.items() if item.puzzle is not None)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+class LocationOverlay(Mapping[int, Location]):
+    """The locations of one game: the shared locations of a World, except for the ones this game has changed.
+
+    A location is copied from the world the first time it is changed (with writable), so the memory used by a game
+    is proportional to the number of locations it has changed, not to the size of the world.
+
+    Instance Attributes:
+        - world: the World this overlay is on top of
+    """
+    # Private Instance Attributes:
+    #   - _changed: a mapping from location id to this game's own copy of that location
+
+    world: World
+    _changed: dict[int, Location]
+
+    def __init__(self, world: World) -> None:
+        """Initialize an overlay that hasn't changed any location of the given world."""
+        self.world = world
+        self._changed = {}
+
+    def __getitem__(self, loc_id: int) -> Location:
+        """Return the location with the given id, as seen by this game. The returned location must not be mutated."""
+        loc = self._changed.get(loc_id)
+        if loc is None:
+            loc = self.world.locations[loc_id]
+        return loc
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.world.locations)
+
+    def __len__(self) -> int:
+        return len(self.world.locations)
+
+    def writable(self, loc_id: int) -> Location:
+        """Return this game's own copy of the location with the given id, which may be mutated.
+
+        The shared location is copied the first time this is called for loc_id.
+        """
+        loc = self._changed.get(loc_id)
+        if loc is None:
+            shared = self.world.locations[loc_id]
+            loc = Location(shared.id_num, shared.brief_description, shared.long_description,
+                           [shared.available_commands, dict(shared.items), shared.visited], shared.name)
+            self._changed[loc_id] = loc
+        return loc
+
+    def changed_ids(self) -> list[int]:
+        """Return the ids of the locations this game has changed."""
+        return list(self._changed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate and compile game data files.")
+    parser.add_argument('command', choices=['validate', 'compile'])
+    parser.add_argument('game_data_file', nargs='?', default='game_data.json')
+    args = parser.parse_args()
+    if args.command == 'validate':
+        with open(args.game_data_file) as f:
+            errors = validate_game_data(json.load(f))
+        print("\n".join(errors) or f"{args.game_data_file} is valid.")
+    else:
+        print(f"Compiled {args.game_data_file} to {compile_world(args.game_data_file)}")